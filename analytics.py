@@ -0,0 +1,268 @@
+"""
+🧮 Núcleo de cálculo das seções do Premier League Analytics
+
+Cálculos compartilhados entre o dashboard (envolvidos pelos helpers em cache
+chaveados pela impressão digital da view) e o relatório em lote, para que as
+duas saídas não divirjam: métricas e estatísticas descritivas da visão geral,
+matrizes do modelo linear, testes das hipóteses e insights. Sem dependência
+do Streamlit.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.model_selection import train_test_split
+
+import config
+from clustering import cluster_players, cluster_sweep
+from plotting import box_summaries, histogram_summary
+from posthoc import posthoc
+from stats_engine import (bootstrap_correlation, bootstrap_mean_difference, bootstrap_r_squared,
+                          cross_validate_ols, cv_fold_assignments, feature_subset_search,
+                          fit_ols_train_test, group_summaries, group_tests, normality_battery,
+                          permutation_test, qq_quantiles)
+
+# Variáveis oferecidas nas estatísticas descritivas (as quatro primeiras vêm selecionadas)
+DESCRIPTIVE_VARIABLES = ['Goals', 'Assists', 'Expected_Goals', 'Minutes', 'Age']
+
+
+def xg_column(df):
+    """Coluna de Expected Goals do dataset (nome FBref original ou mapeado)"""
+    return 'xG' if 'xG' in df.columns else 'Expected_Goals'
+
+
+# ============================================================================
+# Visão geral
+# ============================================================================
+
+def overview_metrics(df):
+    """Números dos cards da visão geral (None quando a coluna não existe)"""
+    def column_stat(col, how):
+        return float(getattr(df[col], how)()) if col in df.columns else None
+
+    return {
+        'players': len(df),
+        'total_goals': column_stat('Goals', 'sum'),
+        'total_assists': column_stat('Assists', 'sum'),
+        'positions': int(df['Pos'].nunique()) if 'Pos' in df.columns else None,
+        'squads': int(df['Squad'].nunique()) if 'Squad' in df.columns else None,
+        'mean_goals': column_stat('Goals', 'mean'),
+        'mean_minutes': column_stat('Minutes', 'mean')
+    }
+
+
+def descriptive_variables(df):
+    """(opções, selecionadas por padrão) para as estatísticas descritivas"""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    options = [col for col in DESCRIPTIVE_VARIABLES if col in numeric_cols] or numeric_cols[:6]
+    return options, options[:4]
+
+
+def descriptive_stats(df, columns):
+    """``describe()`` das colunas pedidas"""
+    return df[list(columns)].describe()
+
+
+def variability_summary(df, columns):
+    """Média, desvio, coeficiente de variação e classificação da variabilidade por coluna"""
+    rows = []
+    for col in columns:
+        mean, std = df[col].mean(), df[col].std()
+        cv = (std / mean) * 100 if mean > 0 else 0
+        label = "alta variabilidade" if cv > 100 else "variabilidade moderada" if cv > 50 else "baixa variabilidade"
+        rows.append({'variable': col, 'mean': mean, 'std': std, 'cv': cv, 'variability': label})
+    return pd.DataFrame(rows, columns=['variable', 'mean', 'std', 'cv', 'variability']).set_index('variable')
+
+
+def histogram(df, column, nbins=20, density=False):
+    """Bordas e contagens (ou densidade) do histograma de uma coluna"""
+    return histogram_summary(df[column].to_numpy(), nbins, density=density)
+
+
+def box_summary(df, value_col, group_col=None):
+    """Quartis, cercas e outliers amostrados por grupo"""
+    groups = df[group_col].to_numpy() if group_col else None
+    return box_summaries(df[value_col].to_numpy(), groups)
+
+
+# ============================================================================
+# Modelagem
+# ============================================================================
+
+def model_matrices(df, target_var, features):
+    """X e y do modelo linear, com valores ausentes preenchidos pela mediana"""
+    features = list(features)
+    X = df[features].fillna(df[features].median())
+    y = df[target_var].fillna(df[target_var].median())
+    return X, y
+
+
+def train_linear_model(df, target_var, features, test_size=config.DEFAULT_TEST_SIZE,
+                       random_state=config.RANDOM_STATE):
+    """Divide treino/teste e ajusta o OLS em forma fechada"""
+    X, y = model_matrices(df, target_var, features)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state
+    )
+
+    # Coeficientes, inferência e métricas de treino/teste em uma única fatoração
+    results = fit_ols_train_test(X_train, y_train, X_test, y_test)
+    results.update({
+        'n_train': len(X_train),
+        'n_test': len(X_test),
+        'y_test': y_test
+    })
+    return results
+
+
+def cross_validate_linear_model(df, target_var, features, folds, n_jobs=config.N_JOBS):
+    """Métricas por fold e resumo da validação cruzada do OLS"""
+    X, y = model_matrices(df, target_var, features)
+    return cross_validate_ols(X, y, folds, n_jobs=n_jobs)
+
+
+def fold_assignments(df, n_splits, n_repeats=1, group_col=None, random_state=config.RANDOM_STATE):
+    """Fold de teste de cada linha (agrupado por ``group_col`` quando informado)"""
+    groups = df[group_col].to_numpy() if group_col else None
+    return cv_fold_assignments(len(df), n_splits, n_repeats, groups=groups, random_state=random_state)
+
+
+def feature_subsets(df, target_var, candidates, method, criterion, max_features):
+    """Busca de subconjuntos de variáveis para o modelo linear"""
+    X, y = model_matrices(df, target_var, candidates)
+    return feature_subset_search(X, y, method=method, criterion=criterion, max_features=max_features)
+
+
+def cluster_matrix(df, features):
+    """Variáveis da clusterização, com valores ausentes preenchidos pela média"""
+    features = list(features)
+    return df[features].fillna(df[features].mean())
+
+
+def player_cluster_sweep(df, features, max_k, random_state=config.RANDOM_STATE):
+    """Inércia e silhouette por k"""
+    return cluster_sweep(cluster_matrix(df, features), range(2, max_k + 1), random_state=random_state)
+
+
+def player_clusters(df, features, n_clusters, random_state=config.RANDOM_STATE):
+    """Rótulos de cluster e perfis"""
+    return cluster_players(cluster_matrix(df, features), n_clusters, random_state=random_state)
+
+
+# ============================================================================
+# Testes de hipóteses
+# ============================================================================
+
+def correlation_test(df, x_col, y_col, min_rows=10):
+    """
+    Pearson entre duas colunas nas linhas completas: {'r', 'p_value', 'n', 'data'}.
+    None com até ``min_rows`` linhas ou variável constante (correlação indefinida,
+    ex.: gols de goleiros).
+    """
+    data = df[[x_col, y_col]].dropna()
+    if len(data) <= min_rows or (data.nunique() < 2).any():
+        return None
+    r, p_value = stats.pearsonr(data[x_col], data[y_col])
+    return {'r': float(r), 'p_value': float(p_value), 'n': len(data), 'data': data}
+
+
+def bootstrap_interval(df, kind, columns, groups=(), **kwargs):
+    """
+    Intervalos bootstrap (percentil e BCa).
+
+    ``correlation``: Pearson entre columns[0] e columns[1]; ``r_squared``: R² de
+    columns[1] explicado pelas categorias de columns[0] (η² da ANOVA);
+    ``mean_difference``: média de columns[1] no grupo groups[0] menos no groups[1].
+    """
+    x_col, y_col = columns
+    if kind == 'correlation':
+        return bootstrap_correlation(df[x_col], df[y_col], **kwargs)
+    if kind == 'r_squared':
+        data = df[[x_col, y_col]].dropna()
+        X = pd.get_dummies(data[x_col].astype(str), drop_first=True, dtype=float)
+        return bootstrap_r_squared(X, data[y_col], **kwargs)
+    if kind == 'mean_difference':
+        first, second = groups
+        return bootstrap_mean_difference(
+            df.loc[df[x_col] == first, y_col], df.loc[df[x_col] == second, y_col], **kwargs
+        )
+    raise ValueError(f"Tipo de bootstrap desconhecido: {kind}")
+
+
+def group_permutation_test(df, value_col, group_col, groups=None, ranks=False, **kwargs):
+    """
+    p-valor por permutação: F da ANOVA entre todos os grupos de ``group_col``
+    ou diferença de médias entre os dois ``groups`` informados. Com
+    ``ranks=True`` usa os postos da variável (alternativa ao Mann-Whitney).
+    """
+    data = df[[value_col, group_col]].dropna()
+    if groups is not None:
+        data = data[data[group_col].isin(groups)]
+    values = data[value_col].rank() if ranks else data[value_col]
+    return permutation_test(values.to_numpy(), data[group_col].astype(str).to_numpy(), **kwargs)
+
+
+def group_battery(df, value_col, group_col, min_size=3):
+    """Resumo por grupo e bateria ANOVA/Welch/Levene/Brown-Forsythe/Kruskal-Wallis"""
+    summary = group_summaries(df[value_col].to_numpy(), df[group_col].astype(str).to_numpy(), min_size=min_size)
+    if len(summary['labels']) < 2:
+        return summary, pd.DataFrame()
+    return summary, group_tests(summary)
+
+
+def group_posthoc(df, value_col, group_col, method, adjust='holm'):
+    """Comparações post-hoc de todos os pares sobre o mesmo resumo da bateria"""
+    summary, _ = group_battery(df, value_col, group_col)
+    return posthoc(summary, method=method, adjust=adjust)
+
+
+def extreme_groups(summary):
+    """(grupo de maior média, grupo de menor média) de um resumo por grupo"""
+    order = np.argsort(summary['means'])
+    return summary['labels'][order[-1]], summary['labels'][order[0]]
+
+
+def normality(df, columns, strata_col=None):
+    """Bateria de normalidade das colunas (Shapiro estratificado por ``strata_col``)"""
+    strata = df[strata_col].astype(str).to_numpy() if strata_col else None
+    return normality_battery(df, list(columns), strata=strata)
+
+
+def qq_points(df, column):
+    """Pontos do Q-Q plot reduzidos a um número fixo de quantis"""
+    return qq_quantiles(df[column].to_numpy())
+
+
+# ============================================================================
+# Insights
+# ============================================================================
+
+def key_insights(df):
+    """Principais descobertas em texto e os números por trás delas"""
+    insights, metrics = [], {}
+
+    xg_col = xg_column(df)
+    if xg_col in df.columns and 'Goals' in df.columns:
+        corr_xg = float(df[xg_col].corr(df['Goals']))
+        metrics['xg_goals_correlation'] = corr_xg
+        if abs(corr_xg) > 0.7:
+            insights.append(f"⚽ Expected Goals é um excelente preditor: Correlação de {corr_xg:.3f} com gols reais")
+
+    if 'Goals' in df.columns and len(df):
+        top_scorer_goals, avg_goals = float(df['Goals'].max()), float(df['Goals'].mean())
+        metrics['top_scorer_goals'] = top_scorer_goals
+        if avg_goals > 0:
+            insights.append(
+                f"🏆 Concentração de performance: O artilheiro máximo ({top_scorer_goals:.0f} gols) marca "
+                f"{top_scorer_goals / avg_goals:.1f}x mais que a média ({avg_goals:.1f} gols)"
+            )
+
+    if 'Pos' in df.columns and 'Goals' in df.columns:
+        pos_performance = df.groupby('Pos', observed=True)['Goals'].mean().sort_values(ascending=False)
+        if len(pos_performance) > 1:
+            metrics['best_position'] = str(pos_performance.index[0])
+            insights.append(
+                f"🎯 Posição mais efetiva: {pos_performance.index[0]} tem média de {pos_performance.iloc[0]:.1f} gols"
+            )
+
+    return insights, metrics
@@ -0,0 +1,533 @@
+"""
+📑 Relatório em lote do Premier League Analytics
+
+Roda o núcleo de cálculo de cada seção do dashboard sem Streamlit (as mesmas
+funções de ``analytics.py`` que os helpers em cache do dashboard usam), para um
+conjunto de presets de filtro (posições, times, temporadas), e grava os
+artefatos: um HTML por preset (tabelas + gráficos Plotly), JSON com as
+métricas e Parquet com as tabelas. As combinações preset × seção são
+distribuídas em um pool de processos; cada processo carrega o dataset e os
+índices uma única vez.
+
+    python batch_report.py --positions all --squads all --jobs 4
+"""
+
+import html
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
+
+import analytics
+import config
+from data_store import _parquet_available, frame_fingerprint, ingest_sources, load_partitions, load_prepared_data
+from filters import FilterIndex, take_rows
+from plotting import box_figure, histogram_figure, scatter_figure
+from posthoc import posthoc
+from scouting import ScoutingEngine
+from stats_engine import correlation_significance, group_summary_table
+from team_cube import SquadCube
+
+
+# ============================================================================
+# Seções do relatório (cálculos compartilhados em analytics.py)
+# ============================================================================
+
+def _present(df, columns):
+    return [col for col in columns if col in df.columns]
+
+
+def overview_section(df, engine):
+    """Métricas gerais, estatísticas descritivas e distribuições (🏠 Visão Geral)"""
+    _, variables = analytics.descriptive_variables(df)
+    tables = {
+        'descriptive': analytics.descriptive_stats(df, variables),
+        'variability': analytics.variability_summary(df, variables)
+    }
+    figures = {}
+    if 'Pos' in df.columns:
+        tables['positions'] = df['Pos'].value_counts().rename('players').to_frame()
+    if 'Goals' in df.columns:
+        figures['goals_histogram'] = histogram_figure(*analytics.histogram(df, 'Goals', 20), "Distribuição de Gols", "Gols")
+        if 'Pos' in df.columns:
+            figures['goals_by_position'] = box_figure(
+                analytics.box_summary(df, 'Goals', 'Pos'), "Gols por Posição", "Posição", "Gols"
+            )
+    return {'metrics': analytics.overview_metrics(df), 'tables': tables, 'figures': figures}
+
+
+def exploratory_section(df, engine):
+    """Correlações com FDR, Hall da Fama e xG × gols (🔍 Análise Exploratória)"""
+    variables = _present(df, config.SECTION_CONFIG['exploratory']['default_correlation_vars'])
+    correlations = correlation_significance(df, variables)
+    pairs = correlations['pairs']
+    tables = {'correlation_pearson': correlations['pearson'], 'correlation_pairs': pairs}
+
+    view_ids = df.index.to_numpy()
+    view_key = frame_fingerprint(df)
+    for metric in _present(df, ['Goals', 'Assists', 'Expected_Goals']):
+        query = {'rank_by': metric, 'top_n': config.DEFAULT_TOP_N}
+        tables[f'top_{metric.lower()}'] = engine.run(query, within=view_ids, view_key=view_key).drop(columns='row_id')
+
+    figures = {}
+    xg_col = analytics.xg_column(df)
+    if {xg_col, 'Goals'} <= set(df.columns):
+        figures['xg_scatter'] = scatter_figure(
+            df, xg_col, 'Goals', title="Expected Goals vs Gols Reais", trendline=True
+        )
+    metrics = {
+        'pairs': len(pairs),
+        'significant_pairs_fdr': int(((pairs['pearson_q'] < config.ALPHA) | (pairs['spearman_q'] < config.ALPHA)).sum())
+    }
+    return {'metrics': metrics, 'tables': tables, 'figures': figures}
+
+
+def teams_section(df, engine):
+    """Ranking da liga e tabelas time × posição do cubo de times (🏟️ Análise por Times)"""
+    cube = SquadCube(df)
+    tables = {
+        'league_table': cube.league_table,
+        'goals_by_position': cube.position_table('Goals'),
+        'mean_goals_by_position': cube.position_table('Goals', how='mean')
+    }
+    leaders = []
+    for squad in cube.league_table.index:
+        record = cube.team(squad)
+        scorer, assistant = record['top_scorer'] or (None, None), record['top_assistant'] or (None, None)
+        leaders.append({
+            'Squad': squad, 'Jogadores': record['players'],
+            'Artilheiro': scorer[0], 'Gols': scorer[1],
+            'Garçom': assistant[0], 'Assistências': assistant[1]
+        })
+    leaders = pd.DataFrame(leaders)
+    tables['leaders'] = leaders
+    metrics = {'teams': len(cube.league_table)}
+    if len(cube.league_table):
+        metrics['top_team'] = str(cube.league_table.index[0])
+        metrics['top_team_goals'] = float(cube.league_table['Gols Totais'].iloc[0])
+    return {'metrics': metrics, 'tables': tables, 'figures': {}}
+
+
+def modeling_section(df, engine):
+    """OLS treino/teste e validação cruzada com as variáveis padrão (📈 Modelagem Linear)"""
+    settings = config.SECTION_CONFIG['modeling']
+    target = settings['default_target']
+    features = _present(df, settings['default_features'])
+    if target not in df.columns or not features or len(df) < settings['min_samples']:
+        return {'metrics': {'skipped': f"Dados insuficientes para modelagem ({len(df)} linhas)"}, 'tables': {}, 'figures': {}}
+
+    fit = analytics.train_linear_model(df, target, features)
+    folds = analytics.fold_assignments(df, config.REPORT_CV_FOLDS)
+    fold_metrics, cv_summary = analytics.cross_validate_linear_model(df, target, features, folds, n_jobs=1)
+
+    metrics = {
+        'target': target,
+        'features': features,
+        'n_train': fit['n_train'],
+        'n_test': fit['n_test'],
+        'r2_train': fit['r2_train'],
+        'r2_test': fit['r2_test'],
+        'adj_r2': fit['rsquared_adj'],
+        'rmse_test': fit['rmse_test'],
+        'mae_test': fit['mae_test'],
+        'f_pvalue': fit['f_pvalue'],
+        'cv_r2_mean': float(cv_summary.loc['r2_test', 'mean']),
+        'cv_rmse_mean': float(cv_summary.loc['rmse_test', 'mean'])
+    }
+    tables = {'coefficients': fit['summary'], 'cv_folds': fold_metrics, 'cv_summary': cv_summary}
+    return {'metrics': metrics, 'tables': tables, 'figures': {}}
+
+
+def _correlation_test(df, x_col, y_col, label):
+    test = analytics.correlation_test(df, x_col, y_col)
+    if test is None:
+        return None
+    boot = analytics.bootstrap_interval(df, 'correlation', (x_col, y_col), n_jobs=1)
+    return {
+        'test': label, 'statistic': test['r'], 'p_value': test['p_value'],
+        'ci_lower': boot['bca'][0], 'ci_upper': boot['bca'][1],
+        'significant': bool(test['p_value'] < config.ALPHA)
+    }
+
+
+def hypothesis_section(df, engine):
+    """H1 (xG × gols), H2 (gols por posição, com post-hoc) e H3 (idade × gols) (🧪 Testes de Hipóteses)"""
+    rows, tables = [], {}
+
+    if {'Expected_Goals', 'Goals'} <= set(df.columns):
+        rows.append(_correlation_test(df, 'Expected_Goals', 'Goals', 'H1: xG prediz gols (Pearson)'))
+
+    if {'Pos', 'Goals'} <= set(df.columns):
+        summary, battery = analytics.group_battery(df, 'Goals', 'Pos')
+        if not battery.empty:
+            anova = battery.set_index('test').loc['ANOVA (one-way)']
+            permutation = analytics.group_permutation_test(df, 'Goals', 'Pos', n_jobs=1)
+            rows.append({
+                'test': 'H2: gols diferem entre posições (ANOVA)', 'statistic': float(anova['statistic']),
+                'p_value': float(anova['p_value']), 'p_permutation': permutation['p_value'],
+                'significant': bool(anova['p_value'] < config.ALPHA)
+            })
+            comparisons = posthoc(summary, method='games_howell')
+            tables.update({
+                'position_summary': group_summary_table(summary),
+                'position_battery': battery,
+                'posthoc_pairs': comparisons['pairs'],
+                'posthoc_letters': comparisons['letters'].to_frame()
+            })
+
+    if {'Age', 'Goals'} <= set(df.columns):
+        rows.append(_correlation_test(df, 'Age', 'Goals', 'H3: idade × gols (Pearson)'))
+
+    tests = pd.DataFrame([row for row in rows if row is not None])
+    tables['tests'] = tests
+    metrics = {
+        'tests': len(tests),
+        'significant': int(tests['significant'].sum()) if len(tests) else 0
+    }
+    return {'metrics': metrics, 'tables': tables, 'figures': {}}
+
+
+def insights_section(df, engine):
+    """Principais descobertas em texto (💡 Insights e Soluções)"""
+    insights, metrics = analytics.key_insights(df)
+    metrics['insights'] = insights
+    return {'metrics': metrics, 'tables': {}, 'figures': {}}
+
+
+SECTIONS = {
+    'overview': ("🏠 Visão Geral", overview_section),
+    'exploratory': ("🔍 Análise Exploratória", exploratory_section),
+    'teams': ("🏟️ Análise por Times", teams_section),
+    'modeling': ("📈 Modelagem Linear", modeling_section),
+    'hypothesis': ("🧪 Testes de Hipóteses", hypothesis_section),
+    'insights': ("💡 Insights e Soluções", insights_section)
+}
+
+
+# ============================================================================
+# Presets de filtro
+# ============================================================================
+
+def slugify(name):
+    slug = re.sub(r'[^0-9A-Za-z]+', '-', name).strip('-').lower()
+    return slug or 'preset'
+
+
+def build_presets(filter_index, positions=(), squads=(), seasons=(), extra=()):
+    """
+    Presets {'name', 'filters'}: o dataset inteiro, um por valor pedido de
+    posição/time/temporada (``'all'`` = todos os valores indexados) e os
+    presets extras (ex.: lidos de um JSON).
+    """
+    presets = [{'name': 'Geral', 'filters': {}}]
+    for column, values in (('Pos', positions), ('Squad', squads), ('Season', seasons)):
+        if list(values) == ['all']:
+            values = filter_index.categories(column)
+        presets.extend({'name': f"{column} {value}", 'filters': {column: [value]}} for value in values)
+    presets.extend(extra)
+    return presets
+
+
+# ============================================================================
+# Pool de processos
+# ============================================================================
+
+_WORKER = {}
+
+
+def ingest_store():
+    """
+    Ingestão do store particionado, feita uma única vez no processo principal.
+
+    Sem exportações ingeridas, o CSV principal é preparado aqui para que os
+    processos do pool apenas leiam o cache em disco.
+    """
+    store = ingest_sources(config.DATA_SOURCES)
+    if not store:
+        load_prepared_data(config.DATA_PATH)
+    return store
+
+
+def load_dataset(store, competitions=(), seasons=()):
+    """Dataset preparado a partir das partições do store (ou do CSV principal)"""
+    df = load_partitions(store, competitions, seasons)
+    if df is None:
+        df, _ = load_prepared_data(config.DATA_PATH)
+    return df
+
+
+def _init_worker(store, competitions, seasons):
+    """Lê dataset, índice de filtros e motor de scouting uma vez por processo (sem reingerir)"""
+    df = load_dataset(store, competitions, seasons)
+    _WORKER.update({'df': df, 'filter_index': FilterIndex(df), 'engine': ScoutingEngine(df)})
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return None if not math.isfinite(value) else float(value)
+    return value
+
+
+def run_section(preset, section, min_minutes=0):
+    """Executa uma seção sobre o preset; figuras saem prontas como fragmentos HTML"""
+    df, filter_index = _WORKER['df'], _WORKER['filter_index']
+    predicates = dict(preset['filters'])
+    if min_minutes:
+        predicates['Minutes'] = (min_minutes, None)
+
+    started = time.perf_counter()
+    try:
+        view = take_rows(df, filter_index.query(**predicates))
+        if view.empty:
+            raise ValueError("Nenhum jogador no preset")
+        result = SECTIONS[section][1](view, _WORKER['engine'])
+        result['figures'] = {
+            name: pio.to_html(fig, full_html=False, include_plotlyjs=False)
+            for name, fig in result['figures'].items()
+        }
+        result['rows'] = len(view)
+        result['error'] = None
+    except Exception as e:
+        result = {'metrics': {}, 'tables': {}, 'figures': {}, 'rows': None, 'error': str(e)}
+    result['metrics'] = _jsonable(result['metrics'])
+    result['seconds'] = time.perf_counter() - started
+    return preset['name'], section, result
+
+
+# ============================================================================
+# Artefatos
+# ============================================================================
+
+def _flat_table(table):
+    """Tabela com colunas em texto e índice como coluna (exigência do Parquet)"""
+    table = table.reset_index() if not isinstance(table.index, pd.RangeIndex) else table.copy()
+    table.columns = [str(col) for col in table.columns]
+    for col in table.columns:
+        if table[col].dtype == object:
+            table[col] = table[col].map(lambda v: v if v is None or isinstance(v, str) else str(v))
+    return table
+
+
+def write_tables(results, directory, parquet=True):
+    """Uma tabela por arquivo: ``<seção>__<tabela>.parquet`` (CSV sem engine Parquet)"""
+    written = []
+    for section, result in results.items():
+        for name, table in result['tables'].items():
+            flat = _flat_table(table)
+            path = os.path.join(directory, f"{section}__{name}.{'parquet' if parquet else 'csv'}")
+            if parquet:
+                flat.to_parquet(path, index=False)
+            else:
+                flat.to_csv(path, index=False)
+            written.append(os.path.basename(path))
+    return written
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="https://cdn.plot.ly/plotly-{plotly_version}.min.js"></script>
+<style>
+    body {{ font-family: 'Segoe UI', sans-serif; margin: 2rem auto; max-width: 1200px; color: #1f2937; }}
+    .main-header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;
+                    padding: 1.5rem 2rem; border-radius: 15px; }}
+    .metric-card {{ display: inline-block; background: #f8f9ff; border-left: 4px solid #667eea;
+                    padding: 0.5rem 1rem; margin: 0.25rem; border-radius: 8px; }}
+    .warning-box {{ background: #fff3cd; border-left: 5px solid #ffc107; padding: 1rem; border-radius: 10px; }}
+    table {{ border-collapse: collapse; margin: 0.5rem 0 1.5rem 0; font-size: 0.85em; }}
+    th, td {{ border: 1px solid #e5e7eb; padding: 0.25rem 0.5rem; text-align: right; }}
+    th {{ background: #f3f4f6; }}
+</style>
+</head>
+<body>
+<div class="main-header"><h1>{title}</h1><p>{subtitle}</p></div>
+{body}
+</body>
+</html>
+"""
+
+
+def _metric_html(name, value):
+    if isinstance(value, float):
+        value = f"{value:.4g}"
+    elif isinstance(value, list):
+        value = ', '.join(map(str, value))
+    return f'<div class="metric-card"><strong>{html.escape(str(name))}</strong>: {html.escape(str(value))}</div>'
+
+
+def render_html(preset, results, generated_at):
+    """Página HTML do preset: métricas, tabelas e gráficos de cada seção"""
+    parts = []
+    for section, (title, _) in SECTIONS.items():
+        if section not in results:
+            continue
+        result = results[section]
+        parts.append(f"<h2>{html.escape(title)}</h2>")
+        if result['error']:
+            parts.append(f'<div class="warning-box">⚠️ Erro na seção: {html.escape(result["error"])}</div>')
+            continue
+        insights = result['metrics'].get('insights', [])
+        parts.extend(_metric_html(k, v) for k, v in result['metrics'].items() if k != 'insights')
+        parts.extend(f"<p>{html.escape(text)}</p>" for text in insights)
+        parts.extend(result['figures'].values())
+        for name, table in result['tables'].items():
+            parts.append(f"<h4>{html.escape(name)}</h4>")
+            parts.append(table.head(50).to_html(float_format=lambda v: f"{v:.4g}", border=0))
+    filters = ', '.join(f"{k}: {', '.join(map(str, v))}" for k, v in preset['filters'].items()) or 'Sem filtros'
+    return _PAGE.format(
+        title=html.escape(f"⚽ Premier League Analytics — {preset['name']}"),
+        subtitle=html.escape(f"{filters} · gerado em {generated_at}"),
+        plotly_version=get_plotlyjs_version(),
+        body='\n'.join(parts)
+    )
+
+
+def write_preset(preset, results, out_dir, formats, generated_at, parquet):
+    """Grava os artefatos de um preset em ``out_dir/<slug>/``"""
+    directory = os.path.join(out_dir, slugify(preset['name']))
+    os.makedirs(directory, exist_ok=True)
+    artifacts = []
+    if 'html' in formats:
+        with open(os.path.join(directory, 'report.html'), 'w', encoding='utf-8') as fh:
+            fh.write(render_html(preset, results, generated_at))
+        artifacts.append('report.html')
+    if 'json' in formats:
+        summary = {
+            'preset': preset,
+            'generated_at': generated_at,
+            'sections': {
+                section: {
+                    'rows': result['rows'], 'seconds': result['seconds'],
+                    'error': result['error'], 'metrics': result['metrics']
+                }
+                for section, result in results.items()
+            }
+        }
+        with open(os.path.join(directory, 'summary.json'), 'w', encoding='utf-8') as fh:
+            json.dump(summary, fh, ensure_ascii=False, indent=2)
+        artifacts.append('summary.json')
+    if 'parquet' in formats:
+        artifacts.extend(write_tables(results, directory, parquet=parquet))
+    return directory, artifacts
+
+
+# ============================================================================
+# Execução
+# ============================================================================
+
+def generate_reports(presets, sections=tuple(SECTIONS), out_dir=config.REPORT_DIR, formats=('html', 'json', 'parquet'),
+                     competitions=(), seasons=(), min_minutes=0, n_jobs=config.N_JOBS, progress=None, store=None):
+    """
+    Executa todas as combinações preset × seção em um pool de processos e
+    grava os artefatos de cada preset assim que suas seções terminam.
+    ``store`` é o manifesto de ``ingest_store`` (ingerido aqui se omitido).
+    Retorna o manifesto (também gravado em ``out_dir/manifest.json``).
+    """
+    started = time.perf_counter()
+    generated_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    os.makedirs(out_dir, exist_ok=True)
+    parquet = _parquet_available()
+    by_name = {preset['name']: preset for preset in presets}
+    pending = {name: set(sections) for name in by_name}
+    collected = {name: {} for name in by_name}
+    manifest = {'generated_at': generated_at, 'sections': list(sections), 'presets': []}
+    if store is None:
+        store = ingest_store()
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(store, tuple(competitions), tuple(seasons))) as executor:
+        futures = [
+            executor.submit(run_section, preset, section, min_minutes)
+            for preset in presets for section in sections
+        ]
+        for future in as_completed(futures):
+            name, section, result = future.result()
+            collected[name][section] = result
+            pending[name].discard(section)
+            if progress:
+                progress(name, section, result)
+            if pending[name]:
+                continue
+
+            # Ordem das seções no relatório = ordem pedida, não a de conclusão
+            results = {s: collected[name][s] for s in sections}
+            directory, artifacts = write_preset(by_name[name], results, out_dir, formats, generated_at, parquet)
+            manifest['presets'].append({
+                'name': name,
+                'filters': by_name[name]['filters'],
+                'directory': os.path.relpath(directory, out_dir),
+                'artifacts': artifacts,
+                'errors': {s: r['error'] for s, r in results.items() if r['error']}
+            })
+            del collected[name]
+
+    manifest['presets'].sort(key=lambda entry: list(by_name).index(entry['name']))
+    manifest['seconds'] = time.perf_counter() - started
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as fh:
+        json.dump(_jsonable(manifest), fh, ensure_ascii=False, indent=2)
+    if 'html' in formats:
+        links = '\n'.join(
+            f'<li><a href="{html.escape(entry["directory"])}/report.html">{html.escape(entry["name"])}</a>'
+            f'{" ⚠️" if entry["errors"] else ""}</li>'
+            for entry in manifest['presets']
+        )
+        with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as fh:
+            fh.write(_PAGE.format(
+                title="⚽ Premier League Analytics — Relatórios",
+                subtitle=html.escape(f"{len(presets)} presets · gerado em {generated_at}"),
+                plotly_version=get_plotlyjs_version(),
+                body=f"<ul>{links}</ul>"
+            ))
+    return manifest
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Relatório em lote de todas as seções, sem Streamlit")
+    parser.add_argument('--positions', nargs='*', default=[], help="Um preset por posição ('all' = todas)")
+    parser.add_argument('--squads', nargs='*', default=[], help="Um preset por time ('all' = todos)")
+    parser.add_argument('--seasons', nargs='*', default=[], help="Um preset por temporada ('all' = todas)")
+    parser.add_argument('--presets', help="JSON com presets extras: [{\"name\": ..., \"filters\": {\"Pos\": [...]}}]")
+    parser.add_argument('--competitions', nargs='*', default=[], help="Competições carregadas (padrão: todas)")
+    parser.add_argument('--min-minutes', type=int, default=0, help="Minutos mínimos em todos os presets")
+    parser.add_argument('--sections', nargs='*', default=list(SECTIONS), choices=list(SECTIONS), help="Seções executadas")
+    parser.add_argument('--formats', nargs='*', default=['html', 'json', 'parquet'], choices=['html', 'json', 'parquet'])
+    parser.add_argument('--out', default=config.REPORT_DIR, help="Diretório de saída")
+    parser.add_argument('--jobs', type=int, default=config.N_JOBS, help="Processos paralelos")
+    args = parser.parse_args()
+
+    extra = []
+    if args.presets:
+        with open(args.presets, encoding='utf-8') as fh:
+            extra = json.load(fh)
+    store = ingest_store()
+    presets = build_presets(
+        FilterIndex(load_dataset(store, args.competitions)), args.positions, args.squads, args.seasons, extra
+    )
+
+    def report_progress(name, section, result):
+        status = f"erro: {result['error']}" if result['error'] else f"{result['seconds']:.2f}s"
+        print(f"  {name} · {section} · {status}")
+
+    print(f"{len(presets)} presets × {len(args.sections)} seções")
+    manifest = generate_reports(
+        presets, args.sections, args.out, args.formats, competitions=args.competitions,
+        min_minutes=args.min_minutes, n_jobs=args.jobs, progress=report_progress, store=store
+    )
+    print(f"Relatórios em {args.out}/ ({manifest['seconds']:.1f}s)")
@@ -0,0 +1,297 @@
+"""
+🗄️ Caches em memória do Premier League Analytics
+
+LRU com orçamento de memória, compartilhado entre sessões do Streamlit (via
+st.cache_resource), e os caches construídos sobre ele: registro de modelos
+ajustados e figuras Plotly serializadas. Também contabiliza acertos/erros das
+funções cacheadas com st.cache_data, que não expõe essas estatísticas.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+import config
+
+
+def estimate_size(obj, _seen=None):
+    """Estimativa (em bytes) da memória ocupada por um objeto e seus atributos"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, _seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        # Modelos sklearn/statsmodels guardam arrays em atributos
+        return sys.getsizeof(obj) + estimate_size(vars(obj), _seen)
+    return sys.getsizeof(obj)
+
+
+class LRUCache:
+    """Cache LRU thread-safe limitado por número de entradas e por bytes"""
+
+    def __init__(self, max_bytes, max_entries=None, sizeof=estimate_size):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+
+            # Entradas maiores que o orçamento inteiro não são guardadas
+            if size > self.max_bytes:
+                evicted = [(key, value)]
+            else:
+                self._entries[key] = value
+                self._sizes[key] = size
+                self.total_bytes += size
+                evicted = self._evict()
+
+        # Ganchos de remoção rodam fora do lock (podem fazer I/O)
+        for evicted_key, evicted_value in evicted:
+            self._on_evict(evicted_key, evicted_value)
+        return value
+
+    def _evict(self):
+        evicted = []
+        while self._entries and (
+            self.total_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key, value = self._entries.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(key)
+            self.evictions += 1
+            evicted.append((key, value))
+        return evicted
+
+    def _on_evict(self, key, value):
+        """Chamado para cada entrada removida (ou recusada por tamanho); padrão: descarta"""
+
+    def latest(self):
+        """Par (chave, valor) usado mais recentemente, ou None se vazio (não conta como acesso)"""
+        with self._lock:
+            if not self._entries:
+                return None
+            return next(reversed(self._entries.items()))
+
+    def get_or_compute(self, key, compute):
+        """Retorna o valor em cache ou calcula (fora do lock) e armazena"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'megabytes': self.total_bytes / 2 ** 20,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class ModelRegistry(LRUCache):
+    """
+    Registro de modelos ajustados (coeficientes, inferência, predições e métricas).
+
+    A chave é determinística: (impressão digital dos dados, alvo, variáveis,
+    tamanho do teste, seed). Mover apenas os sliders do simulador reaproveita o
+    ajuste e custa só uma predição.
+    """
+
+    def __init__(self, max_mb=config.MODEL_CACHE_MAX_MB, max_entries=config.MODEL_CACHE_MAX_ENTRIES):
+        super().__init__(max_bytes=int(max_mb * 2 ** 20), max_entries=max_entries)
+
+    @staticmethod
+    def make_key(fingerprint, target, features, test_size, random_state):
+        return (fingerprint, target, tuple(features), round(float(test_size), 4), int(random_state))
+
+    def get_or_fit(self, fingerprint, target, features, test_size, random_state, fit):
+        key = self.make_key(fingerprint, target, features, test_size, random_state)
+        return self.get_or_compute(key, fit)
+
+
+class FigureCache(LRUCache):
+    """
+    Figuras Plotly serializadas (JSON), compartilhadas entre sessões.
+
+    A chave combina seção, id do gráfico, impressão digital dos dados,
+    parâmetros do gráfico e tema; o orçamento é o tamanho do JSON. Com
+    ``spill_dir``, figuras removidas do LRU são gravadas em disco e recarregadas
+    de lá em vez de reconstruídas.
+    """
+
+    def __init__(self, max_mb=config.FIGURE_CACHE_MAX_MB, spill_dir=config.FIGURE_CACHE_DIR):
+        super().__init__(max_bytes=int(max_mb * 2 ** 20), sizeof=len)
+        self.spill_dir = spill_dir
+        self.disk_hits = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(section, chart_id, fingerprint, params, theme):
+        payload = json.dumps([section, chart_id, fingerprint, params, theme], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.json")
+
+    def _on_evict(self, key, value):
+        if not self.spill_dir:
+            return
+        path = self._spill_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                fh.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _load_spilled(self, key):
+        if not self.spill_dir:
+            return None
+        try:
+            with open(self._spill_path(key), encoding='utf-8') as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def get_json(self, key, build_json):
+        """JSON da figura: memória → disco → ``build_json()``"""
+        sentinel = object()
+        payload = self.get(key, sentinel)
+        if payload is sentinel:
+            payload = self._load_spilled(key)
+            if payload is not None:
+                self.disk_hits += 1
+            else:
+                payload = build_json()
+            self.put(key, payload)
+        return payload
+
+    def get_or_build(self, section, chart_id, fingerprint, params, theme, build):
+        """
+        Especificação da figura (dict pronto para ``st.plotly_chart``), do cache
+        ou construída por ``build()``. Devolver o dict evita validar a figura
+        duas vezes: o Streamlit já reconstrói e valida o que recebe.
+        """
+        key = self.make_key(section, chart_id, fingerprint, params, theme)
+        return json.loads(self.get_json(key, lambda: pio.to_json(build(), validate=False)))
+
+    def stats(self):
+        return {**super().stats(), 'disk_hits': self.disk_hits}
+
+
+class CallStats:
+    """
+    Acertos/erros de funções cacheadas por um decorador externo (st.cache_data).
+
+    ``track(decorator)`` conta cada chamada por fora do cache e cada execução
+    real por dentro; a diferença são os acertos. Fica em nível de módulo para
+    sobreviver aos reruns do script do Streamlit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.computes = Counter()
+
+    def track(self, cache_decorator):
+        def decorate(func):
+            name = func.__name__
+
+            @functools.wraps(func)
+            def computed(*args, **kwargs):
+                with self._lock:
+                    self.computes[name] += 1
+                return func(*args, **kwargs)
+
+            cached = cache_decorator(computed)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self._lock:
+                    self.calls[name] += 1
+                return cached(*args, **kwargs)
+
+            wrapper.clear = getattr(cached, 'clear', None)
+            return wrapper
+        return decorate
+
+    def stats(self):
+        """Uma linha por função: chamadas, acertos, erros e taxa de acerto"""
+        with self._lock:
+            rows = []
+            for name, calls in sorted(self.calls.items()):
+                misses = min(self.computes[name], calls)
+                rows.append({
+                    'function': name,
+                    'calls': calls,
+                    'hits': calls - misses,
+                    'misses': misses,
+                    'hit_rate': (calls - misses) / calls if calls else 0.0
+                })
+        return pd.DataFrame(rows, columns=['function', 'calls', 'hits', 'misses', 'hit_rate'])
+
+
+# Contadores das funções de análise do dashboard (um por processo)
+analytics_stats = CallStats()
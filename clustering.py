@@ -0,0 +1,104 @@
+"""
+🧩 Clusterização de jogadores do Premier League Analytics
+
+K-Means sobre variáveis padronizadas para identificar perfis (arquétipos) de
+jogadores. Frames grandes usam MiniBatchKMeans; a varredura de k calcula o
+silhouette sobre uma amostra e distribui os valores de k entre processos.
+Sem dependência do Streamlit.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+import config
+
+
+def standardize(X):
+    """Padroniza colunas (média 0, desvio 1); colunas constantes ficam em 0"""
+    X = np.asarray(X, dtype=np.float64)
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std = np.where(std > 0, std, 1.0)
+    return (X - mean) / std, mean, std
+
+
+def make_kmeans(n_rows, k, random_state=config.RANDOM_STATE):
+    """KMeans completo ou MiniBatchKMeans, conforme o tamanho do frame"""
+    if n_rows >= config.CLUSTER_MINIBATCH_ROWS:
+        return MiniBatchKMeans(
+            n_clusters=k,
+            batch_size=config.CLUSTER_BATCH_SIZE,
+            n_init=3,
+            random_state=random_state
+        )
+    return KMeans(n_clusters=k, n_init=10, random_state=random_state)
+
+
+def _sweep_point(Z, k, sample, random_state):
+    """Inércia e silhouette (amostral) para um valor de k (executa em processo filho)"""
+    model = make_kmeans(len(Z), k, random_state).fit(Z)
+    labels = model.labels_[sample]
+    silhouette = silhouette_score(Z[sample], labels) if len(np.unique(labels)) > 1 else np.nan
+    return {'k': k, 'inertia': float(model.inertia_), 'silhouette': float(silhouette)}
+
+
+def cluster_sweep(X, k_values=range(2, 11), sample_size=config.CLUSTER_SILHOUETTE_SAMPLE,
+                  random_state=config.RANDOM_STATE, n_jobs=config.N_JOBS):
+    """
+    Curva do cotovelo (inércia) e silhouette para cada k.
+
+    O silhouette é O(n²), então é calculado sobre uma amostra fixa de até
+    ``sample_size`` linhas, a mesma para todos os k. Os valores de k rodam em
+    paralelo quando o volume passa de ``config.CLUSTER_PARALLEL_MIN_ROWS``.
+    """
+    Z, _, _ = standardize(X)
+    k_values = [k for k in k_values if 1 < k < len(Z)]
+    rng = np.random.default_rng(random_state)
+    sample = np.sort(rng.choice(len(Z), size=min(sample_size, len(Z)), replace=False))
+
+    if len(k_values) > 1 and len(Z) * len(k_values) >= config.CLUSTER_PARALLEL_MIN_ROWS:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            rows = list(executor.map(
+                _sweep_point, [Z] * len(k_values), k_values,
+                [sample] * len(k_values), [random_state] * len(k_values)
+            ))
+    else:
+        rows = [_sweep_point(Z, k, sample, random_state) for k in k_values]
+
+    return pd.DataFrame(rows, columns=['k', 'inertia', 'silhouette'])
+
+
+def cluster_players(X, k, random_state=config.RANDOM_STATE):
+    """
+    Agrupa os jogadores em k perfis.
+
+    Retorna um dicionário com os rótulos, os centróides em unidades originais
+    e padronizadas (z-scores, usados no mapa de perfis), o tamanho de cada
+    cluster e as duas primeiras componentes principais para visualização.
+    """
+    names = list(X.columns) if hasattr(X, 'columns') else [f"x{i}" for i in range(np.shape(X)[1])]
+    Z, mean, std = standardize(X)
+    model = make_kmeans(len(Z), k, random_state).fit(Z)
+    labels = model.labels_.astype(np.int16)
+
+    # PCA via SVD dos dados padronizados
+    _, singular, components = np.linalg.svd(Z, full_matrices=False)
+    n_components = min(2, len(singular))
+    pcs = Z @ components[:n_components].T
+    explained = singular ** 2 / (singular ** 2).sum() if singular.sum() > 0 else np.zeros_like(singular)
+
+    centers_z = pd.DataFrame(model.cluster_centers_, columns=names)
+    return {
+        'labels': labels,
+        'centers': centers_z * std + mean,
+        'centers_z': centers_z,
+        'sizes': np.bincount(labels, minlength=k),
+        'inertia': float(model.inertia_),
+        'pcs': pcs,
+        'explained_variance': explained[:n_components],
+        'minibatch': isinstance(model, MiniBatchKMeans)
+    }
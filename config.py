@@ -4,6 +4,29 @@
 MIN_MINUTES_FILTER = 50  # Minutos mínimos para considerar um jogador
 DEFAULT_TEST_SIZE = 0.2  # Proporção padrão para teste
 RANDOM_STATE = 42  # Seed para reprodutibilidade
+DATA_PATH = 'dataset.csv'  # Arquivo de dados principal
+CACHE_DIR = '.cache'  # Diretório do cache persistente de dados preparados
+
+# 🗂️ Ingestão de múltiplas temporadas/competições
+DATA_SOURCES = 'data/**/*.csv'  # Diretório ou glob das exportações FBref (fallback: DATA_PATH)
+DATA_STORE_DIR = '.cache/store'  # Store particionado por competição/temporada
+DEFAULT_SEASON = '2023-2024'  # Temporada atribuída quando não dá para deduzir do nome do arquivo
+DEFAULT_COMPETITION = 'Premier League'  # Competição padrão
+N_JOBS = None  # Processos paralelos (None = todos os núcleos)
+
+# Mapeamento de colunas para nomes mais intuitivos
+COLUMN_MAPPING = {
+    'Gls': 'Goals',
+    'Ast': 'Assists',
+    'Min': 'Minutes',
+    'MP': 'Matches_Played',
+    '90s': 'Ninety_Minutes',
+    'G+A': 'Goals_Assists',
+    'xG': 'Expected_Goals',
+    'xAG': 'Expected_Assists',
+    'CrdY': 'Yellow_Cards',
+    'CrdR': 'Red_Cards'
+}
 
 # 🎨 Configurações visuais
 PLOTLY_CONFIG = {
@@ -21,6 +44,53 @@ PLOTLY_CONFIG = {
 # 📈 Configurações de modelagem
 TARGET_VARIABLES = ['Goals', 'Assists', 'Total_Contributions', 'Performance_Index']
 FEATURE_BLACKLIST = ['_Category', 'Player', 'Squad', 'Nation', 'Pos']
+MODEL_CACHE_MAX_MB = 256  # Orçamento de memória do registro de modelos ajustados
+MODEL_CACHE_MAX_ENTRIES = 64  # Máximo de modelos mantidos (LRU)
+FIGURE_CACHE_MAX_MB = 64  # Orçamento de memória do cache de figuras (JSON serializado)
+FIGURE_CACHE_DIR = None  # Diretório para despejar figuras removidas do LRU (None = apenas memória)
+SUBSET_MAX_CANDIDATES = 2_000_000  # Limite de combinações na busca exaustiva de variáveis
+SUBSET_CHUNK_SIZE = 20_000  # Combinações avaliadas por lote
+SUBSET_PARALLEL_THRESHOLD = 100_000  # A partir daqui os lotes vão para um pool de processos
+CV_PARALLEL_MIN_ROWS = 200_000  # Linhas × repetições a partir das quais a validação cruzada usa processos
+CLUSTER_MINIBATCH_ROWS = 20_000  # A partir daqui o K-Means usa MiniBatchKMeans
+CLUSTER_BATCH_SIZE = 4096  # Tamanho do lote do MiniBatchKMeans
+CLUSTER_SILHOUETTE_SAMPLE = 5_000  # Linhas amostradas para o silhouette
+CLUSTER_PARALLEL_MIN_ROWS = 100_000  # Linhas × valores de k a partir dos quais a varredura usa processos
+BOOTSTRAP_RESAMPLES = 10_000  # Reamostras bootstrap padrão
+BOOTSTRAP_BATCH_ELEMENTS = 4_000_000  # Reamostras × linhas por lote (limita a memória)
+BOOTSTRAP_PARALLEL_MIN_ELEMENTS = 50_000_000  # A partir daqui as reamostras são divididas entre processos
+BOOTSTRAP_JACKKNIFE_BLOCKS = 200  # Blocos do jackknife usado na aceleração do BCa
+PERMUTATION_MAX = 100_000  # Máximo de permutações (ou de divisões no teste exato)
+PERMUTATION_ROUND = 2_000  # Permutações por rodada antes de checar a parada antecipada
+PERMUTATION_PRECISION = 0.002  # Meia-largura (99%) do p-valor que encerra o teste
+PERMUTATION_BATCH_ELEMENTS = 4_000_000  # Permutações × linhas por lote (limita a memória)
+PERMUTATION_PARALLEL_MIN_ELEMENTS = 20_000_000  # Linhas × permutações por rodada para usar processos
+NORMALITY_CHUNK_ROWS = 100_000  # Linhas por bloco no cálculo dos momentos
+SHAPIRO_MAX_SAMPLE = 5_000  # Limite prático do Shapiro-Wilk (subamostra estratificada acima disso)
+QQ_POINTS = 200  # Quantis usados no gráfico Q-Q
+TEAM_MINUTES_BINS = (0, 500, 1000, 1500, 2000, 2500, 3000, float('inf'))  # Faixas de minutos no cubo de times
+TEAM_CUBE_MAX_ENTRIES = 16  # Cubos de times mantidos (um por impressão digital)
+PLAYER_SEARCH_LIMIT = 20  # Resultados exibidos na busca de jogadores
+SIMILARITY_FEATURES = (  # Perfil por 90 minutos usado na busca de jogadores similares
+    'Goals_per_90', 'Assists_per_90', 'Expected_Goals_per_90', 'Expected_Assists_per_90',
+    'npxG_per_90', 'G-PK_per_90', 'PrgC', 'PrgP', 'PrgR'
+)
+SIMILARITY_PER90_TOTALS = ('PrgC', 'PrgP', 'PrgR')  # Totais convertidos para por 90 antes da padronização
+SIMILARITY_TOP_K = 10  # Jogadores similares exibidos
+SIMILARITY_BLOCK_ROWS = 65_536  # Linhas por bloco no produto matricial da busca
+COMPARISON_METRICS = (  # Métricas do radar/tabela da comparação de jogadores
+    'Goals', 'Assists', 'Expected_Goals', 'Expected_Assists', 'Minutes',
+    'Goals_per_90', 'Assists_per_90', 'PrgC', 'PrgP', 'PrgR'
+)
+COMPARISON_MAX_PLAYERS = 8  # Jogadores por comparação (radar legível)
+BIG_SIX = ('Arsenal', 'Chelsea', 'Liverpool', 'Manchester City', 'Manchester Utd', 'Tottenham')  # Excluíveis nas consultas de scouting
+SCOUTING_CACHE_ENTRIES = 128  # Resultados de consultas de scouting mantidos (por hash da consulta)
+PLOT_WEBGL_MIN_ROWS = 5_000  # Pontos a partir dos quais os scatters usam WebGL (Scattergl)
+PLOT_MAX_POINTS = 20_000  # Pontos enviados ao navegador por scatter (acima disso, amostragem por densidade)
+PLOT_DOWNSAMPLE_GRID = 100  # Células por eixo na amostragem por densidade (grid² deve ficar abaixo de PLOT_MAX_POINTS)
+PLOT_BOX_MAX_OUTLIERS = 200  # Outliers enviados por caixa nos box plots pré-calculados
+REPORT_DIR = 'reports'  # Saída do relatório em lote (batch_report.py)
+REPORT_CV_FOLDS = 5  # Folds da validação cruzada no relatório em lote
 
 # 🏆 Configurações de performance
 DEFAULT_TOP_N = 10
@@ -48,6 +118,8 @@ SECTION_CONFIG = {
     },
     'modeling': {
         'min_samples': 20,
-        'max_features': 10
+        'max_features': 10,
+        'default_target': 'Goals',
+        'default_features': ['Expected_Goals', 'Expected_Assists', 'Minutes', 'Age']
     }
 }
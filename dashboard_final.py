@@ -6,14 +6,32 @@ import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import time
 import warnings
-from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 from scipy import stats
 import statsmodels.api as sm
 
+from config import (
+    BIG_SIX, COMPARISON_MAX_PLAYERS, DATA_PATH, DATA_SOURCES, PLAYER_SEARCH_LIMIT, SECTION_CONFIG, SIMILARITY_TOP_K
+)
+import analytics
+from caching import FigureCache, ModelRegistry, analytics_stats
+from data_store import frame_fingerprint, ingest_sources, load_partitions, store_catalog
+from filters import FilterIndex, filter_view, take_rows
+from percentiles import PercentileTable
+from player_index import PlayerIndex
+from plotting import (
+    box_figure, histogram_figure, histogram_summary, sampled_title, scatter_figure, scatter_trace
+)
+from posthoc import posthoc
+from scouting import ScoutingEngine, query_hash
+from similarity import SimilarityIndex
+from stats_engine import correlation_significance, fit_ols, group_summary_table, ols_predict, qq_quantiles
+from team_cube import CubeStore
+
 warnings.filterwarnings('ignore')
 
 # Configuração da página
@@ -302,140 +320,253 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 @st.cache_data
-def load_data():
-    """Carrega e prepara os dados com tratamento avançado"""
+def load_manifest():
+    """Ingere as exportações (incremental) e retorna o manifesto do store particionado"""
     try:
-        df = pd.read_csv('dataset.csv')
-
-        # Verificar se há colunas duplicadas e remover
-        if df.columns.duplicated().any():
-            st.warning("Colunas duplicadas detectadas no dataset. Removendo automaticamente...")
-            df = df.loc[:, ~df.columns.duplicated()]
-
-        # Mapeamento de colunas para nomes mais intuitivos
-        column_mapping = {
-            'Gls': 'Goals',
-            'Ast': 'Assists',
-            'Min': 'Minutes',
-            'MP': 'Matches_Played',
-            '90s': 'Ninety_Minutes',
-            'G+A': 'Goals_Assists',
-            'xG': 'Expected_Goals',
-            'xAG': 'Expected_Assists',
-            'CrdY': 'Yellow_Cards',
-            'CrdR': 'Red_Cards'
-        }
-
-        # Aplicar mapeamento apenas para colunas que existem
-        existing_mappings = {old: new for old, new in column_mapping.items() if old in df.columns}
-        df = df.rename(columns=existing_mappings)
-
-        # Tratamento de valores ausentes
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_columns:
-            if df[col].isnull().sum() > 0:
-                df[col] = df[col].fillna(df[col].median())
-
-        # Limpeza de dados categóricos
-        categorical_columns = df.select_dtypes(include=['object']).columns
-        for col in categorical_columns:
-            if df[col].isnull().sum() > 0:
-                df[col] = df[col].fillna('Unknown')
-
-        # Engenharia de variáveis aprimorada
-        if 'Goals' in df.columns and 'Minutes' in df.columns:
-            df['Goals_per_90'] = np.where(df['Minutes'] > 0, (df['Goals'] / df['Minutes']) * 90, 0)
-
-        if 'Assists' in df.columns and 'Minutes' in df.columns:
-            df['Assists_per_90'] = np.where(df['Minutes'] > 0, (df['Assists'] / df['Minutes']) * 90, 0)
-
-        if 'Goals' in df.columns and 'Assists' in df.columns:
-            df['Total_Contributions'] = df['Goals'] + df['Assists']
-
-        if 'Expected_Goals' in df.columns and 'Goals' in df.columns:
-            df['Goal_Efficiency'] = np.where(df['Expected_Goals'] > 0, df['Goals'] / df['Expected_Goals'], 1)
-            df['Goal_Difference'] = df['Goals'] - df['Expected_Goals']
-
-        # Variável de performance composta
-        if all(col in df.columns for col in ['Goals', 'Assists', 'Minutes']):
-            # Normalizar minutos para evitar valores extremos
-            minutes_normalized = np.clip(df['Minutes'] / 90, 0.1, 50)  # Min 0.1, Max 50 jogos
-            df['Performance_Index'] = (df['Goals'] * 3 + df['Assists'] * 2) * np.log1p(minutes_normalized)
-
-        # Classificação de jogadores por gols
-        if 'Goals' in df.columns:
-            df['Goal_Category'] = pd.cut(
-                df['Goals'],
-                bins=[-0.1, 0, 2, 5, 10, float('inf')],
-                labels=['Zero', 'Low', 'Medium', 'High', 'Elite'],
-                include_lowest=True
-            )
+        return ingest_sources(DATA_SOURCES)
+    except Exception as e:
+        st.error(f"Erro na ingestão dos dados: {str(e)}")
+        return {}
 
-        # Filtrar apenas jogadores com dados mínimos de qualidade
-        min_minutes = 50  # Jogadores com pelo menos ~0.5 jogos de 90min
-        if 'Minutes' in df.columns:
-            df = df[df['Minutes'] >= min_minutes].copy()
+@st.cache_data
+def load_data(competitions=(), seasons=()):
+    """Carrega e prepara os dados com tratamento avançado"""
+    try:
+        # Lê apenas as partições (competição/temporada) selecionadas
+        df = load_partitions(load_manifest(), competitions, seasons)
 
-        # Resetar índice após filtragem
-        df = df.reset_index(drop=True)
+        if df is None:
+            st.error(f"Nenhum dado encontrado em '{DATA_SOURCES}' ou '{DATA_PATH}'.")
+            return None
 
         st.success(f"Dataset carregado: {len(df)} jogadores com dados válidos")
         return df
 
-    except FileNotFoundError:
-        st.error("Arquivo 'dataset.csv' não encontrado. Verifique se o arquivo está no diretório correto.")
-        return None
     except Exception as e:
         st.error(f"Erro ao carregar dados: {str(e)}")
         return None
 
-@st.cache_data
-def calculate_correlation_matrix(df, columns):
-    """Calcula matriz de correlação com cache para performance"""
+@st.cache_resource(max_entries=8)
+def get_filter_index(fingerprint, _df):
+    """Índices de filtro (categóricos e de faixa) construídos uma vez por dataset"""
+    return FilterIndex(_df)
+
+@st.cache_resource(max_entries=8)
+def get_player_index(fingerprint, _df):
+    """Índice de busca de jogadores (nome normalizado, prefixos e trigramas) por dataset"""
+    return PlayerIndex(_df)
+
+@st.cache_resource(max_entries=8)
+def get_similarity_index(fingerprint, _df):
+    """Índice de jogadores similares (perfis por 90 padronizados) por dataset"""
+    return SimilarityIndex(_df)
+
+@st.cache_resource(max_entries=8)
+def get_percentile_table(fingerprint, _df):
+    """Percentis de cada métrica dentro da posição, calculados no carregamento do dataset"""
+    return PercentileTable(_df)
+
+@st.cache_resource(max_entries=8)
+def get_scouting_engine(fingerprint, _df):
+    """Motor de consultas de scouting (arrays por coluna + cache por hash da consulta)"""
+    return ScoutingEngine(_df)
+
+def player_picker(player_index, view_ids, label, key, default=0):
+    """Caixa de busca + seleção de um jogador da view; retorna o id da linha"""
+    query = st.text_input(
+        f"🔎 Buscar {label.rstrip(':')}",
+        key=f"{key}_query",
+        placeholder="Nome (sem acentos e com erros de digitação também funciona)"
+    )
+    if query:
+        options = player_index.search(query, limit=PLAYER_SEARCH_LIMIT, within=view_ids)['row_id'].tolist()
+        if not options:
+            st.caption("Nenhum jogador encontrado no recorte atual")
+            return None
+        default = 0  # Melhor correspondência primeiro
+    else:
+        options = view_ids.tolist()
+
+    return st.selectbox(
+        label,
+        options,
+        index=min(default, len(options) - 1),
+        format_func=player_index.label,
+        key=key
+    )
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def calculate_correlation_matrix(fingerprint, _df, columns):
+    """Correlações de Pearson/Spearman com p-valores e FDR para todos os pares (chaveadas pela impressão digital da view)"""
     try:
-        return df[columns].corr()
+        return correlation_significance(_df, list(columns))
     except Exception as e:
         st.warning(f"Erro ao calcular correlações: {e}")
-        return pd.DataFrame()
+        return {}
 
-@st.cache_data
-def get_descriptive_stats(df, columns):
-    """Calcula estatísticas descritivas com cache"""
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_descriptive_stats(fingerprint, _df, columns):
+    """Calcula estatísticas descritivas com cache (chaveado pela impressão digital da view)"""
     try:
-        return df[columns].describe()
+        return analytics.descriptive_stats(_df, columns)
     except Exception as e:
         st.warning(f"Erro ao calcular estatísticas: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def train_linear_model(X_train, y_train, X_test, y_test):
-    """Treina modelo linear com cache para evitar retreinamento desnecessário"""
-    try:
-        model = LinearRegression()
-        model.fit(X_train, y_train)
-
-        # Predições
-        y_pred_train = model.predict(X_train)
-        y_pred_test = model.predict(X_test)
-
-        # Métricas
-        r2_train = r2_score(y_train, y_pred_train)
-        r2_test = r2_score(y_test, y_pred_test)
-        rmse_test = np.sqrt(mean_squared_error(y_test, y_pred_test))
-        mae_test = mean_absolute_error(y_test, y_pred_test)
-
-        return {
-            'model': model,
-            'y_pred_train': y_pred_train,
-            'y_pred_test': y_pred_test,
-            'r2_train': r2_train,
-            'r2_test': r2_test,
-            'rmse_test': rmse_test,
-            'mae_test': mae_test
-        }
-    except Exception as e:
-        st.error(f"Erro no treinamento do modelo: {e}")
-        return None
+@st.cache_resource
+def get_model_registry():
+    """Registro de modelos ajustados, compartilhado entre sessões"""
+    return ModelRegistry()
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def search_feature_subsets(fingerprint, _df, target_var, candidates, method, criterion, max_features):
+    """Busca de subconjuntos de variáveis (chaveada pela impressão digital do filtro)"""
+    return analytics.feature_subsets(_df, target_var, candidates, method, criterion, max_features)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_fold_assignments(fingerprint, _df, n_splits, n_repeats, group_col, random_state):
+    """Atribuição de folds por linha, reaproveitada entre alvos e conjuntos de variáveis"""
+    return analytics.fold_assignments(_df, n_splits, n_repeats, group_col, random_state)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_cluster_sweep(fingerprint, _df, features, max_k, random_state):
+    """Inércia e silhouette por k para o conjunto de variáveis"""
+    return analytics.player_cluster_sweep(_df, features, max_k, random_state)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_player_clusters(fingerprint, _df, features, n_clusters, random_state):
+    """Rótulos de cluster e perfis, reaproveitados por conjunto de variáveis e k"""
+    return analytics.player_clusters(_df, features, n_clusters, random_state)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_bootstrap(fingerprint, _df, kind, columns, groups=(), n_resamples=10000):
+    """Intervalos bootstrap (percentil e BCa) com cache por impressão digital dos dados (ver ``analytics.bootstrap_interval``)"""
+    return analytics.bootstrap_interval(_df, kind, columns, groups, n_resamples=n_resamples)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_permutation_test(fingerprint, _df, value_col, group_col, groups=None, ranks=False):
+    """p-valor por permutação com cache (ver ``analytics.group_permutation_test``)"""
+    return analytics.group_permutation_test(_df, value_col, group_col, groups, ranks)
+
+def show_permutation_result(result, label):
+    """Card com o p-valor por permutação"""
+    method = "exato" if result['exact'] else f"Monte Carlo ({result['n_permutations']:,} permutações)"
+    if result['stopped_early']:
+        method += " · parada antecipada"
+    st.markdown(f"""
+    <div class="metric-card">
+        <h3>🔀 {label} (permutação)</h3>
+        <p><strong>p-valor = {result['p_value']:.4f}</strong></p>
+        <p>{method}</p>
+        <p>{'✅ Significativo' if result['p_value'] < 0.05 else '❌ Não significativo'}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_group_battery(fingerprint, _df, value_col, group_col, min_size=3):
+    """Resumo por grupo e bateria ANOVA/Welch/Levene/Brown-Forsythe/Kruskal-Wallis (com cache)"""
+    return analytics.group_battery(_df, value_col, group_col, min_size)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_posthoc(fingerprint, _df, value_col, group_col, method, adjust):
+    """Comparações post-hoc de todos os pares a partir do resumo por grupo em cache"""
+    summary, _ = get_group_battery(fingerprint, _df, value_col, group_col)
+    return posthoc(summary, method=method, adjust=adjust)
+
+def show_posthoc(df, value_col, group_col, key):
+    """Seletor de método, matriz de significância e letras de agrupamento"""
+    methods = {
+        'Tukey HSD': 'tukey',
+        'Games-Howell (variâncias diferentes)': 'games_howell',
+        'Dunn (não paramétrico)': 'dunn'
+    }
+    col1, col2 = st.columns(2)
+    with col1:
+        method_label = st.selectbox("Método post-hoc:", list(methods), key=f"{key}_posthoc_method")
+    with col2:
+        adjust = 'holm'
+        if methods[method_label] == 'dunn':
+            adjust_label = st.radio(
+                "Correção:", ['Holm', 'Benjamini-Hochberg'], horizontal=True, key=f"{key}_posthoc_adjust"
+            )
+            adjust = 'holm' if adjust_label == 'Holm' else 'fdr_bh'
+
+    fingerprint = frame_fingerprint(df)
+    result = get_posthoc(fingerprint, df, value_col, group_col, methods[method_label], adjust)
+    pairs = result['pairs']
+    st.markdown(f"**{int(pairs['reject'].sum())}** de **{len(pairs)}** pares com diferença significativa (α = 0.05)")
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        def build_pvalue_matrix():
+            matrix = result['matrix'].loc[result['letters'].index, result['letters'].index]
+            fig = px.imshow(
+                matrix,
+                color_continuous_scale=[[0, '#d73027'], [0.05, '#fc8d59'], [0.0501, '#e0f3f8'], [1, '#4575b4']],
+                zmin=0,
+                zmax=1,
+                aspect='auto',
+                title="p-valores por par (vermelho = diferença significativa)"
+            )
+            fig.update_layout(height=max(400, 18 * len(matrix)))
+            return fig
+
+        show_chart('posthoc', 'pvalue_matrix', fingerprint, {
+            'value': value_col, 'group': group_col, 'method': methods[method_label], 'adjust': adjust
+        }, build_pvalue_matrix)
+    with col2:
+        letters = result['letters'].rename('Grupo (letras)').to_frame()
+        st.dataframe(letters, use_container_width=True)
+        st.caption("Grupos que compartilham uma letra não diferem significativamente")
+
+    with st.expander("📋 Todos os pares"):
+        st.dataframe(pairs.round(4), use_container_width=True)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_normality_battery(fingerprint, _df, columns, strata_col=None):
+    """Bateria de normalidade de todas as colunas em uma chamada (Shapiro estratificado por ``strata_col``)"""
+    return analytics.normality(_df, columns, strata_col)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_qq_quantiles(fingerprint, _df, column):
+    """Pontos do Q-Q plot reduzidos a um número fixo de quantis"""
+    return analytics.qq_points(_df, column)
+
+@st.cache_resource
+def get_cube_store():
+    """Cubos de times por impressão digital, compartilhados entre sessões"""
+    return CubeStore()
+
+def get_squad_cube(fingerprint, df):
+    """Cubo time × posição da view (atualizado a partir do último cubo quando poucas linhas mudam)"""
+    return get_cube_store().get_or_build(fingerprint, df)
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache de figuras (JSON) compartilhado entre sessões, com LRU por tamanho"""
+    return FigureCache()
+
+def show_chart(section, chart_id, fingerprint, params, build):
+    """Renderiza um gráfico via cache de figuras; a chave inclui dados, parâmetros e o tema da sessão"""
+    theme = st.session_state.get('theme', 'plotly_white')
+
+    def build_themed():
+        fig = build()
+        fig.update_layout(template=theme)
+        return fig
+
+    spec = get_figure_cache().get_or_build(section, chart_id, fingerprint, params, theme, build_themed)
+    st.plotly_chart(spec, use_container_width=True)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_box_summary(fingerprint, _df, value_col, group_col=None):
+    """Quartis, cercas e outliers amostrados por grupo (um resumo por estado de filtro)"""
+    return analytics.box_summary(_df, value_col, group_col)
+
+@analytics_stats.track(st.cache_data(show_spinner=False))
+def get_histogram(fingerprint, _df, column, nbins=20, density=False):
+    """Bordas e contagens (ou densidade) do histograma de uma coluna"""
+    return analytics.histogram(_df, column, nbins, density)
 
 def show_overview(df):
     """Seção de visão geral aprimorada com métricas avançadas"""
@@ -449,124 +580,118 @@ def show_overview(df):
     """, unsafe_allow_html=True)
 
     # Métricas principais em cards grandes
+    metrics = analytics.overview_metrics(df)
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         st.markdown(f"""
         <div class="big-metric fade-in">
-            <h1>{len(df)}</h1>
+            <h1>{metrics['players']}</h1>
             <p>Jogadores Analisados</p>
         </div>
         """, unsafe_allow_html=True)
 
     with col2:
-        total_goals = df['Goals'].sum() if 'Goals' in df.columns else 0
         st.markdown(f"""
         <div class="big-metric fade-in">
-            <h1>{total_goals}</h1>
+            <h1>{metrics['total_goals'] or 0:.0f}</h1>
             <p>🥅 Gols Totais</p>
         </div>
         """, unsafe_allow_html=True)
 
     with col3:
-        total_assists = df['Assists'].sum() if 'Assists' in df.columns else 0
         st.markdown(f"""
         <div class="big-metric fade-in">
-            <h1>{total_assists}</h1>
+            <h1>{metrics['total_assists'] or 0:.0f}</h1>
             <p>Assistências Totais</p>
         </div>
         """, unsafe_allow_html=True)
 
     with col4:
-        unique_positions = df['Pos'].nunique() if 'Pos' in df.columns else 0
         st.markdown(f"""
         <div class="big-metric fade-in">
-            <h1>{unique_positions}</h1>
+            <h1>{metrics['positions'] or 0}</h1>
             <p>Posições Únicas</p>
         </div>
         """, unsafe_allow_html=True)
 
     st.markdown("---")
 
-    # Análise de distribuição avançada
+    # Análise de distribuição avançada (figuras via cache compartilhado)
+    fingerprint = frame_fingerprint(df)
     col1, col2 = st.columns(2)
 
     with col1:
         if 'Goals' in df.columns:
             st.subheader("Distribuição de Gols")
 
-            # Histograma interativo
-            fig = px.histogram(
-                df, x='Goals', nbins=20,
-                title="Distribuição de Gols por Jogador",
-                color_discrete_sequence=['#667eea'],
-                template='plotly_white'
-            )
+            def build_goals_histogram():
+                # Histograma com bins calculados no servidor
+                fig = histogram_figure(
+                    *get_histogram(fingerprint, df, 'Goals', 20),
+                    title="Distribuição de Gols por Jogador",
+                    color='#667eea'
+                )
 
-            # Adicionar linha da média
-            mean_goals = df['Goals'].mean()
-            fig.add_vline(
-                x=mean_goals,
-                line_dash="dash",
-                line_color="red",
-                annotation_text=f"Média: {mean_goals:.1f}"
-            )
+                # Adicionar linha da média
+                mean_goals = df['Goals'].mean()
+                fig.add_vline(
+                    x=mean_goals,
+                    line_dash="dash",
+                    line_color="red",
+                    annotation_text=f"Média: {mean_goals:.1f}"
+                )
 
-            fig.update_layout(
-                xaxis_title="Número de Gols",
-                yaxis_title="Frequência",
-                showlegend=False,
-                height=400
-            )
+                fig.update_layout(
+                    xaxis_title="Número de Gols",
+                    yaxis_title="Frequência",
+                    showlegend=False,
+                    height=400
+                )
+                return fig
 
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart('overview', 'goals_histogram', fingerprint, {}, build_goals_histogram)
 
     with col2:
         if 'Pos' in df.columns:
             st.subheader("🎭 Jogadores por Posição")
 
-            pos_counts = df['Pos'].value_counts()
+            def build_position_pie():
+                pos_counts = df['Pos'].value_counts()
 
-            # Gráfico de pizza interativo
-            fig = px.pie(
-                values=pos_counts.values,
-                names=pos_counts.index,
-                title="Distribuição por Posição",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
+                # Gráfico de pizza interativo
+                fig = px.pie(
+                    values=pos_counts.values,
+                    names=pos_counts.index,
+                    title="Distribuição por Posição",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
 
-            fig.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                hovertemplate='<b>%{label}</b><br>Jogadores: %{value}<br>Percentual: %{percent}<extra></extra>'
-            )
+                fig.update_traces(
+                    textposition='inside',
+                    textinfo='percent+label',
+                    hovertemplate='<b>%{label}</b><br>Jogadores: %{value}<br>Percentual: %{percent}<extra></extra>'
+                )
 
-            fig.update_layout(height=400)
+                fig.update_layout(height=400)
+                return fig
 
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart('overview', 'position_pie', fingerprint, {}, build_position_pie)
 
     # Estatísticas descritivas interativas
     st.subheader("� Estatísticas Descritivas")
 
     # Seleção de variáveis para análise
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    important_cols = []
-
-    for col in ['Goals', 'Assists', 'Expected_Goals', 'Minutes', 'Age']:
-        if col in numeric_cols:
-            important_cols.append(col)
-
-    if not important_cols:
-        important_cols = numeric_cols[:6]  # Fallback
+    important_cols, default_cols = analytics.descriptive_variables(df)
 
     selected_vars = st.multiselect(
         "Selecione as variáveis para análise:",
         options=important_cols,
-        default=important_cols[:4] if len(important_cols) >= 4 else important_cols
+        default=default_cols
     )
 
     if selected_vars:
-        stats_df = df[selected_vars].describe().round(3)
+        stats_df = get_descriptive_stats(fingerprint, df, tuple(selected_vars)).round(3)
 
         # Exibir com formatação melhorada
         st.dataframe(
@@ -581,24 +706,67 @@ def show_overview(df):
             <h3>Insights Automáticos</h3>
         """, unsafe_allow_html=True)
 
-        for var in selected_vars:
-            if var in df.columns:
-                mean_val = df[var].mean()
-                std_val = df[var].std()
-                cv = (std_val / mean_val) * 100 if mean_val > 0 else 0
+        for var, row in analytics.variability_summary(df, selected_vars).iterrows():
+            st.markdown(f"• {var}: Média de {row['mean']:.2f} com {row['variability']} (CV: {row['cv']:.1f}%)")
 
-                if cv > 100:
-                    variability = "alta variabilidade"
-                elif cv > 50:
-                    variability = "variabilidade moderada"
-                else:
-                    variability = "baixa variabilidade"
+        st.markdown("</div>", unsafe_allow_html=True)
 
-                st.markdown(f"• {var}: Média de {mean_val:.2f} com {variability} (CV: {cv:.1f}%)")
+def show_scouting_query(scouting_engine, view_ids, view_key):
+    """Consulta declarativa de scouting: top-N (por grupo) sob filtros combinados"""
+    st.subheader("🔭 Consulta de Scouting")
 
-        st.markdown("</div>", unsafe_allow_html=True)
+    numeric = scouting_engine.numeric_columns
+    groupings = {'Nenhum': None, 'Posição principal': 'Primary_Pos', 'Time': 'Squad'}
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        default_metric = 'Expected_Goals_per_90' if 'Expected_Goals_per_90' in numeric else numeric[0]
+        rank_by = st.selectbox("Ranquear por:", numeric, index=numeric.index(default_metric), key='scout_rank_by')
+        ascending = st.checkbox("Menor é melhor", value=False, key='scout_ascending')
+    with col2:
+        top_n = st.slider("Top N (por grupo):", 5, 50, 20, key='scout_top_n')
+        group_label = st.selectbox("Agrupar por:", list(groupings), index=1, key='scout_group_by')
+    with col3:
+        max_age = st.slider("Idade máxima:", 16, 40, 23, key='scout_max_age')
+        min_minutes = st.slider("Minutos mínimos:", 0, 3000, 900, step=90, key='scout_min_minutes')
 
-def show_exploratory_analysis(df):
+    col1, col2 = st.columns(2)
+    with col1:
+        positions = st.multiselect(
+            "Posições (principal):",
+            scouting_engine.categories('Primary_Pos') if 'Primary_Pos' in scouting_engine.categorical_columns else [],
+            key='scout_positions'
+        )
+    with col2:
+        exclude_big_six = st.checkbox("Excluir o big six", value=True, key='scout_exclude_big_six')
+
+    where = [('Age', '<=', max_age), ('Minutes', '>=', min_minutes)]
+    if positions:
+        where.append(('Primary_Pos', 'in', positions))
+    if exclude_big_six and 'Squad' in scouting_engine.categorical_columns:
+        where.append(('Squad', 'not in', BIG_SIX))
+    query = {
+        'rank_by': rank_by,
+        'top_n': top_n,
+        'group_by': groupings[group_label],
+        'ascending': ascending,
+        'where': where
+    }
+
+    start = time.perf_counter()
+    result = scouting_engine.run(query, within=view_ids, view_key=view_key)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    st.caption(
+        f"{result.attrs.get('matched', 0)} jogadores atendem aos filtros · {len(result)} exibidos · "
+        f"consulta {query_hash(query, view_key)} em {elapsed:.1f} ms"
+    )
+    if result.empty:
+        st.info("Nenhum jogador atende aos critérios")
+        return
+    st.dataframe(result.drop(columns='row_id').round(3), use_container_width=True, hide_index=True)
+
+def show_exploratory_analysis(df, scouting_engine):
     """Análise exploratória com recursos avançados e interativos"""
     st.header("Análise Exploratória Avançada")
 
@@ -638,75 +806,57 @@ def show_exploratory_analysis(df):
                 help="Filtrar jogadores por categoria de gols"
             )
 
-            if selected_categories:
-                df_filtered = df[df['Goal_Category'].isin(selected_categories)]
+            if selected_categories and len(selected_categories) < len(categories):
+                filter_index = get_filter_index(df.attrs.get('fingerprint'), df)
+                df_filtered = filter_view(filter_index, df, Goal_Category=selected_categories)
             else:
                 df_filtered = df
         else:
             df_filtered = df
 
-    # Top Performers Avançado
+    # Top Performers Avançado (consultas do motor de scouting, com cache por hash)
     st.subheader("Hall da Fama")
 
-    col1, col2, col3 = st.columns(3)
+    view_ids, view_key = df_filtered.index.to_numpy(), frame_fingerprint(df_filtered)
 
-    with col1:
-        if 'Goals' in df_filtered.columns:
-            st.markdown("### Artilheiros")
-            top_scorers = df_filtered.nlargest(top_n, 'Goals')[['Player', 'Goals', 'Pos']]
+    def top_players(metric):
+        return scouting_engine.run({'rank_by': metric, 'top_n': top_n}, within=view_ids, view_key=view_key)
 
+    def show_top_bar(metric, title, color_scale):
+        def build():
             # Gráfico de barras interativo
             fig = px.bar(
-                top_scorers,
-                x='Goals',
+                top_players(metric)[['Player', metric, 'Pos']],
+                x=metric,
                 y='Player',
-                color='Goals',
+                color=metric,
                 orientation='h',
-                title=f"Top {top_n} Artilheiros",
-                color_continuous_scale='Viridis',
-                template='plotly_white'
+                title=title,
+                color_continuous_scale=color_scale
             )
-
             fig.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
-            st.plotly_chart(fig, use_container_width=True)
+            return fig
+
+        show_chart('exploratory', 'top_bar', view_key, {'metric': metric, 'top_n': top_n, 'scale': color_scale}, build)
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        if 'Goals' in df_filtered.columns:
+            st.markdown("### Artilheiros")
+            show_top_bar('Goals', f"Top {top_n} Artilheiros", 'Viridis')
 
     with col2:
         if 'Assists' in df_filtered.columns:
             st.markdown("### Assistentes")
-            top_assists = df_filtered.nlargest(top_n, 'Assists')[['Player', 'Assists', 'Pos']]
-
-            fig = px.bar(
-                top_assists,
-                x='Assists',
-                y='Player',
-                color='Assists',
-                orientation='h',
-                title=f"Top {top_n} Assistentes",
-                color_continuous_scale='Plasma',
-                template='plotly_white'
-            )
-
-            fig.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
-            st.plotly_chart(fig, use_container_width=True)
+            show_top_bar('Assists', f"Top {top_n} Assistentes", 'Plasma')
 
     with col3:
         if main_metric in df_filtered.columns:
             st.markdown(f"### 💫 {main_metric}")
-            top_metric = df_filtered.nlargest(top_n, main_metric)[['Player', main_metric, 'Pos']]
+            show_top_bar(main_metric, f"Top {top_n} - {main_metric}", 'Cividis')
 
-            fig = px.bar(
-                top_metric,
-                x=main_metric,
-                y='Player',
-                color=main_metric,
-                orientation='h',
-                title=f"Top {top_n} - {main_metric}",
-                color_continuous_scale='Cividis',
-                template='plotly_white'
-            )
-
-            fig.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
-            st.plotly_chart(fig, use_container_width=True)
+    show_scouting_query(scouting_engine, view_ids, view_key)
 
     # Análise de Correlações Avançada
     st.subheader("🔗 Matriz de Correlações Interativa")
@@ -720,43 +870,64 @@ def show_exploratory_analysis(df):
     )
 
     if len(correlation_vars) >= 2:
-        correlation_matrix = df_filtered[correlation_vars].corr()
+        correlations = calculate_correlation_matrix(view_key, df_filtered, tuple(correlation_vars))
+        if not correlations:
+            return
+        correlation_matrix = correlations['pearson']
 
         # Heatmap interativo
-        fig = px.imshow(
-            correlation_matrix,
-            x=correlation_vars,
-            y=correlation_vars,
-            color_continuous_scale='RdBu',
-            title="Matriz de Correlações",
-            aspect='auto',
-            text_auto='.3f'
+        def build_correlation_heatmap():
+            fig = px.imshow(
+                correlation_matrix,
+                x=correlation_vars,
+                y=correlation_vars,
+                color_continuous_scale='RdBu',
+                title="Matriz de Correlações",
+                aspect='auto',
+                text_auto='.3f'
+            )
+            fig.update_layout(height=500)
+            return fig
+
+        show_chart('exploratory', 'correlation_heatmap', view_key, {'columns': list(correlation_vars)},
+                   build_correlation_heatmap)
+
+        # Top correlações (pares já ordenados por |r|, com p-valor ajustado por FDR)
+        pairs = correlations['pairs']
+        pair_lines = (
+            "• " + pairs['var1'] + " × " + pairs['var2'] + ": "
+            + pairs['pearson_r'].map('{:.3f}'.format)
+            + np.where(pairs['pearson_q'] < 0.05, " ✅", "")
         )
 
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Top correlações
-        mask = np.triu(np.ones_like(correlation_matrix, dtype=bool), k=1)
-        correlations = correlation_matrix.where(mask).stack().reset_index()
-        correlations.columns = ['Var1', 'Var2', 'Correlação']
-        correlations = correlations.reindex(correlations['Correlação'].abs().sort_values(ascending=False).index)
-
         st.markdown("### Correlações Mais Significativas:")
 
         col1, col2 = st.columns(2)
 
         with col1:
             st.markdown("🔥 Correlações Positivas Fortes:")
-            positive_corr = correlations[correlations['Correlação'] > 0.5].head(5)
-            for _, row in positive_corr.iterrows():
-                st.markdown(f"• {row['Var1']} × {row['Var2']}: {row['Correlação']:.3f}")
+            st.markdown("\n".join(pair_lines[pairs['pearson_r'] > 0.5].head(5)))
 
         with col2:
             st.markdown("Correlações Negativas Fortes:")
-            negative_corr = correlations[correlations['Correlação'] < -0.3].head(5)
-            for _, row in negative_corr.iterrows():
-                st.markdown(f"• {row['Var1']} × {row['Var2']}: {row['Correlação']:.3f}")
+            st.markdown("\n".join(pair_lines[pairs['pearson_r'] < -0.3].head(5)))
+
+        with st.expander("📋 Significância de todos os pares (Pearson e Spearman)"):
+            st.caption("✅ = significativo após correção de Benjamini-Hochberg (FDR 5%)")
+            st.dataframe(
+                pairs.rename(columns={
+                    'var1': 'Variável 1',
+                    'var2': 'Variável 2',
+                    'n': 'N',
+                    'pearson_r': 'Pearson r',
+                    'pearson_p': 'p (Pearson)',
+                    'pearson_q': 'p FDR (Pearson)',
+                    'spearman_r': 'Spearman ρ',
+                    'spearman_p': 'p (Spearman)',
+                    'spearman_q': 'p FDR (Spearman)'
+                }).round(4),
+                use_container_width=True
+            )
 
     # Análise por Posição
     if 'Pos' in df_filtered.columns:
@@ -764,17 +935,17 @@ def show_exploratory_analysis(df):
 
         # Box plot interativo
         if main_metric in df_filtered.columns:
-            fig = px.box(
-                df_filtered,
-                x='Pos',
-                y=main_metric,
-                title=f"Distribuição de {main_metric} por Posição",
-                color='Pos',
-                template='plotly_white'
-            )
+            def build_position_box():
+                fig = box_figure(
+                    get_box_summary(view_key, df_filtered, main_metric, 'Pos'),
+                    title=f"Distribuição de {main_metric} por Posição",
+                    x_title='Pos',
+                    y_title=main_metric
+                )
+                fig.update_layout(height=400)
+                return fig
 
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart('exploratory', 'position_box', view_key, {'metric': main_metric}, build_position_box)
 
         # Estatísticas por posição
         pos_stats = df_filtered.groupby('Pos')[correlation_vars].mean().round(3)
@@ -797,8 +968,8 @@ def show_exploratory_analysis(df):
         st.markdown(f"• Artilheiro: {top_scorer} com {max_goals} gols ({max_goals/avg_goals:.1f}x a média)")
 
     if len(correlation_vars) >= 2:
-        strongest_corr = correlations.iloc[0]
-        st.markdown(f"• Correlação mais forte: {strongest_corr['Var1']} × {strongest_corr['Var2']} ({strongest_corr['Correlação']:.3f})")
+        strongest_corr = pairs.iloc[0]
+        st.markdown(f"• Correlação mais forte: {strongest_corr['var1']} × {strongest_corr['var2']} ({strongest_corr['pearson_r']:.3f})")
 
     if 'Pos' in df_filtered.columns and main_metric in df_filtered.columns:
         best_position = pos_stats[main_metric].idxmax()
@@ -842,10 +1013,18 @@ def show_statistical_modeling(df):
             if col != target_var and not col.endswith('_Category'):
                 feature_options.append(col)
 
+        # Estado controlado por chave para que a seleção automática possa preencher o campo
+        if 'modeling_features' not in st.session_state:
+            st.session_state['modeling_features'] = feature_options[:4]
+        else:
+            st.session_state['modeling_features'] = [
+                f for f in st.session_state['modeling_features'] if f in feature_options
+            ]
+
         selected_features = st.multiselect(
             "📊 Variáveis Independentes (X):",
             feature_options,
-            default=feature_options[:4] if len(feature_options) >= 4 else feature_options,
+            key='modeling_features',
             help="Variáveis que usaremos para fazer a predição"
         )
 
@@ -867,48 +1046,123 @@ def show_statistical_modeling(df):
             help="Para reprodutibilidade dos resultados"
         )
 
+        validation_modes = ['Treino/Teste', 'K-Fold', 'K-Fold Repetido']
+        validation_modes += [
+            f'K-Fold por {col}' for col in ['Squad', 'Season']
+            if col in df.columns and df[col].nunique() > 2
+        ]
+        validation = st.selectbox(
+            "🔁 Validação:",
+            validation_modes,
+            help="Validação cruzada reduz a dependência do resultado em relação à seed"
+        )
+
+    # Seleção automática de variáveis
+    with st.expander("🤖 Seleção Automática de Variáveis"):
+        methods = {
+            'Stepwise (forward)': 'forward',
+            'Stepwise (backward)': 'backward',
+            'Melhor subconjunto (exaustivo)': 'exhaustive'
+        }
+        criteria = {
+            'R² ajustado': 'adj_r2',
+            'AIC': 'aic',
+            'BIC': 'bic',
+            'RMSE (validação cruzada)': 'cv_rmse'
+        }
+
+        candidates = st.multiselect(
+            "Variáveis candidatas:",
+            feature_options,
+            default=feature_options,
+            key='subset_candidates'
+        )
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            method_label = st.selectbox("Método:", list(methods))
+        with col2:
+            criterion_label = st.selectbox("Critério:", list(criteria))
+        with col3:
+            max_size = st.slider(
+                "Máximo de variáveis:",
+                min_value=1,
+                max_value=max(1, min(SECTION_CONFIG['modeling']['max_features'], len(candidates))),
+                value=max(1, min(4, len(candidates)))
+            )
+
+        if candidates and len(df) >= 10:
+            try:
+                with st.spinner("Avaliando combinações de variáveis..."):
+                    ranking = search_feature_subsets(
+                        frame_fingerprint(df), df, target_var, tuple(candidates),
+                        methods[method_label], criteria[criterion_label], max_size
+                    )
+            except ValueError as e:
+                st.warning(f"⚠️ {e}")
+                ranking = pd.DataFrame()
+
+            if not ranking.empty:
+                display = ranking.copy()
+                display['features'] = display['features'].map(', '.join)
+                display = display.rename(columns={
+                    'features': 'Variáveis',
+                    'n_features': 'Nº',
+                    'r2': 'R²',
+                    'adj_r2': 'R² Ajustado',
+                    'aic': 'AIC',
+                    'bic': 'BIC',
+                    'cv_rmse': 'RMSE (CV)'
+                })
+                st.dataframe(display.round(4), use_container_width=True)
+
+                best = list(ranking.iloc[0]['features'])
+
+                def use_best_subset():
+                    st.session_state['modeling_features'] = best
+
+                st.button(
+                    f"✅ Usar melhor combinação ({len(best)} variáveis)",
+                    on_click=use_best_subset
+                )
+
     if not selected_features:
         st.warning("⚠️ Selecione pelo menos uma variável independente")
         return
 
-    # Preparação dos dados
-    try:
-        X = df[selected_features].fillna(df[selected_features].median())
-        y = df[target_var].fillna(df[target_var].median())
-
-        # Verificar se há dados suficientes
-        if len(X) < 10:
-            st.error("❌ Dados insuficientes para modelagem")
-            return
+    # Verificar se há dados suficientes
+    if len(df) < 10:
+        st.error("❌ Dados insuficientes para modelagem")
+        return
 
-        # Divisão treino/teste
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state
+    # Modelagem com Regressão Linear (ajuste reaproveitado do registro quando a chave não muda)
+    try:
+        registry = get_model_registry()
+        model_fingerprint = frame_fingerprint(df)
+        model_params = {
+            'target': target_var, 'features': list(selected_features),
+            'test_size': round(float(test_size), 4), 'random_state': int(random_state)
+        }
+        results = registry.get_or_fit(
+            model_fingerprint, target_var, selected_features, test_size, random_state,
+            lambda: analytics.train_linear_model(df, target_var, selected_features, test_size, random_state)
         )
 
-        st.success(f"✅ Dados preparados: {len(X_train)} treino + {len(X_test)} teste")
+        st.success(f"✅ Dados preparados: {results['n_train']} treino + {results['n_test']} teste")
 
     except Exception as e:
-        st.error(f"❌ Erro na preparação dos dados: {e}")
+        st.error(f"❌ Erro no treinamento do modelo: {e}")
         return
 
-    # Modelagem com Regressão Linear
     st.subheader("Regressão Linear")
 
     try:
-        # Treinar modelo
-        model = LinearRegression()
-        model.fit(X_train, y_train)
-
-        # Predições
-        y_pred_train = model.predict(X_train)
-        y_pred_test = model.predict(X_test)
-
-        # Métricas
-        r2_train = r2_score(y_train, y_pred_train)
-        r2_test = r2_score(y_test, y_pred_test)
-        rmse_test = np.sqrt(mean_squared_error(y_test, y_pred_test))
-        mae_test = mean_absolute_error(y_test, y_pred_test)
+        y_test = results['y_test']
+        y_pred_test = results['y_pred_test']
+        r2_train = results['r2_train']
+        r2_test = results['r2_test']
+        rmse_test = results['rmse_test']
+        mae_test = results['mae_test']
 
         # Exibir métricas
         col1, col2, col3 = st.columns(3)
@@ -955,59 +1209,132 @@ def show_statistical_modeling(df):
         st.error(f"❌ Erro no treinamento do modelo: {e}")
         return
 
+    # Validação cruzada
+    if validation != 'Treino/Teste':
+        st.subheader("Validação Cruzada")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            n_splits = st.slider("Número de folds:", min_value=2, max_value=10, value=5)
+        with col2:
+            n_repeats = st.slider(
+                "Repetições:", min_value=2, max_value=20, value=5
+            ) if validation == 'K-Fold Repetido' else 1
+        group_col = validation.replace('K-Fold por ', '') if validation.startswith('K-Fold por') else None
+
+        try:
+            fingerprint = frame_fingerprint(df)
+            folds = get_fold_assignments(fingerprint, df, n_splits, n_repeats, group_col, int(random_state))
+            cv_key = ('cv', fingerprint, target_var, tuple(selected_features), n_splits, n_repeats, group_col, int(random_state))
+            with st.spinner("Ajustando folds..."):
+                fold_metrics, cv_summary = registry.get_or_compute(
+                    cv_key, lambda: analytics.cross_validate_linear_model(df, target_var, selected_features, folds)
+                )
+        except ValueError as e:
+            st.warning(f"⚠️ {e}")
+        else:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(
+                    "R² (teste)",
+                    f"{cv_summary.loc['r2_test', 'mean']:.3f}",
+                    f"± {cv_summary.loc['r2_test', 'std']:.3f}",
+                    delta_color="off"
+                )
+            with col2:
+                st.metric(
+                    "RMSE (teste)",
+                    f"{cv_summary.loc['rmse_test', 'mean']:.3f}",
+                    f"± {cv_summary.loc['rmse_test', 'std']:.3f}",
+                    delta_color="off"
+                )
+            with col3:
+                st.metric(
+                    "MAE (teste)",
+                    f"{cv_summary.loc['mae_test', 'mean']:.3f}",
+                    f"± {cv_summary.loc['mae_test', 'std']:.3f}",
+                    delta_color="off"
+                )
+
+            def build_cv_box():
+                fig_cv = px.box(
+                    fold_metrics,
+                    y='r2_test',
+                    points='all',
+                    hover_data=['repeat', 'fold', 'n_test'],
+                    title=f"R² de teste em {len(fold_metrics)} folds",
+                    labels={'r2_test': 'R² (teste)'}
+                )
+                fig_cv.update_layout(height=400)
+                return fig_cv
+
+            show_chart('modeling', 'cv_box', fingerprint, {'cv': list(cv_key[2:])}, build_cv_box)
+
+            with st.expander("📋 Métricas por fold"):
+                st.dataframe(
+                    fold_metrics.rename(columns={
+                        'repeat': 'Repetição',
+                        'fold': 'Fold',
+                        'n_train': 'Treino',
+                        'n_test': 'Teste',
+                        'r2_train': 'R² Treino',
+                        'r2_test': 'R² Teste',
+                        'rmse_test': 'RMSE',
+                        'mae_test': 'MAE'
+                    }).round(4),
+                    use_container_width=True
+                )
+
     # Gráfico de predições vs reais
     st.subheader("Predições vs Valores Reais")
 
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=y_test,
-        y=y_pred_test,
-        mode='markers',
-        name='Predições',
-        marker=dict(size=8, opacity=0.7, color='blue'),
-        hovertemplate='<b>Regressão Linear</b><br>Real: %{x:.2f}<br>Predito: %{y:.2f}<extra></extra>'
-    ))
-
-    # Linha de predição perfeita
-    min_val = min(y_test.min(), y_pred_test.min())
-    max_val = max(y_test.max(), y_pred_test.max())
-
-    fig.add_trace(go.Scatter(
-        x=[min_val, max_val],
-        y=[min_val, max_val],
-        mode='lines',
-        name='Predição Perfeita',
-        line=dict(color='red', dash='dash', width=2)
-    ))
-
-    fig.update_layout(
-        title=f"Predições vs Valores Reais - {target_var}",
-        xaxis_title=f"{target_var} Real",
-        yaxis_title=f"{target_var} Predito",
-        height=500
-    )
+    def build_predictions():
+        fig = go.Figure()
 
-    st.plotly_chart(fig, use_container_width=True)
+        trace, shown, total = scatter_trace(
+            y_test,
+            y_pred_test,
+            name='Predições',
+            marker=dict(size=8, opacity=0.7, color='blue'),
+            hovertemplate='<b>Regressão Linear</b><br>Real: %{x:.2f}<br>Predito: %{y:.2f}<extra></extra>'
+        )
+        fig.add_trace(trace)
 
-    # Intervalos de confiança
-    st.subheader("📏 Intervalos de Confiança (95%)")
+        # Linha de predição perfeita
+        min_val = min(y_test.min(), y_pred_test.min())
+        max_val = max(y_test.max(), y_pred_test.max())
 
-    try:
-        # Usar statsmodels para intervalos de confiança
-        X_sm = sm.add_constant(X_train)
-        model_sm = sm.OLS(y_train, X_sm).fit()
+        fig.add_trace(go.Scatter(
+            x=[min_val, max_val],
+            y=[min_val, max_val],
+            mode='lines',
+            name='Predição Perfeita',
+            line=dict(color='red', dash='dash', width=2)
+        ))
 
-        conf_int = model_sm.conf_int()
-        conf_int.columns = ['Limite Inferior', 'Limite Superior']
-        conf_int.index = ['Intercepto'] + selected_features
+        title = f"Predições vs Valores Reais - {target_var}"
+        fig.update_layout(
+            title=sampled_title(title, shown, total) if shown < total else title,
+            xaxis_title=f"{target_var} Real",
+            yaxis_title=f"{target_var} Predito",
+            height=500
+        )
+        return fig
 
-        # Adicionar coeficientes
-        conf_int['Coeficiente'] = model_sm.params
-        conf_int['P-valor'] = model_sm.pvalues
+    show_chart('modeling', 'predictions', model_fingerprint, model_params, build_predictions)
 
-        # Reordenar colunas
-        conf_int = conf_int[['Coeficiente', 'Limite Inferior', 'Limite Superior', 'P-valor']]
+    # Intervalos de confiança
+    st.subheader("📏 Intervalos de Confiança (95%)")
+
+    try:
+        # Inferência já calculada pelo ajuste guardado no registro
+        summary = results['summary']
+        conf_int = pd.DataFrame({
+            'Coeficiente': summary['coef'].to_numpy(),
+            'Limite Inferior': summary['ci_lower'].to_numpy(),
+            'Limite Superior': summary['ci_upper'].to_numpy(),
+            'P-valor': summary['p_value'].to_numpy()
+        }, index=['Intercepto'] + selected_features)
 
         st.dataframe(conf_int.round(4), use_container_width=True)
 
@@ -1015,34 +1342,36 @@ def show_statistical_modeling(df):
         coef_plot_df = conf_int[conf_int.index != 'Intercepto'].copy()
 
         if not coef_plot_df.empty:
-            fig = go.Figure()
+            def build_coefficients():
+                fig = go.Figure()
 
-            fig.add_trace(go.Scatter(
-                x=coef_plot_df['Coeficiente'],
-                y=coef_plot_df.index,
-                mode='markers',
-                marker=dict(size=10, color='blue'),
-                error_x=dict(
-                    type='data',
-                    symmetric=False,
-                    array=coef_plot_df['Limite Superior'] - coef_plot_df['Coeficiente'],
-                    arrayminus=coef_plot_df['Coeficiente'] - coef_plot_df['Limite Inferior']
-                ),
-                name='Coeficientes com IC 95%'
-            ))
+                fig.add_trace(go.Scatter(
+                    x=coef_plot_df['Coeficiente'],
+                    y=coef_plot_df.index,
+                    mode='markers',
+                    marker=dict(size=10, color='blue'),
+                    error_x=dict(
+                        type='data',
+                        symmetric=False,
+                        array=coef_plot_df['Limite Superior'] - coef_plot_df['Coeficiente'],
+                        arrayminus=coef_plot_df['Coeficiente'] - coef_plot_df['Limite Inferior']
+                    ),
+                    name='Coeficientes com IC 95%'
+                ))
 
-            # Linha vertical em zero
-            fig.add_vline(x=0, line_dash="dash", line_color="red",
-                         annotation_text="Sem efeito")
+                # Linha vertical em zero
+                fig.add_vline(x=0, line_dash="dash", line_color="red",
+                             annotation_text="Sem efeito")
 
-            fig.update_layout(
-                title="Intervalos de Confiança dos Coeficientes (95%)",
-                xaxis_title="Valor do Coeficiente",
-                yaxis_title="Variáveis",
-                height=400
-            )
+                fig.update_layout(
+                    title="Intervalos de Confiança dos Coeficientes (95%)",
+                    xaxis_title="Valor do Coeficiente",
+                    yaxis_title="Variáveis",
+                    height=400
+                )
+                return fig
 
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart('modeling', 'coefficients', model_fingerprint, model_params, build_coefficients)
 
         # Interpretação automática
         significant_vars = conf_int[conf_int['P-valor'] < 0.05].index.tolist()
@@ -1079,12 +1408,11 @@ def show_statistical_modeling(df):
             )
 
         if st.button("Fazer Predição"):
-            new_data = pd.DataFrame([prediction_inputs])
-            new_data_sm = sm.add_constant(new_data)
+            new_data = pd.DataFrame([prediction_inputs])[selected_features]
 
-            prediction = model_sm.get_prediction(new_data_sm)
-            pred_value = prediction.predicted_mean[0]
-            pred_summary = prediction.summary_frame(alpha=0.05)
+            # Intervalo de predição a partir do (XᵀX)⁻¹ já calculado
+            pred_summary = ols_predict(results, new_data)
+            pred_value = pred_summary['mean'].iloc[0]
 
             ci_lower = pred_summary['obs_ci_lower'].iloc[0]
             ci_upper = pred_summary['obs_ci_upper'].iloc[0]
@@ -1097,15 +1425,112 @@ def show_statistical_modeling(df):
             </div>
             """, unsafe_allow_html=True)
 
-    # Preparação dos dados
-    X = df[selected_features].fillna(df[selected_features].mean())
+    # Clusterização de jogadores (perfis) com as variáveis selecionadas
+    st.subheader("🧩 Perfis de Jogadores (K-Means)")
+
+    if len(selected_features) < 2:
+        st.info("Selecione pelo menos duas variáveis independentes para agrupar os jogadores")
+        return
+
+    fingerprint = frame_fingerprint(df)
+    max_k = min(10, len(df) - 1)
+    if max_k < 2:
+        st.warning("⚠️ Dados insuficientes para clusterização")
+        return
+
+    with st.spinner("Avaliando números de clusters..."):
+        sweep = get_cluster_sweep(fingerprint, df, tuple(selected_features), max_k, int(random_state))
+
+    cluster_params = {'features': list(selected_features), 'max_k': max_k, 'random_state': int(random_state)}
+
+    def build_cluster_sweep():
+        fig_sweep = make_subplots(specs=[[{"secondary_y": True}]])
+        fig_sweep.add_trace(
+            go.Scatter(x=sweep['k'], y=sweep['inertia'], mode='lines+markers', name='Inércia (cotovelo)'),
+            secondary_y=False
+        )
+        fig_sweep.add_trace(
+            go.Scatter(x=sweep['k'], y=sweep['silhouette'], mode='lines+markers', name='Silhouette'),
+            secondary_y=True
+        )
+        fig_sweep.update_layout(title="Escolha do número de clusters", xaxis_title="k", height=400)
+        fig_sweep.update_yaxes(title_text="Inércia", secondary_y=False)
+        fig_sweep.update_yaxes(title_text="Silhouette", secondary_y=True)
+        return fig_sweep
+
+    show_chart('modeling', 'cluster_sweep', fingerprint, cluster_params, build_cluster_sweep)
+
+    best_k = int(sweep.loc[sweep['silhouette'].idxmax(), 'k']) if sweep['silhouette'].notna().any() else 3
+    n_clusters = st.slider(
+        "Número de clusters (k):",
+        min_value=2,
+        max_value=max_k,
+        value=min(best_k, max_k),
+        help="Sugestão inicial: k com maior silhouette"
+    )
+
+    clusters = get_player_clusters(fingerprint, df, tuple(selected_features), n_clusters, int(random_state))
+    cluster_labels = pd.Series(clusters['labels'], index=df.index).map(lambda c: f"Cluster {c + 1}")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Perfil: centróides em z-score (quanto cada cluster está acima/abaixo da média)
+        profile = clusters['centers_z'].copy()
+        profile.index = [f"Cluster {i + 1} (n={n})" for i, n in enumerate(clusters['sizes'])]
+
+        def build_cluster_profile():
+            fig_profile = px.imshow(
+                profile,
+                color_continuous_scale='RdBu_r',
+                color_continuous_midpoint=0,
+                aspect='auto',
+                text_auto='.2f',
+                title="Perfil dos Clusters (z-score dos centróides)"
+            )
+            fig_profile.update_layout(height=450)
+            return fig_profile
+
+        show_chart('modeling', 'cluster_profile', fingerprint, {**cluster_params, 'k': n_clusters}, build_cluster_profile)
+
+    with col2:
+        pcs = clusters['pcs']
+        explained = clusters['explained_variance']
+
+        def build_cluster_pca():
+            scatter_df = pd.DataFrame({
+                'PC1': pcs[:, 0],
+                'PC2': pcs[:, 1] if pcs.shape[1] > 1 else 0.0,
+                'Cluster': cluster_labels.to_numpy(),
+                'Jogador': df['Player'].to_numpy() if 'Player' in df.columns else df.index.to_numpy()
+            })
+            fig_pca = scatter_figure(
+                scatter_df,
+                x='PC1',
+                y='PC2',
+                color='Cluster',
+                hover_name='Jogador',
+                title=f"Jogadores no plano PCA ({explained.sum() * 100:.1f}% da variância)",
+                category_orders={'Cluster': sorted(scatter_df['Cluster'].unique(), key=lambda c: int(c.split()[-1]))}
+            )
+            fig_pca.update_layout(height=450)
+            return fig_pca
 
-    # Normalização
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.cluster import KMeans
+        show_chart('modeling', 'cluster_pca', fingerprint, {**cluster_params, 'k': n_clusters}, build_cluster_pca)
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    if clusters['minibatch']:
+        st.caption("Frame grande: agrupamento calculado com MiniBatchKMeans")
+
+    with st.expander("📋 Centróides e jogadores por cluster"):
+        centers = clusters['centers'].copy()
+        centers.insert(0, 'Jogadores', clusters['sizes'])
+        centers.index = [f"Cluster {i + 1}" for i in range(n_clusters)]
+        st.dataframe(centers.round(2), use_container_width=True)
+
+        chosen = st.selectbox("Ver jogadores do cluster:", centers.index.tolist())
+        members = df[cluster_labels == chosen]
+        show_cols = [c for c in ['Player', 'Squad', 'Pos'] if c in df.columns] + list(selected_features)
+        st.dataframe(members[show_cols].head(50), use_container_width=True)
 
 def show_statistical_tests_advanced(df):
     """Seção avançada com múltiplos testes estatísticos"""
@@ -1142,15 +1567,13 @@ def show_statistical_tests_advanced(df):
             var2 = st.selectbox("Variável 2:", [col for col in numeric_cols if col != var1])
 
         if var1 and var2:
-            # Pearson
-            from scipy.stats import pearsonr, spearmanr
-
             # Remover valores nulos
             data_clean = df[[var1, var2]].dropna()
 
             if len(data_clean) > 3:
-                pearson_corr, pearson_p = pearsonr(data_clean[var1], data_clean[var2])
-                spearman_corr, spearman_p = spearmanr(data_clean[var1], data_clean[var2])
+                pair = correlation_significance(data_clean)['pairs'].iloc[0]
+                pearson_corr, pearson_p = pair['pearson_r'], pair['pearson_p']
+                spearman_corr, spearman_p = pair['spearman_r'], pair['spearman_p']
 
                 col1, col2 = st.columns(2)
 
@@ -1175,14 +1598,17 @@ def show_statistical_tests_advanced(df):
                     """, unsafe_allow_html=True)
 
                 # Gráfico de dispersão
-                fig = px.scatter(
-                    data_clean,
-                    x=var1,
-                    y=var2,
-                    title=f"Correlação: {var1} vs {var2}",
-                    trendline="ols"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                def build_correlation_scatter():
+                    fig = scatter_figure(
+                        data_clean,
+                        x=var1,
+                        y=var2,
+                        title=f"Correlação: {var1} vs {var2}",
+                        trendline=True
+                    )
+                    return fig
+
+                show_chart('advanced', 'correlation_scatter', frame_fingerprint(df), {'x': var1, 'y': var2}, build_correlation_scatter)
 
                 # Interpretação
                 strength = "forte" if abs(pearson_corr) > 0.7 else "moderada" if abs(pearson_corr) > 0.3 else "fraca"
@@ -1196,32 +1622,47 @@ def show_statistical_tests_advanced(df):
                 </div>
                 """, unsafe_allow_html=True)
 
+        # Triagem: todos os pares numéricos em uma única chamada vetorizada
+        with st.expander("🔎 Triagem de correlações entre todas as variáveis numéricas"):
+            screening = calculate_correlation_matrix(frame_fingerprint(df), df, tuple(numeric_cols))
+            if screening:
+                pairs = screening['pairs']
+                significant = pairs[(pairs['pearson_q'] < 0.05) | (pairs['spearman_q'] < 0.05)]
+                st.markdown(
+                    f"**{len(significant)}** de **{len(pairs)}** pares significativos "
+                    f"após correção FDR (Benjamini-Hochberg, 5%)"
+                )
+                st.dataframe(significant.round(4), use_container_width=True)
+
     elif "Normalidade" in test_type:
         st.subheader("Teste de Normalidade")
 
         selected_var = st.selectbox("Escolha a variável:", numeric_cols)
 
         if selected_var:
-            from scipy.stats import shapiro, normaltest
-
             data = df[selected_var].dropna()
 
             if len(data) > 3:
-                # Shapiro-Wilk
-                shapiro_stat, shapiro_p = shapiro(data)
+                # Todas as colunas numéricas em um único passe (reaproveitado ao trocar de variável)
+                strata_col = next((c for c in ['Season', 'Pos'] if c in df.columns and df[c].nunique() > 1), None)
+                battery = get_normality_battery(frame_fingerprint(df), df, tuple(numeric_cols), strata_col)
+                row = battery.loc[selected_var]
 
-                # D'Agostino
-                dagostino_stat, dagostino_p = normaltest(data)
+                shapiro_stat, shapiro_p = row['shapiro_w'], row['shapiro_p']
+                dagostino_stat, dagostino_p = row['dagostino_k2'], row['dagostino_p']
+                mean_val, std_val = row['mean'], row['std']
 
-                col1, col2, col3 = st.columns(3)
+                col1, col2, col3, col4 = st.columns(4)
 
                 with col1:
+                    sample_note = f"amostra estratificada n={row['shapiro_n']}" if row['shapiro_n'] < row['n'] else f"n={row['n']}"
                     st.markdown(f"""
                     <div class="metric-card">
                         <h3>🔬 Shapiro-Wilk</h3>
                         <p><strong>W = {shapiro_stat:.4f}</strong></p>
                         <p>p-valor: {shapiro_p:.4f}</p>
                         <p>{'❌ Não normal' if shapiro_p < 0.05 else '✅ Normal'}</p>
+                        <p>{sample_note}</p>
                     </div>
                     """, unsafe_allow_html=True)
 
@@ -1236,66 +1677,103 @@ def show_statistical_tests_advanced(df):
                     """, unsafe_allow_html=True)
 
                 with col3:
-                    # Estatísticas descritivas
-                    mean_val = data.mean()
-                    std_val = data.std()
-                    skew_val = data.skew()
-                    kurt_val = data.kurtosis()
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <h3>📐 Anderson-Darling</h3>
+                        <p><strong>A² = {row['anderson_darling']:.4f}</strong></p>
+                        <p>p-valor: {row['anderson_darling_p']:.4f}</p>
+                        <p>Jarque-Bera: {row['jarque_bera']:.2f} (p = {row['jarque_bera_p']:.4f})</p>
+                    </div>
+                    """, unsafe_allow_html=True)
 
+                with col4:
+                    # Estatísticas descritivas
                     st.markdown(f"""
                     <div class="metric-card">
                         <h3>Descritivas</h3>
                         <p>Média: {mean_val:.2f}</p>
                         <p>Desvio: {std_val:.2f}</p>
-                        <p>Assimetria: {skew_val:.2f}</p>
-                        <p>Curtose: {kurt_val:.2f}</p>
+                        <p>Assimetria: {row['skew']:.2f}</p>
+                        <p>Curtose: {row['kurtosis']:.2f}</p>
                     </div>
                     """, unsafe_allow_html=True)
 
-                # Histograma com curva normal
-                fig = go.Figure()
+                # Histograma (densidade por bin, calculada no servidor) com curva normal
+                def build_normality_histogram():
+                    fig = histogram_figure(
+                        *get_histogram(frame_fingerprint(df), df, selected_var, 30, density=True),
+                        color='#1f77b4',
+                        name="Dados"
+                    )
+                    fig.update_traces(opacity=0.7)
 
-                # Histograma
-                fig.add_trace(go.Histogram(
-                    x=data,
-                    name="Dados",
-                    nbinsx=30,
-                    opacity=0.7,
-                    histnorm='probability density'
-                ))
+                    # Curva normal teórica
+                    x_norm = np.linspace(data.min(), data.max(), 100)
+                    y_norm = stats.norm.pdf(x_norm, mean_val, std_val)
 
-                # Curva normal teórica
-                x_norm = np.linspace(data.min(), data.max(), 100)
-                y_norm = stats.norm.pdf(x_norm, mean_val, std_val)
+                    fig.add_trace(go.Scatter(
+                        x=x_norm,
+                        y=y_norm,
+                        mode='lines',
+                        name='Normal Teórica',
+                        line=dict(color='red', width=2)
+                    ))
 
-                fig.add_trace(go.Scatter(
-                    x=x_norm,
-                    y=y_norm,
-                    mode='lines',
-                    name='Normal Teórica',
-                    line=dict(color='red', width=2)
-                ))
+                    fig.update_layout(
+                        title=f"Distribuição de {selected_var}",
+                        xaxis_title=selected_var,
+                        yaxis_title="Densidade",
+                        height=400
+                    )
+                    return fig
 
-                fig.update_layout(
-                    title=f"Distribuição de {selected_var}",
-                    xaxis_title=selected_var,
-                    yaxis_title="Densidade",
-                    height=400
-                )
+                show_chart('advanced', 'normality_histogram', frame_fingerprint(df), {'column': selected_var}, build_normality_histogram)
 
-                st.plotly_chart(fig, use_container_width=True)
+                # Q-Q plot com quantis pré-calculados
+                qq = get_qq_quantiles(frame_fingerprint(df), df, selected_var)
+
+                def build_normality_qq():
+                    fig_qq = go.Figure()
+                    fig_qq.add_trace(go.Scatter(
+                        x=qq['theoretical'],
+                        y=qq['sample'],
+                        mode='markers',
+                        name='Quantis',
+                        marker=dict(size=6, opacity=0.7)
+                    ))
+                    fig_qq.add_trace(go.Scatter(
+                        x=[qq['theoretical'].min(), qq['theoretical'].max()],
+                        y=[qq['theoretical'].min(), qq['theoretical'].max()],
+                        mode='lines',
+                        name='Normal',
+                        line=dict(color='red', dash='dash')
+                    ))
+                    fig_qq.update_layout(
+                        title=f"Q-Q Plot de {selected_var} ({len(qq)} quantis)",
+                        xaxis_title="Quantis teóricos (normal)",
+                        yaxis_title="Quantis amostrais",
+                        height=400
+                    )
+                    return fig_qq
+
+                show_chart('advanced', 'normality_qq', frame_fingerprint(df), {'column': selected_var}, build_normality_qq)
+
+                with st.expander("📋 Normalidade de todas as variáveis numéricas"):
+                    non_normal = (battery[['shapiro_p', 'dagostino_p', 'anderson_darling_p']] < 0.05).any(axis=1)
+                    st.markdown(f"**{int(non_normal.sum())}** de **{len(battery)}** variáveis rejeitam normalidade em pelo menos um teste")
+                    st.dataframe(battery.round(4), use_container_width=True)
 
     elif "Comparação de Grupos" in test_type:
         st.subheader("⚖️ Comparação de Grupos")
 
         # Selecionar variável categórica para grupos
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        categorical_cols = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
 
         if not categorical_cols:
             st.warning("❌ Nenhuma variável categórica disponível para formar grupos")
             return
 
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
 
         with col1:
             group_var = st.selectbox("Variável de Agrupamento:", categorical_cols)
@@ -1303,6 +1781,13 @@ def show_statistical_tests_advanced(df):
         with col2:
             numeric_var = st.selectbox("Variável Numérica:", numeric_cols)
 
+        with col3:
+            p_mode = st.radio(
+                "p-valor:",
+                ['Paramétrico', 'Permutação'],
+                help="Permutação: embaralha os rótulos dos grupos, sem supor normalidade"
+            )
+
         if group_var and numeric_var:
             # Filtrar apenas grupos com dados suficientes
             group_counts = df[group_var].value_counts()
@@ -1320,13 +1805,33 @@ def show_statistical_tests_advanced(df):
                 # Mann-Whitney U
                 u_stat, u_p = mannwhitneyu(group1_data, group2_data, alternative='two-sided')
 
+                t_title, t_line = "📊 t-test", f"t = {t_stat:.4f}"
+                u_title, u_line = "🎲 Mann-Whitney", f"U = {u_stat:.0f}"
+
+                if p_mode == 'Permutação':
+                    # Diferença de médias (t-test) e de postos médios (Mann-Whitney) por permutação
+                    fingerprint = frame_fingerprint(df)
+                    pair = tuple(str(g) for g in valid_groups)
+                    t_perm = get_permutation_test(fingerprint, df, numeric_var, group_var, pair)
+                    u_perm = get_permutation_test(fingerprint, df, numeric_var, group_var, pair, ranks=True)
+                    t_p, u_p = t_perm['p_value'], u_perm['p_value']
+
+                    # Estatísticas permutadas (com sinal na ordem dos grupos do teste)
+                    first, second = t_perm['groups']
+                    t_title, t_line = "🔀 Diferença de médias", f"Δ = {t_perm['statistic']:.4f} ({first} − {second})"
+                    u_title, u_line = "🔀 Diferença de postos médios", f"Δ = {u_perm['statistic']:.2f} ({first} − {second})"
+                    st.caption(
+                        f"🔀 p-valores por permutação da diferença de médias e da diferença de postos médios: "
+                        f"{t_perm['n_permutations']:,} {'divisões (exato)' if t_perm['exact'] else 'permutações'}"
+                    )
+
                 col1, col2, col3 = st.columns(3)
 
                 with col1:
                     st.markdown(f"""
                     <div class="metric-card">
-                        <h3>📊 t-test</h3>
-                        <p><strong>t = {t_stat:.4f}</strong></p>
+                        <h3>{t_title}</h3>
+                        <p><strong>{t_line}</strong></p>
                         <p>p-valor: {t_p:.4f}</p>
                         <p>{'✅ Diferença significativa' if t_p < 0.05 else '❌ Sem diferença'}</p>
                     </div>
@@ -1335,8 +1840,8 @@ def show_statistical_tests_advanced(df):
                 with col2:
                     st.markdown(f"""
                     <div class="metric-card">
-                        <h3>🎲 Mann-Whitney</h3>
-                        <p><strong>U = {u_stat:.0f}</strong></p>
+                        <h3>{u_title}</h3>
+                        <p><strong>{u_line}</strong></p>
                         <p>p-valor: {u_p:.4f}</p>
                         <p>{'✅ Diferença significativa' if u_p < 0.05 else '❌ Sem diferença'}</p>
                     </div>
@@ -1354,28 +1859,85 @@ def show_statistical_tests_advanced(df):
                     </div>
                     """, unsafe_allow_html=True)
 
-                # Box plot comparativo
-                fig = go.Figure()
+                # Box plot comparativo (quartis e outliers resumidos no servidor)
+                pair_df = df.loc[df[group_var].isin(valid_groups[:2]), [group_var, numeric_var]]
 
-                fig.add_trace(go.Box(
-                    y=group1_data,
-                    name=f"{valid_groups[0]}",
-                    boxpoints='outliers'
-                ))
+                def build_group_box():
+                    fig = box_figure(
+                        get_box_summary(frame_fingerprint(pair_df), pair_df, numeric_var, group_var),
+                        title=f"Comparação: {numeric_var} por {group_var}",
+                        y_title=numeric_var
+                    )
+                    fig.update_layout(height=400)
+                    return fig
 
-                fig.add_trace(go.Box(
-                    y=group2_data,
-                    name=f"{valid_groups[1]}",
-                    boxpoints='outliers'
-                ))
+                show_chart('advanced', 'group_box', frame_fingerprint(pair_df), {'value': numeric_var, 'group': group_var}, build_group_box)
 
-                fig.update_layout(
-                    title=f"Comparação: {numeric_var} por {group_var}",
-                    yaxis_title=numeric_var,
-                    height=400
-                )
+    elif "ANOVA" in test_type or "Homocedasticidade" in test_type:
+        st.subheader("🎲 Comparação entre Grupos (ANOVA e Homocedasticidade)")
+
+        group_options = [
+            col for col in ['Pos', 'Squad', 'Nation', 'Goal_Category', 'Competition', 'Season']
+            if col in df.columns and df[col].nunique() >= 2
+        ]
+        if not group_options:
+            st.warning("❌ Nenhuma variável de agrupamento disponível")
+            return
 
-                st.plotly_chart(fig, use_container_width=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            group_var = st.selectbox("Agrupar por:", group_options)
+        with col2:
+            numeric_var = st.selectbox(
+                "Métrica:",
+                numeric_cols,
+                index=numeric_cols.index('Goals') if 'Goals' in numeric_cols else 0
+            )
+
+        summary, battery = get_group_battery(frame_fingerprint(df), df, numeric_var, group_var)
+        if battery.empty:
+            st.warning("❌ Dados insuficientes (precisa de pelo menos 2 grupos com 3+ observações cada)")
+            return
+
+        tests = battery.set_index('test')
+        cards = ['ANOVA (one-way)', 'ANOVA de Welch', 'Kruskal-Wallis']
+        if "Homocedasticidade" in test_type:
+            cards = ['Levene', 'Brown-Forsythe', 'ANOVA de Welch']
+
+        for col, name in zip(st.columns(3), cards):
+            row = tests.loc[name]
+            with col:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>{name}</h3>
+                    <p><strong>Estatística = {row['statistic']:.4f}</strong></p>
+                    <p>p-valor: {row['p_value']:.4f}</p>
+                    <p>{'✅ Significativo' if row['p_value'] < 0.05 else '❌ Não significativo'}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+        levene_p = tests.loc['Brown-Forsythe', 'p_value']
+        recommended = 'ANOVA de Welch' if levene_p < 0.05 else 'ANOVA (one-way)'
+        st.markdown(f"""
+        <div class="insight-box">
+            <h4>📝 Interpretação</h4>
+            <p>{len(summary['labels'])} grupos de <strong>{group_var}</strong> com 3+ observações ({int(summary['n'].sum())} jogadores)</p>
+            <p>Brown-Forsythe p = {levene_p:.4f}: variâncias {'diferentes' if levene_p < 0.05 else 'homogêneas'} entre grupos,
+            então o teste recomendado é a <strong>{recommended}</strong> (p = {tests.loc[recommended, 'p_value']:.4f})</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        st.dataframe(battery.round(4), use_container_width=True)
+
+        with st.expander("📋 Resumo por grupo"):
+            st.dataframe(
+                group_summary_table(summary).sort_values('mean', ascending=False).round(3),
+                use_container_width=True
+            )
+
+        if "ANOVA" in test_type:
+            st.subheader("🔬 Comparações Post-hoc")
+            show_posthoc(df, numeric_var, group_var, key='advanced')
 
     elif "Regressão Linear" in test_type:
         st.subheader("Teste de Hipótese H1 - Regressão Linear")
@@ -1406,11 +1968,6 @@ def show_statistical_tests_advanced(df):
             )
 
         if dependent_var and independent_vars:
-            from sklearn.linear_model import LinearRegression
-            from sklearn.metrics import r2_score
-            import statsmodels.api as sm
-            from scipy import stats
-
             # Preparar dados
             X = df[independent_vars].dropna()
             y = df[dependent_var].dropna()
@@ -1422,19 +1979,14 @@ def show_statistical_tests_advanced(df):
 
             if len(X) > len(independent_vars) + 1:  # Verificar se há dados suficientes
 
-                # Modelo sklearn para métricas básicas
-                model_sklearn = LinearRegression()
-                model_sklearn.fit(X, y)
-                y_pred = model_sklearn.predict(X)
-                r2 = r2_score(y, y_pred)
-
-                # Modelo statsmodels para testes de significância
-                X_sm = sm.add_constant(X)  # Adicionar intercepto
-                model_sm = sm.OLS(y, X_sm).fit()
+                # Um único ajuste OLS fornece métricas e testes de significância
+                model_ols = fit_ols(X, y)
+                y_pred = model_ols['fitted']
+                r2 = model_ols['rsquared']
 
                 # Teste F global
-                f_statistic = model_sm.fvalue
-                f_pvalue = model_sm.f_pvalue
+                f_statistic = model_ols['fvalue']
+                f_pvalue = model_ols['f_pvalue']
 
                 # Resultados do teste de hipótese
                 st.subheader("📊 Resultados do Teste de Hipótese H1")
@@ -1455,7 +2007,7 @@ def show_statistical_tests_advanced(df):
                     st.markdown(f"""
                     <div class="metric-card">
                         <h3>📊 R² Ajustado</h3>
-                        <p><strong>R²adj = {model_sm.rsquared_adj:.4f}</strong></p>
+                        <p><strong>R²adj = {model_ols['rsquared_adj']:.4f}</strong></p>
                         <p>R² = {r2:.4f}</p>
                         <p>{(r2*100):.1f}% da variância explicada</p>
                     </div>
@@ -1470,8 +2022,8 @@ def show_statistical_tests_advanced(df):
                     <div class="metric-card">
                         <h3>⚖️ Decisão</h3>
                         <p><strong style="color: {decision_color};">{decision}</strong></p>
-                        <p>Graus de liberdade: {model_sm.df_model:.0f}</p>
-                        <p>Resíduos: {model_sm.df_resid:.0f}</p>
+                        <p>Graus de liberdade: {model_ols['df_model']:.0f}</p>
+                        <p>Resíduos: {model_ols['df_resid']:.0f}</p>
                     </div>
                     """, unsafe_allow_html=True)
 
@@ -1479,78 +2031,80 @@ def show_statistical_tests_advanced(df):
                 st.subheader("📋 Análise dos Coeficientes")
 
                 coef_data = []
-                for i, var in enumerate(['const'] + independent_vars):
-                    coef_val = model_sm.params[var]
-                    p_val = model_sm.pvalues[var]
-                    t_val = model_sm.tvalues[var]
-                    conf_int = model_sm.conf_int().loc[var]
+                summary = model_ols['summary']
+                for var in ['const'] + independent_vars:
+                    row = summary.loc[var]
 
                     coef_data.append({
                         'Variável': var,
-                        'Coeficiente': f"{coef_val:.4f}",
-                        'Erro Padrão': f"{model_sm.bse[var]:.4f}",
-                        'Estatística t': f"{t_val:.4f}",
-                        'p-valor': f"{p_val:.6f}",
-                        'IC 95% Inferior': f"{conf_int[0]:.4f}",
-                        'IC 95% Superior': f"{conf_int[1]:.4f}",
-                        'Significativo': "✅" if p_val < 0.05 else "❌"
+                        'Coeficiente': f"{row['coef']:.4f}",
+                        'Erro Padrão': f"{row['std_err']:.4f}",
+                        'Estatística t': f"{row['t']:.4f}",
+                        'p-valor': f"{row['p_value']:.6f}",
+                        'IC 95% Inferior': f"{row['ci_lower']:.4f}",
+                        'IC 95% Superior': f"{row['ci_upper']:.4f}",
+                        'Significativo': "✅" if row['p_value'] < 0.05 else "❌"
                     })
 
-                import pandas as pd
                 coef_df = pd.DataFrame(coef_data)
                 st.dataframe(coef_df, use_container_width=True)
 
                 # Gráfico de resíduos vs preditos
                 residuals = y - y_pred
+                regression_params = {'target': dependent_var, 'features': list(independent_vars)}
 
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    fig_resid = go.Figure()
-                    fig_resid.add_trace(go.Scatter(
-                        x=y_pred,
-                        y=residuals,
-                        mode='markers',
-                        name='Resíduos',
-                        marker=dict(color='blue', opacity=0.6)
-                    ))
-                    fig_resid.add_hline(y=0, line_dash="dash", line_color="red")
-                    fig_resid.update_layout(
-                        title="Resíduos vs Valores Preditos",
-                        xaxis_title="Valores Preditos",
-                        yaxis_title="Resíduos",
-                        height=400
-                    )
-                    st.plotly_chart(fig_resid, use_container_width=True)
+                    def build_residuals():
+                        fig_resid = go.Figure()
+                        fig_resid.add_trace(scatter_trace(
+                            y_pred,
+                            residuals,
+                            name='Resíduos',
+                            marker=dict(color='blue', opacity=0.6)
+                        )[0])
+                        fig_resid.add_hline(y=0, line_dash="dash", line_color="red")
+                        fig_resid.update_layout(
+                            title="Resíduos vs Valores Preditos",
+                            xaxis_title="Valores Preditos",
+                            yaxis_title="Resíduos",
+                            height=400
+                        )
+                        return fig_resid
+
+                    show_chart('advanced', 'residuals', frame_fingerprint(df), regression_params, build_residuals)
 
                 with col2:
-                    # Q-Q plot dos resíduos
-                    from scipy.stats import probplot
-
-                    qq_data = probplot(residuals, dist="norm")
-
-                    fig_qq = go.Figure()
-                    fig_qq.add_trace(go.Scatter(
-                        x=qq_data[0][0],
-                        y=qq_data[0][1],
-                        mode='markers',
-                        name='Resíduos',
-                        marker=dict(color='green', opacity=0.6)
-                    ))
-                    fig_qq.add_trace(go.Scatter(
-                        x=qq_data[0][0],
-                        y=qq_data[1][1] + qq_data[1][0] * qq_data[0][0],
-                        mode='lines',
-                        name='Linha Teórica',
-                        line=dict(color='red', dash='dash')
-                    ))
-                    fig_qq.update_layout(
-                        title="Q-Q Plot dos Resíduos",
-                        xaxis_title="Quantis Teóricos",
-                        yaxis_title="Quantis da Amostra",
-                        height=400
-                    )
-                    st.plotly_chart(fig_qq, use_container_width=True)
+                    # Q-Q plot dos resíduos (número fixo de quantis, independente do tamanho do frame)
+                    def build_residual_qq():
+                        qq_data = qq_quantiles(np.asarray(residuals))
+                        slope, intercept = np.polyfit(qq_data['theoretical'], qq_data['sample'], 1)
+
+                        fig_qq = go.Figure()
+                        fig_qq.add_trace(go.Scatter(
+                            x=qq_data['theoretical'],
+                            y=qq_data['sample'],
+                            mode='markers',
+                            name='Resíduos',
+                            marker=dict(color='green', opacity=0.6)
+                        ))
+                        fig_qq.add_trace(go.Scatter(
+                            x=qq_data['theoretical'],
+                            y=intercept + slope * qq_data['theoretical'],
+                            mode='lines',
+                            name='Linha Teórica',
+                            line=dict(color='red', dash='dash')
+                        ))
+                        fig_qq.update_layout(
+                            title="Q-Q Plot dos Resíduos",
+                            xaxis_title="Quantis Teóricos",
+                            yaxis_title="Quantis da Amostra",
+                            height=400
+                        )
+                        return fig_qq
+
+                    show_chart('advanced', 'residual_qq', frame_fingerprint(df), regression_params, build_residual_qq)
 
                 # Interpretação dos resultados
                 st.subheader("📝 Interpretação dos Resultados")
@@ -1564,15 +2118,15 @@ def show_statistical_tests_advanced(df):
                     interpretation.append("❌ **Conclusão H0:** Não rejeitamos a hipótese nula (H0). Não há evidência estatística suficiente para afirmar que existe uma relação linear significativa.")
 
                 # Análise individual dos coeficientes
-                significant_vars = [var for var in independent_vars if model_sm.pvalues[var] < 0.05]
-                non_significant_vars = [var for var in independent_vars if model_sm.pvalues[var] >= 0.05]
+                significant_vars = [var for var in independent_vars if summary.loc[var, 'p_value'] < 0.05]
+                non_significant_vars = [var for var in independent_vars if summary.loc[var, 'p_value'] >= 0.05]
 
                 if significant_vars:
                     interpretation.append(f"🎯 **Variáveis significativas:** {', '.join(significant_vars)}")
                 if non_significant_vars:
                     interpretation.append(f"⚠️ **Variáveis não significativas:** {', '.join(non_significant_vars)}")
 
-                interpretation.append(f"📈 **Qualidade do ajuste:** R² ajustado = {model_sm.rsquared_adj:.4f}")
+                interpretation.append(f"📈 **Qualidade do ajuste:** R² ajustado = {model_ols['rsquared_adj']:.4f}")
 
                 for text in interpretation:
                     st.markdown(text)
@@ -1593,37 +2147,34 @@ def show_statistical_tests_advanced(df):
             else:
                 st.warning("❌ Dados insuficientes para realizar a regressão linear")
 
-def show_player_comparison(df):
-    """Nova seção para comparação detalhada entre jogadores"""
+def show_player_comparison(df, player_index, similarity_index, percentile_table):
+    """Comparação entre jogadores escolhidos pela busca indexada (radar em percentis por posição)"""
     st.header("🥊 Comparação de Jogadores")
 
     # Seleção de jogadores
     st.subheader("👥 Selecione os Jogadores")
 
+    view_ids = df.index.to_numpy()
     col1, col2 = st.columns(2)
 
     with col1:
-        player1 = st.selectbox(
-            "🔵 Jogador 1:",
-            df['Player'].tolist(),
-            help="Selecione o primeiro jogador para comparação"
-        )
+        id1 = player_picker(player_index, view_ids, "🔵 Jogador 1:", key='compare_player1')
 
     with col2:
-        player2 = st.selectbox(
-            "🔴 Jogador 2:",
-            df['Player'].tolist(),
-            index=1 if len(df) > 1 else 0,
-            help="Selecione o segundo jogador para comparação"
-        )
+        id2 = player_picker(player_index, view_ids, "🔴 Jogador 2:", key='compare_player2', default=1)
 
-    if player1 == player2:
+    if id1 is None or id2 is None:
+        return
+    if id1 == id2:
         st.warning("⚠️ Selecione jogadores diferentes para comparação")
         return
 
-    # Dados dos jogadores
-    p1_data = df[df['Player'] == player1].iloc[0]
-    p2_data = df[df['Player'] == player2].iloc[0]
+    # Dados dos jogadores (linha exata, sem ambiguidade entre homônimos)
+    p1_data = df.loc[id1]
+    p2_data = df.loc[id2]
+    player1, player2 = p1_data['Player'], p2_data['Player']
+    if player1 == player2:
+        player1, player2 = player_index.label(id1), player_index.label(id2)
 
     # Comparação visual em cards
     st.subheader("📊 Comparação Geral")
@@ -1657,77 +2208,79 @@ def show_player_comparison(df):
         </div>
         """, unsafe_allow_html=True)
 
-    # Métricas de performance
-    st.subheader("⚽ Métricas de Performance")
-
-    metrics_to_compare = []
-    for col in ['Goals', 'Assists', 'Expected_Goals', 'Minutes', 'Goals_per_90', 'Assists_per_90']:
-        if col in df.columns:
-            metrics_to_compare.append(col)
-
-    if metrics_to_compare:
-        comparison_data = []
-
-        for metric in metrics_to_compare:
-            p1_val = p1_data.get(metric, 0)
-            p2_val = p2_data.get(metric, 0)
-
-            comparison_data.append({
-                'Métrica': metric,
-                player1: p1_val,
-                player2: p2_val,
-                'Diferença': p1_val - p2_val,
-                'Vantagem': player1 if p1_val > p2_val else player2 if p2_val > p1_val else 'Empate'
-            })
-
-        comparison_df = pd.DataFrame(comparison_data)
+    # Lista de jogadores adicionais (busca indexada, sem listar o dataset inteiro)
+    with st.expander("➕ Comparar Mais Jogadores"):
+        extra = player_picker(player_index, view_ids, "Jogador adicional:", key='compare_extra')
+        shortlist = [r for r in st.session_state.get('compare_shortlist', []) if r in df.index]
+
+        def add_to_shortlist():
+            if extra is not None and extra not in shortlist:
+                st.session_state['compare_shortlist'] = (shortlist + [extra])[:COMPARISON_MAX_PLAYERS - 2]
+
+        st.button("Adicionar à comparação", on_click=add_to_shortlist, key='compare_add')
+        st.multiselect(
+            "Jogadores adicionais:",
+            shortlist,
+            format_func=player_index.label,
+            key='compare_shortlist'
+        )
 
-        # Gráfico radar/polar
-        fig = go.Figure()
+    player_ids = list(dict.fromkeys([id1, id2] + st.session_state.get('compare_shortlist', [])))
+    player_ids = [r for r in player_ids if r in df.index]
+    names = df.loc[player_ids, 'Player'].astype(str)
+    if names.duplicated(keep=False).any():
+        names = pd.Series([player_index.label(r) for r in player_ids], index=player_ids)
+    names = names.to_dict()
 
-        # Normalizar valores para o gráfico radar
-        for i, metric in enumerate(metrics_to_compare):
-            max_val = df[metric].max() if df[metric].max() > 0 else 1
+    # Métricas de performance: percentis dentro da posição, pré-calculados no carregamento
+    st.subheader("⚽ Métricas de Performance")
 
-            p1_norm = (p1_data.get(metric, 0) / max_val) * 100
-            p2_norm = (p2_data.get(metric, 0) / max_val) * 100
+    if percentile_table.metrics:
+        percentiles = percentile_table.lookup(player_ids)
+        raw = percentile_table.raw(player_ids)
+        metrics = percentile_table.metrics
 
-            if i == 0:  # Primeiro loop
+        # Gráfico radar/polar: um traço por jogador
+        def build_radar():
+            fig = go.Figure()
+            palette = px.colors.qualitative.Plotly
+            for i, row_id in enumerate(player_ids):
                 fig.add_trace(go.Scatterpolar(
-                    r=[p1_norm] + [0] * (len(metrics_to_compare) - 1),
-                    theta=metrics_to_compare,
+                    r=percentiles.loc[row_id].tolist() + [percentiles.loc[row_id].iloc[0]],
+                    theta=metrics + [metrics[0]],
                     fill='toself',
-                    name=player1,
-                    line_color='blue'
+                    opacity=0.6,
+                    name=names[row_id],
+                    line_color=palette[i % len(palette)]
                 ))
 
-                fig.add_trace(go.Scatterpolar(
-                    r=[p2_norm] + [0] * (len(metrics_to_compare) - 1),
-                    theta=metrics_to_compare,
-                    fill='toself',
-                    name=player2,
-                    line_color='red'
-                ))
-            else:
-                # Atualizar dados existentes
-                fig.data[0].r = [p1_data.get(m, 0) / df[m].max() * 100 for m in metrics_to_compare]
-                fig.data[1].r = [p2_data.get(m, 0) / df[m].max() * 100 for m in metrics_to_compare]
+            fig.update_layout(
+                polar=dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, 100]
+                    )),
+                showlegend=True,
+                title="Comparação de Performance (percentil dentro da posição)"
+            )
+            return fig
 
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 100]
-                )),
-            showlegend=True,
-            title="Comparação de Performance (% do máximo no dataset)"
+        show_chart('comparison', 'radar', frame_fingerprint(df), {'players': [int(r) for r in player_ids]}, build_radar)
+        st.caption(
+            "Percentis calculados no dataset completo, dentro da posição principal de cada jogador: "
+            + ", ".join(f"{names[r]} ({pos})" for r, pos in percentile_table.position_of(player_ids).items())
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        # Tabela de comparação: valor (percentil) por jogador + quem lidera cada métrica
+        comparison_df = pd.DataFrame({
+            names[r]: [f"{v:,.2f} ({p:.0f}º)" for v, p in zip(raw.loc[r], percentiles.loc[r])]
+            for r in player_ids
+        }, index=pd.Index(metrics, name='Métrica'))
+        leaders = raw.idxmax(axis=0)
+        comparison_df['Líder'] = [names[leaders[m]] if pd.notna(leaders[m]) else '-' for m in metrics]
 
-        # Tabela de comparação
         st.subheader("📋 Tabela Comparativa")
-        st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+        st.dataframe(comparison_df.reset_index(), use_container_width=True, hide_index=True)
 
     # Insights da comparação
     st.subheader("Insights da Comparação")
@@ -1762,23 +2315,87 @@ def show_player_comparison(df):
     else:
         st.info("📊 Jogadores com performance muito similar!")
 
+    show_similar_players(df, id1, player1, similarity_index)
+
+def show_similar_players(df, row_id, player_name, similarity_index):
+    """Jogadores com perfil por 90 mais parecido com o do jogador escolhido"""
+    st.subheader(f"🧭 Quem Joga Como {player_name}?")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        same_position = st.checkbox("Mesma posição", value=True, key='similar_same_pos')
+    with col2:
+        min_minutes = st.slider("Minutos mínimos:", 0, 2000, 450, step=90, key='similar_min_minutes')
+    with col3:
+        metric_label = st.radio("Distância:", ['Cosseno', 'Euclidiana'], horizontal=True, key='similar_metric')
+    with col4:
+        k = st.slider("Quantidade:", 3, 25, SIMILARITY_TOP_K, key='similar_k')
+
+    similar = similarity_index.most_similar(
+        row_id,
+        k=k,
+        metric='cosine' if metric_label == 'Cosseno' else 'euclidean',
+        same_position=same_position,
+        min_minutes=min_minutes,
+        within=df.index.to_numpy()
+    )
+    if similar.empty:
+        st.info("Nenhum jogador atende às restrições no recorte atual")
+        return
+
+    columns = [c for c in ['Player', 'Squad', 'Pos', 'Age', 'Minutes'] if c in df.columns]
+    table = df.loc[similar['row_id'], columns].reset_index(drop=True)
+    table.insert(0, '#', similar['rank'].to_numpy())
+    table['Similaridade' if metric_label == 'Cosseno' else 'Distância'] = (
+        similar['score'].to_numpy() if metric_label == 'Cosseno' else -similar['score'].to_numpy()
+    )
+    st.dataframe(table.round(3), use_container_width=True, hide_index=True)
+
+    # Perfil z do jogador vs. o mais parecido
+    best_id = similar['row_id'].iloc[0]
+    profiles = pd.DataFrame({
+        player_name: similarity_index.profile(row_id),
+        df.loc[best_id, 'Player']: similarity_index.profile(best_id)
+    })
+
+    def build_similar_profile():
+        fig = px.bar(
+            profiles.reset_index(names='Variável').melt(id_vars='Variável', var_name='Jogador', value_name='z'),
+            x='Variável',
+            y='z',
+            color='Jogador',
+            barmode='group',
+            title="Perfil Padronizado (z) por 90 Minutos"
+        )
+        fig.update_layout(height=400)
+        return fig
+
+    show_chart('comparison', 'similar_profile', frame_fingerprint(df), {'players': [int(row_id), int(best_id)]},
+               build_similar_profile)
+
 def show_team_analysis(df):
-    """Nova seção para análise por time"""
+    """Análise por time servida pelo cubo time × posição (trocar de time é uma consulta)"""
     st.header("🏟️ Análise por Times")
 
     if 'Squad' not in df.columns:
         st.error("❌ Dados de times não disponíveis")
         return
 
+    fingerprint = frame_fingerprint(df)
+    cube = get_squad_cube(fingerprint, df)
+
     # Seleção de time
-    teams = sorted(df['Squad'].unique())
     selected_team = st.selectbox(
         "⚽ Selecione um Time:",
-        teams,
+        cube.teams,
         help="Escolha um time para análise detalhada"
     )
+    if selected_team is None:
+        st.info("Nenhum time no recorte atual")
+        return
 
-    team_data = df[df['Squad'] == selected_team]
+    team = cube.team(selected_team)
+    totals, means = team['totals'], team['means']
 
     # Estatísticas do time
     st.subheader(f"📊 Estatísticas - {selected_team}")
@@ -1786,37 +2403,33 @@ def show_team_analysis(df):
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        total_players = len(team_data)
         st.markdown(f"""
         <div class="big-metric">
-            <h1>{total_players}</h1>
+            <h1>{team['players']}</h1>
             <p>👥 Jogadores</p>
         </div>
         """, unsafe_allow_html=True)
 
     with col2:
-        total_goals = team_data['Goals'].sum() if 'Goals' in team_data.columns else 0
         st.markdown(f"""
         <div class="big-metric">
-            <h1>{total_goals}</h1>
+            <h1>{totals.get('Goals', 0):.0f}</h1>
             <p>⚽ Gols Totais</p>
         </div>
         """, unsafe_allow_html=True)
 
     with col3:
-        avg_age = team_data['Age'].mean() if 'Age' in team_data.columns else 0
         st.markdown(f"""
         <div class="big-metric">
-            <h1>{avg_age:.1f}</h1>
+            <h1>{means.get('Age', 0):.1f}</h1>
             <p>👶 Idade Média</p>
         </div>
         """, unsafe_allow_html=True)
 
     with col4:
-        total_minutes = team_data['Minutes'].sum() if 'Minutes' in team_data.columns else 0
         st.markdown(f"""
         <div class="big-metric">
-            <h1>{total_minutes:,}</h1>
+            <h1>{totals.get('Minutes', 0):,.0f}</h1>
             <p>⏱️ Minutos Totais</p>
         </div>
         """, unsafe_allow_html=True)
@@ -1827,182 +2440,138 @@ def show_team_analysis(df):
     col1, col2 = st.columns(2)
 
     with col1:
-        if 'Goals' in team_data.columns:
-            top_scorer = team_data.loc[team_data['Goals'].idxmax()]
+        if team['top_scorer'] is not None:
+            player, goals = team['top_scorer']
             st.markdown(f"""
             <div class="success-box">
                 <h3>👑 Artilheiro</h3>
-                <p><strong>{top_scorer['Player']}</strong></p>
-                <p>{top_scorer['Goals']} gols</p>
+                <p><strong>{player}</strong></p>
+                <p>{goals:.0f} gols</p>
             </div>
             """, unsafe_allow_html=True)
 
     with col2:
-        if 'Assists' in team_data.columns:
-            top_assistant = team_data.loc[team_data['Assists'].idxmax()]
+        if team['top_assistant'] is not None:
+            player, assists = team['top_assistant']
             st.markdown(f"""
             <div class="success-box">
                 <h3>Melhor Assistente</h3>
-                <p><strong>{top_assistant['Player']}</strong></p>
-                <p>{top_assistant['Assists']} assistências</p>
+                <p><strong>{player}</strong></p>
+                <p>{assists:.0f} assistências</p>
             </div>
             """, unsafe_allow_html=True)
 
+    col1, col2 = st.columns(2)
+
     # Distribuição por posição no time
-    if 'Pos' in team_data.columns:
+    with col1:
         st.subheader("📊 Distribuição por Posição")
 
-        pos_dist = team_data['Pos'].value_counts()
+        def build_position_bar():
+            pos_dist = team['positions'].sort_values(ascending=False)
+            fig = px.bar(
+                x=pos_dist.index,
+                y=pos_dist.values,
+                title=f"Jogadores por Posição - {selected_team}",
+                color=pos_dist.values,
+                color_continuous_scale='Viridis'
+            )
+            fig.update_layout(
+                xaxis_title="Posição",
+                yaxis_title="Número de Jogadores",
+                height=400
+            )
+            return fig
 
-        fig = px.bar(
-            x=pos_dist.index,
-            y=pos_dist.values,
-            title=f"Jogadores por Posição - {selected_team}",
-            color=pos_dist.values,
-            color_continuous_scale='Viridis'
-        )
+        show_chart('teams', 'position_bar', fingerprint, {'team': selected_team}, build_position_bar)
 
-        fig.update_layout(
-            xaxis_title="Posição",
-            yaxis_title="Número de Jogadores",
-            height=400
-        )
+    # Distribuição de minutos (faixas fixas do cubo)
+    with col2:
+        st.subheader("⏱️ Distribuição de Minutos")
 
-        st.plotly_chart(fig, use_container_width=True)
+        def build_minutes_bar():
+            fig = px.bar(
+                x=cube.minutes_labels(),
+                y=team['minutes_hist'],
+                title=f"Jogadores por Faixa de Minutos - {selected_team}",
+                color_discrete_sequence=['#667eea']
+            )
+            fig.update_layout(
+                xaxis_title="Minutos Jogados",
+                yaxis_title="Número de Jogadores",
+                height=400
+            )
+            return fig
+
+        show_chart('teams', 'minutes_bar', fingerprint, {'team': selected_team}, build_minutes_bar)
 
     # Comparação com outros times
     st.subheader("🏆 Comparação com Outros Times")
 
-    # Ranking de times
-    team_stats = df.groupby('Squad').agg({
-        'Goals': 'sum',
-        'Assists': 'sum' if 'Assists' in df.columns else lambda x: 0,
-        'Player': 'count'
-    }).round(2)
-
-    team_stats.columns = ['Gols Totais', 'Assistências Totais', 'Jogadores']
-    team_stats = team_stats.sort_values('Gols Totais', ascending=False)
-
-    # Posição do time selecionado
-    team_position = team_stats.index.get_loc(selected_team) + 1
-
     st.markdown(f"""
     <div class="insight-box">
         <h3>Posição no Ranking</h3>
-        <p><strong>{selected_team}</strong> está em <strong>{team_position}º lugar</strong> em gols totais</p>
+        <p><strong>{selected_team}</strong> está em <strong>{team['rank']}º lugar</strong> em gols totais</p>
     </div>
     """, unsafe_allow_html=True)
 
     # Top 10 times
     st.markdown("### 🏅 Top 10 Times por Gols")
-    st.dataframe(team_stats.head(10), use_container_width=True)
-    """Modelagem estatística e regressão linear"""
-    st.header("📈 Modelagem Estatística")
-
-    st.subheader("🎯 Modelo de Regressão Linear")
-
-    # Seleção de variáveis para o modelo
-    target_options = []
-    feature_options = []
-
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-
-    for col in ['Goals', 'Assists', 'G+A', 'Performance_Score']:
-        if col in df.columns:
-            target_options.append(col)
-
-    for col in ['xG', 'Shots', 'Min', 'Age', 'Goals_per_90', 'Assists_per_90']:
-        if col in df.columns:
-            feature_options.append(col)
-
-    if target_options and feature_options:
-        col1, col2 = st.columns(2)
-
-        with col1:
-            target_var = st.selectbox("Variável Dependente (Y):", target_options)
-
-        with col2:
-            selected_features = st.multiselect(
-                "Variáveis Independentes (X):",
-                feature_options,
-                default=feature_options[:3] if len(feature_options) >= 3 else feature_options
+    st.dataframe(cube.league_table.head(10).round(2), use_container_width=True)
+
+    # Time × posição para uma métrica
+    with st.expander("🧮 Times × Posições"):
+        metric = st.selectbox("Métrica:", cube.metrics, key='team_cube_metric')
+        how = st.radio("Agregação:", ['Soma', 'Média'], horizontal=True, key='team_cube_how')
+
+        def build_position_heatmap():
+            table = cube.position_table(metric, how='mean' if how == 'Média' else 'sum')
+            fig = px.imshow(
+                table,
+                aspect='auto',
+                color_continuous_scale='Viridis',
+                title=f"{metric} ({how.lower()}) por Time e Posição"
             )
+            fig.update_layout(height=max(400, 22 * len(table)))
+            return fig
 
-        if target_var and selected_features:
-            # Preparar dados
-            X = df[selected_features].fillna(df[selected_features].median())
-            y = df[target_var].fillna(df[target_var].median())
-
-            # Dividir dados
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-            # Modelo de regressão linear
-            model = LinearRegression()
-            model.fit(X_train, y_train)
-
-            # Predições
-            y_pred_train = model.predict(X_train)
-            y_pred_test = model.predict(X_test)
+        show_chart('teams', 'position_heatmap', fingerprint, {'metric': metric, 'how': how}, build_position_heatmap)
 
-            # Métricas
-            r2_train = r2_score(y_train, y_pred_train)
-            r2_test = r2_score(y_test, y_pred_test)
-            rmse_test = np.sqrt(mean_squared_error(y_test, y_pred_test))
-            mae_test = mean_absolute_error(y_test, y_pred_test)
+def show_bootstrap_interval(result, label, interval, fingerprint, params):
+    """
+    Card com o intervalo bootstrap e histograma da distribuição reamostrada
+    (``fingerprint``/``params`` identificam o bootstrap no cache de figuras)
+    """
+    low, high = result['bca'] if interval == 'BCa' else result['percentile']
+    confidence = result['confidence'] * 100
 
-            # Exibir métricas
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                st.metric("R² Treino", f"{r2_train:.3f}")
-            with col2:
-                st.metric("R² Teste", f"{r2_test:.3f}")
-            with col3:
-                st.metric("RMSE", f"{rmse_test:.3f}")
-            with col4:
-                st.metric("MAE", f"{mae_test:.3f}")
-
-            # Gráfico de predições vs valores reais
-            fig = px.scatter(
-                x=y_test,
-                y=y_pred_test,
-                title=f"Predições vs Valores Reais - {target_var}",
-                labels={'x': f'{target_var} Real', 'y': f'{target_var} Predito'}
-            )
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>🎲 IC Bootstrap ({interval})</h3>
+            <p><strong>{label} = {result['estimate']:.4f}</strong></p>
+            <p>IC {confidence:.0f}%: [{low:.4f}, {high:.4f}]</p>
+            <p>Erro padrão: {result['se']:.4f} · {result['n_resamples']:,} reamostras</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-            # Linha de predição perfeita
-            min_val = min(y_test.min(), y_pred_test.min())
-            max_val = max(y_test.max(), y_pred_test.max())
-            fig.add_scatter(
-                x=[min_val, max_val],
-                y=[min_val, max_val],
-                mode='lines',
-                name='Predição Perfeita',
-                line=dict(color='red', dash='dash')
+    with col2:
+        def build_bootstrap_histogram():
+            fig = histogram_figure(
+                *histogram_summary(result['distribution'], 60),
+                title=f"Distribuição bootstrap de {label}",
+                x_title=label
             )
+            fig.add_vline(x=low, line_dash='dash', line_color='red')
+            fig.add_vline(x=high, line_dash='dash', line_color='red')
+            fig.add_vline(x=result['estimate'], line_color='black')
+            fig.update_layout(height=300, showlegend=False, yaxis_title='Frequência')
+            return fig
 
-            st.plotly_chart(fig, use_container_width=True)
-
-            # Coeficientes do modelo
-            st.subheader("📊 Coeficientes do Modelo")
-
-            coefficients_df = pd.DataFrame({
-                'Variável': selected_features,
-                'Coeficiente': model.coef_,
-                'Abs_Coeficiente': np.abs(model.coef_)
-            }).sort_values('Abs_Coeficiente', ascending=False)
-
-            st.dataframe(coefficients_df, hide_index=True)
-
-            # Intervalos de confiança usando statsmodels
-            X_sm = sm.add_constant(X_train)
-            model_sm = sm.OLS(y_train, X_sm).fit()
-
-            st.subheader("📏 Intervalos de Confiança (95%)")
-            conf_int = model_sm.conf_int()
-            conf_int.columns = ['Limite Inferior', 'Limite Superior']
-            conf_int.index = ['Intercepto'] + selected_features
-            st.dataframe(conf_int.round(4))
+        show_chart('hypothesis', 'bootstrap', fingerprint, {
+            **params, 'label': label, 'interval': interval, 'n_resamples': result['n_resamples']
+        }, build_bootstrap_histogram)
 
 def show_hypothesis_testing(df):
     """Testes de hipóteses"""
@@ -2013,6 +2582,21 @@ def show_hypothesis_testing(df):
     Análise estatística rigorosa com base nos dados da Premier League:
     """)
 
+    # Gols e assistências têm muitos zeros: além do p-valor assintótico, mostramos ICs bootstrap
+    # e p-valores por permutação, que não dependem de normalidade
+    with st.expander("🎲 Configuração da Reamostragem"):
+        use_permutation = st.checkbox("🔀 p-valor por permutação na ANOVA", value=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            n_resamples = st.select_slider(
+                "Reamostras:",
+                options=[1000, 2000, 5000, 10000, 20000],
+                value=10000
+            )
+        with col2:
+            interval = st.radio("Intervalo:", ['BCa', 'Percentil'], horizontal=True)
+    fingerprint = frame_fingerprint(df)
+
     # Teste 1: Expected Goals prediz gols reais
     if 'Expected_Goals' in df.columns and 'Goals' in df.columns:
         st.subheader("H1: Expected Goals (xG) prediz gols reais")
@@ -2026,12 +2610,11 @@ def show_hypothesis_testing(df):
         </div>
         """, unsafe_allow_html=True)
 
-        # Preparar dados - remover valores nulos
-        clean_data = df[['Expected_Goals', 'Goals']].dropna()
+        # Correlação de Pearson nas linhas completas (None com dados insuficientes)
+        h1 = analytics.correlation_test(df, 'Expected_Goals', 'Goals')
 
-        if len(clean_data) > 10:  # Verificar se há dados suficientes
-            # Correlação de Pearson
-            corr_coef, p_value = stats.pearsonr(clean_data['Expected_Goals'], clean_data['Goals'])
+        if h1 is not None:
+            corr_coef, p_value, clean_data = h1['r'], h1['p_value'], h1['data']
 
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -2063,17 +2646,25 @@ def show_hypothesis_testing(df):
                 </div>
                 """, unsafe_allow_html=True)
 
-            # Gráfico de dispersão
-            fig = px.scatter(
-                clean_data,
-                x='Expected_Goals',
-                y='Goals',
-                title="Relação entre Expected Goals e Gols Reais",
-                trendline="ols",
-                labels={'Expected_Goals': 'Expected Goals (xG)', 'Goals': 'Gols Reais'}
+            show_bootstrap_interval(
+                get_bootstrap(fingerprint, df, 'correlation', ('Expected_Goals', 'Goals'), n_resamples=n_resamples),
+                'r', interval, fingerprint, {'kind': 'correlation', 'columns': ['Expected_Goals', 'Goals']}
             )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+
+            # Gráfico de dispersão
+            def build_xg_scatter():
+                fig = scatter_figure(
+                    clean_data,
+                    x='Expected_Goals',
+                    y='Goals',
+                    title="Relação entre Expected Goals e Gols Reais",
+                    trendline=True,
+                    labels={'Expected_Goals': 'Expected Goals (xG)', 'Goals': 'Gols Reais'}
+                )
+                fig.update_layout(height=400)
+                return fig
+
+            show_chart('hypothesis', 'xg_scatter', fingerprint, {}, build_xg_scatter)
 
             # Interpretação detalhada
             st.markdown(f"""
@@ -2103,15 +2694,13 @@ def show_hypothesis_testing(df):
         </div>
         """, unsafe_allow_html=True)
 
-        # ANOVA
-        positions = df['Pos'].unique()
-        groups = [df[df['Pos'] == pos]['Goals'].dropna() for pos in positions]
-
-        # Remover grupos vazios e com poucos dados
-        groups = [group for group in groups if len(group) >= 3]
+        # ANOVA a partir do resumo por grupo (posições com 3+ observações)
+        pos_summary, battery = get_group_battery(fingerprint, df, 'Goals', 'Pos')
 
-        if len(groups) >= 2:
-            f_stat, p_value = stats.f_oneway(*groups)
+        if not battery.empty:
+            anova_row = battery.set_index('test').loc['ANOVA (one-way)']
+            f_stat, p_value = anova_row['statistic'], anova_row['p_value']
+            n_groups, n_players = len(pos_summary['labels']), int(pos_summary['n'].sum())
 
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -2119,7 +2708,7 @@ def show_hypothesis_testing(df):
                 <div class="metric-card">
                     <h3>📊 F-statistic</h3>
                     <p><strong>F = {f_stat:.4f}</strong></p>
-                    <p>{len(groups)} grupos comparados</p>
+                    <p>{n_groups} grupos comparados</p>
                 </div>
                 """, unsafe_allow_html=True)
 
@@ -2139,28 +2728,52 @@ def show_hypothesis_testing(df):
                 <div class="metric-card">
                     <h3>⚖️ Decisão</h3>
                     <p><strong style="color: {resultado_cor};">{resultado}</strong></p>
-                    <p>Total: {sum(len(g) for g in groups)} jogadores</p>
+                    <p>Total: {n_players} jogadores</p>
                 </div>
                 """, unsafe_allow_html=True)
 
-            # Box plot por posição
-            pos_data = []
-            for pos in positions:
-                pos_goals = df[df['Pos'] == pos]['Goals'].tolist()
-                if len(pos_goals) >= 3:  # Apenas posições com dados suficientes
-                    pos_data.extend([(pos, goal) for goal in pos_goals])
-
-            if pos_data:
-                pos_df = pd.DataFrame(pos_data, columns=['Posição', 'Gols'])
-
-                fig = px.box(
-                    pos_df,
-                    x='Posição',
-                    y='Gols',
-                    title="Distribuição de Gols por Posição"
+            if use_permutation:
+                permutation = get_permutation_test(fingerprint, df, 'Goals', 'Pos')
+                show_permutation_result(permutation, f"F = {permutation['statistic']:.4f}")
+
+            # Tamanho do efeito (η² = R² de Gols ~ Posição) e maior diferença de médias entre posições
+            show_bootstrap_interval(
+                get_bootstrap(fingerprint, df, 'r_squared', ('Pos', 'Goals'), n_resamples=n_resamples),
+                'η²', interval, fingerprint, {'kind': 'r_squared', 'columns': ['Pos', 'Goals']}
+            )
+
+            top_pos, bottom_pos = analytics.extreme_groups(pos_summary)
+            show_bootstrap_interval(
+                get_bootstrap(
+                    fingerprint, df, 'mean_difference', ('Pos', 'Goals'),
+                    groups=(top_pos, bottom_pos), n_resamples=n_resamples
+                ),
+                f'Δ gols ({top_pos} − {bottom_pos})', interval,
+                fingerprint, {'kind': 'mean_difference', 'columns': ['Pos', 'Goals'], 'groups': [top_pos, bottom_pos]}
+            )
+
+            # Box plot por posição (apenas posições com dados suficientes)
+            pos_df = df.loc[df['Pos'].astype(str).isin(pos_summary['labels']), ['Pos', 'Goals']]
+
+            def build_position_box():
+                fig = box_figure(
+                    get_box_summary(frame_fingerprint(pos_df), pos_df, 'Goals', 'Pos'),
+                    title="Distribuição de Gols por Posição",
+                    x_title='Posição',
+                    y_title='Gols'
                 )
                 fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                return fig
+
+            show_chart('hypothesis', 'position_box', frame_fingerprint(pos_df), {}, build_position_box)
+
+            with st.expander("📋 Bateria de testes (ANOVA, Welch, Levene, Brown-Forsythe, Kruskal-Wallis)"):
+                st.dataframe(battery.round(4), use_container_width=True)
+
+            # Post-hoc: quais posições diferem entre si
+            if p_value < 0.05:
+                st.markdown("#### 🔬 Quais posições diferem? (post-hoc)")
+                show_posthoc(df, 'Goals', 'Pos', key='h2')
 
             st.markdown(f"""
             <div class="insight-box">
@@ -2186,11 +2799,10 @@ def show_hypothesis_testing(df):
         </div>
         """, unsafe_allow_html=True)
 
-        # Preparar dados
-        age_goals_data = df[['Age', 'Goals']].dropna()
+        h3 = analytics.correlation_test(df, 'Age', 'Goals')
 
-        if len(age_goals_data) > 10:
-            corr_coef, p_value = stats.pearsonr(age_goals_data['Age'], age_goals_data['Goals'])
+        if h3 is not None:
+            corr_coef, p_value, age_goals_data = h3['r'], h3['p_value'], h3['data']
 
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -2222,16 +2834,24 @@ def show_hypothesis_testing(df):
                 </div>
                 """, unsafe_allow_html=True)
 
-            # Gráfico de dispersão idade vs gols
-            fig = px.scatter(
-                age_goals_data,
-                x='Age',
-                y='Goals',
-                title="Relação entre Idade e Número de Gols",
-                trendline="ols"
+            show_bootstrap_interval(
+                get_bootstrap(fingerprint, df, 'correlation', ('Age', 'Goals'), n_resamples=n_resamples),
+                'r', interval, fingerprint, {'kind': 'correlation', 'columns': ['Age', 'Goals']}
             )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+
+            # Gráfico de dispersão idade vs gols
+            def build_age_scatter():
+                fig = scatter_figure(
+                    age_goals_data,
+                    x='Age',
+                    y='Goals',
+                    title="Relação entre Idade e Número de Gols",
+                    trendline=True
+                )
+                fig.update_layout(height=400)
+                return fig
+
+            show_chart('hypothesis', 'age_scatter', fingerprint, {}, build_age_scatter)
 
             st.markdown(f"""
             <div class="insight-box">
@@ -2250,7 +2870,7 @@ def show_hypothesis_testing(df):
     st.markdown("""
     <div class="insight-box">
         <h4>🎯 Metodologia Aplicada</h4>
-        <p><strong>Testes realizados:</strong> Correlação de Pearson e ANOVA</p>
+        <p><strong>Testes realizados:</strong> Correlação de Pearson e ANOVA, com intervalos bootstrap (percentil/BCa)</p>
         <p><strong>Nível de significância:</strong> α = 0.05 (95% de confiança)</p>
         <p><strong>Interpretação:</strong> p < 0.05 indica evidência estatística suficiente para rejeitar H0</p>
         <p><strong>Limitações:</strong> Resultados válidos para este dataset específico da temporada 2023/24</p>
@@ -2261,57 +2881,44 @@ def show_visualizations(df):
     """Visualizações avançadas"""
     st.header("📊 Visualizações dos Dados")
 
+    fingerprint = frame_fingerprint(df)
+
     # Distribuição de gols
     if 'Goals' in df.columns:
         st.subheader("⚽ Distribuição de Gols")
 
-        fig = px.histogram(
-            df,
-            x='Goals',
-            nbins=20,
+        show_chart('visualizations', 'goals_histogram', fingerprint, {}, lambda: histogram_figure(
+            *get_histogram(fingerprint, df, 'Goals', 20),
             title="Distribuição do Número de Gols",
-            labels={'Goals': 'Número de Gols', 'count': 'Frequência'}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            x_title='Número de Gols'
+        ))
 
     # Box plot por posição
     if 'Pos' in df.columns and 'Goals' in df.columns:
         st.subheader("📦 Performance por Posição")
 
-        fig = px.box(
-            df,
-            x='Pos',
-            y='Goals',
-            title="Distribuição de Gols por Posição"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart('visualizations', 'position_box', fingerprint, {}, lambda: box_figure(
+            get_box_summary(fingerprint, df, 'Goals', 'Pos'),
+            title="Distribuição de Gols por Posição",
+            x_title='Pos',
+            y_title='Goals'
+        ))
 
-    # Scatter plot interativo
-    if all(col in df.columns for col in ['xG', 'Goals']):
+    # Scatter plot interativo (WebGL + amostragem por densidade em frames grandes)
+    xg_col = analytics.xg_column(df)
+    if all(col in df.columns for col in [xg_col, 'Goals']):
         st.subheader("🎯 Relação xG vs Gols Reais")
 
-        fig = px.scatter(
+        # Linha de tendência ajustada em todas as linhas com xG e gols
+        show_chart('visualizations', 'xg_scatter', fingerprint, {'x': xg_col}, lambda: scatter_figure(
             df,
-            x='xG',
+            x=xg_col,
             y='Goals',
             color='Pos' if 'Pos' in df.columns else None,
             hover_data=['Player'] if 'Player' in df.columns else None,
-            title="Expected Goals vs Gols Reais"
-        )
-
-        # Linha de tendência
-        if len(df['xG'].dropna()) > 1:
-            z = np.polyfit(df['xG'].dropna(), df['Goals'].dropna(), 1)
-            p = np.poly1d(z)
-            fig.add_scatter(
-                x=df['xG'],
-                y=p(df['xG']),
-                mode='lines',
-                name='Linha de Tendência',
-                line=dict(color='red', width=2)
-            )
-
-        st.plotly_chart(fig, use_container_width=True)
+            title="Expected Goals vs Gols Reais",
+            trendline=True
+        ))
 
 def show_insights_solutions(df):
     """Insights e soluções práticas"""
@@ -2319,27 +2926,7 @@ def show_insights_solutions(df):
 
     st.subheader("🔍 Principais Descobertas")
 
-    insights = []
-
-    # Insight sobre xG
-    if 'xG' in df.columns and 'Goals' in df.columns:
-        corr_xg = df['xG'].corr(df['Goals'])
-        if abs(corr_xg) > 0.7:
-            insights.append(f"⚽ Expected Goals é um excelente preditor: Correlação de {corr_xg:.3f} com gols reais")
-
-    # Insight sobre top performers
-    if 'Goals' in df.columns:
-        top_scorer_goals = df['Goals'].max()
-        avg_goals = df['Goals'].mean()
-        insights.append(f"🏆 Concentração de performance: O artilheiro máximo ({top_scorer_goals} gols) marca {top_scorer_goals/avg_goals:.1f}x mais que a média ({avg_goals:.1f} gols)")
-
-    # Insight sobre posições
-    if 'Pos' in df.columns and 'Goals' in df.columns:
-        pos_performance = df.groupby('Pos')['Goals'].mean().sort_values(ascending=False)
-        if len(pos_performance) > 1:
-            best_pos = pos_performance.index[0]
-            best_avg = pos_performance.iloc[0]
-            insights.append(f"🎯 Posição mais efetiva: {best_pos} tem média de {best_avg:.1f} gols")
+    insights, _ = analytics.key_insights(df)
 
     for insight in insights:
         st.markdown(f"""
@@ -2403,9 +2990,9 @@ def main():
 
     # Carregar dados com feedback visual
     with st.spinner('🔄 Carregando e preparando dados...'):
-        df = load_data()
+        manifest = load_manifest()
 
-    if df is None:
+    if not manifest:
         st.markdown("""
         <div class="warning-box">
             <h3>❌ Erro no Carregamento</h3>
@@ -2422,11 +3009,53 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+    # Seleção de partições (só aparece quando há mais de uma temporada/competição)
+    catalog = store_catalog(manifest)
+    selected_competitions, selected_seasons = [], []
+    if len(catalog) > 1:
+        with st.sidebar.expander("🗂️ Temporadas e Competições", expanded=True):
+            competitions = sorted(catalog['Competition'].unique())
+            selected_competitions = st.multiselect(
+                "🏆 Competições:",
+                competitions,
+                default=competitions,
+                help="Apenas as partições selecionadas são lidas do disco"
+            )
+
+            available = catalog[catalog['Competition'].isin(selected_competitions or competitions)]
+            seasons = sorted(available['Season'].unique())
+            selected_seasons = st.multiselect(
+                "📅 Temporadas:",
+                seasons,
+                default=seasons[-1:],
+                help="Por padrão apenas a temporada mais recente"
+            )
+
+    with st.spinner('🔄 Carregando e preparando dados...'):
+        df = load_data(tuple(selected_competitions), tuple(selected_seasons))
+
+    if df is None:
+        st.markdown("""
+        <div class="warning-box">
+            <h3>❌ Erro no Carregamento</h3>
+            <p>Não foi possível carregar o dataset. Verifique se o arquivo 'dataset.csv' está disponível.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+
+    # Índices de filtro construídos uma vez por dataset
+    filter_index = get_filter_index(df.attrs.get('fingerprint'), df)
+    player_index = get_player_index(df.attrs.get('fingerprint'), df)
+    percentile_table = get_percentile_table(df.attrs.get('fingerprint'), df)
+    dataset, dataset_fingerprint = df, df.attrs.get('fingerprint')
+    predicates = {}
+
     # Filtros avançados na sidebar
     with st.sidebar.expander("🎯 Filtros de Jogadores", expanded=True):
         # Filtro por posição
+        selected_pos = 'Todas'
         if 'Pos' in df.columns:
-            positions = ['Todas'] + sorted(list(df['Pos'].unique()))
+            positions = ['Todas'] + filter_index.categories('Pos')
             selected_pos = st.selectbox(
                 "📍 Posição:",
                 positions,
@@ -2434,30 +3063,44 @@ def main():
             )
 
             if selected_pos != 'Todas':
-                df = df[df['Pos'] == selected_pos]
+                predicates['Pos'] = selected_pos
+
+        # Filtro por time
+        if 'Squad' in df.columns:
+            selected_squads = st.multiselect(
+                "🏟️ Times:",
+                filter_index.categories('Squad'),
+                help="Deixe vazio para considerar todos os times"
+            )
 
-        # Filtro por minutos (usando coluna correta)
-        minutes_col = 'Minutes' if 'Minutes' in df.columns else 'Min'
-        if minutes_col in df.columns:
+            if selected_squads:
+                predicates['Squad'] = selected_squads
+
+        # Filtro por minutos
+        min_minutes = 0
+        if 'Minutes' in df.columns:
             min_minutes = st.slider(
                 "⏱️ Minutos mínimos jogados:",
                 0,
-                int(df[minutes_col].max()),
+                int(filter_index.max_value('Minutes', **predicates)),
                 0,
                 help="Filtrar jogadores por tempo de jogo"
             )
-            df = df[df[minutes_col] >= min_minutes]
+            predicates['Minutes'] = (min_minutes, None) if min_minutes > 0 else None
 
         # Filtro por gols
         if 'Goals' in df.columns:
             min_goals = st.slider(
                 "⚽ Gols mínimos:",
                 0,
-                int(df['Goals'].max()),
+                int(filter_index.max_value('Goals', **predicates)),
                 0,
                 help="Filtrar por número de gols"
             )
-            df = df[df['Goals'] >= min_goals]
+            predicates['Goals'] = (min_goals, None) if min_goals > 0 else None
+
+    # Uma única seleção de linhas a partir da interseção dos índices
+    df = take_rows(df, filter_index.query(**predicates))
 
     # Status dos filtros
     st.sidebar.markdown(f"""
@@ -2485,6 +3128,26 @@ def main():
             help="Ativar animações nos gráficos"
         )
 
+    # Acertos/erros dos caches de análise (st.cache_data), modelos e figuras
+    with st.sidebar.expander("⚡ Desempenho dos Caches"):
+        cache_stats = analytics_stats.stats()
+        for name, cache in (('modelos', get_model_registry()), ('figuras', get_figure_cache())):
+            cache_info = cache.stats()
+            cache_stats.loc[len(cache_stats)] = [
+                name, cache_info['hits'] + cache_info['misses'], cache_info['hits'], cache_info['misses'],
+                cache_info['hit_rate']
+            ]
+        if cache_stats['calls'].sum():
+            total_hits = cache_stats['hits'].sum()
+            st.metric("Taxa de acerto geral", f"{total_hits / cache_stats['calls'].sum():.0%}")
+            st.caption("Contagens acumuladas no processo até o rerun anterior")
+            st.dataframe(
+                cache_stats[cache_stats['calls'] > 0].set_index('function').round({'hit_rate': 2}),
+                use_container_width=True
+            )
+        else:
+            st.caption("Nenhuma consulta cacheada ainda neste processo")
+
     # Armazenar configurações no session_state
     st.session_state.update({
         'theme': theme,
@@ -2495,8 +3158,12 @@ def main():
     tab_config = {
         "🏠 Visão Geral": "overview",
         "🔍 Análise Exploratória": "exploratory",
+        "🏟️ Análise por Times": "teams",
+        "🥊 Comparação de Jogadores": "comparison",
         "📈 Modelagem Linear": "modeling",
+        "🧪 Testes Estatísticos Avançados": "advanced",
         "� Testes de Hipóteses": "hypothesis",
+        "📊 Visualizações": "visualizations",
         " Insights e Soluções": "insights"
     }
 
@@ -2513,11 +3180,23 @@ def main():
         if section == "overview":
             show_overview(df)
         elif section == "exploratory":
-            show_exploratory_analysis(df)
+            show_exploratory_analysis(df, get_scouting_engine(dataset_fingerprint, dataset))
+        elif section == "teams":
+            show_team_analysis(df)
+        elif section == "comparison":
+            show_player_comparison(
+                df, player_index,
+                get_similarity_index(dataset_fingerprint, dataset),
+                percentile_table
+            )
         elif section == "modeling":
             show_statistical_modeling(df)
+        elif section == "advanced":
+            show_statistical_tests_advanced(df)
         elif section == "hypothesis":
             show_hypothesis_testing(df)
+        elif section == "visualizations":
+            show_visualizations(df)
         elif section == "insights":
             show_insights_solutions(df)
 
@@ -0,0 +1,484 @@
+"""
+📦 Camada de dados do Premier League Analytics
+
+Preparação do dataset (limpeza + engenharia de variáveis) e cache persistente
+em formato colunar, identificado pela impressão digital do CSV e das
+configurações do projeto.
+"""
+
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# Incrementar sempre que a lógica de preparação mudar (invalida o cache em disco)
+PIPELINE_VERSION = 2
+
+# Sufixo das taxas por 90 minutos (bloco "Per 90 Minutes" das exportações FBref)
+PER_90_SUFFIX = '_per_90'
+
+# Configurações lidas na preparação (prepare_dataframe, cabeçalho FBref e tags
+# de competição/temporada gravadas nas partições); só elas entram na chave do cache
+PREPARED_SETTINGS = (
+    'COLUMN_MAPPING',
+    'MIN_MINUTES_FILTER',
+    'DATA_PATH',
+    'DEFAULT_SEASON',
+    'DEFAULT_COMPETITION',
+)
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Hash SHA-1 do conteúdo de um arquivo, lido em blocos"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_fingerprint():
+    """Hash das configurações de config.py que influenciam os dados preparados"""
+    settings = {name: getattr(config, name) for name in PREPARED_SETTINGS}
+    payload = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def fbref_column_names(header):
+    """
+    Nomes explícitos para o cabeçalho FBref, que repete Gls, Ast, G+A, xG...
+
+    Tudo a partir da primeira coluna repetida pertence ao bloco "Per 90
+    Minutes" e recebe o sufixo ``_per_90`` (ex.: ``Gls`` -> ``Goals_per_90``).
+    """
+    seen = set()
+    per_90_start = len(header)
+    for i, name in enumerate(header):
+        if name in seen:
+            per_90_start = i
+            break
+        seen.add(name)
+
+    names = list(header[:per_90_start])
+    names += [config.COLUMN_MAPPING.get(name, name) + PER_90_SUFFIX for name in header[per_90_start:]]
+
+    # Garantir unicidade mesmo para cabeçalhos fora do padrão
+    unique = []
+    for name in names:
+        candidate, n = name, 1
+        while candidate in unique:
+            candidate = f"{name}.{n}"
+            n += 1
+        unique.append(candidate)
+    return unique
+
+
+def read_fbref_csv(path):
+    """Lê uma exportação FBref preservando o bloco por 90 minutos com nomes explícitos"""
+    with open(path, newline='', encoding='utf-8') as fh:
+        header = next(csv.reader(fh), [])
+    return pd.read_csv(path, header=0, names=fbref_column_names(header))
+
+
+def downcast_numeric(df):
+    """Reduz colunas numéricas para float32/int16 (int32 quando não couber)"""
+    for col in df.select_dtypes(include=['float']).columns:
+        df[col] = df[col].astype(np.float32)
+
+    int16 = np.iinfo(np.int16)
+    for col in df.select_dtypes(include=['integer']).columns:
+        values = df[col]
+        if values.empty or (values.min() >= int16.min and values.max() <= int16.max):
+            df[col] = values.astype(np.int16)
+        else:
+            df[col] = values.astype(np.int32)
+    return df
+
+
+def prepare_dataframe(df, min_minutes=config.MIN_MINUTES_FILTER):
+    """Limpeza, renomeação e engenharia de variáveis sobre o CSV bruto"""
+    # Colunas ainda duplicadas (frames que não vieram de read_fbref_csv)
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated()]
+
+    # Aplicar mapeamento apenas para colunas que existem
+    existing_mappings = {old: new for old, new in config.COLUMN_MAPPING.items() if old in df.columns}
+    df = df.rename(columns=existing_mappings)
+
+    # Tratamento de valores ausentes
+    numeric_columns = df.select_dtypes(include=[np.number]).columns
+    for col in numeric_columns:
+        if df[col].isnull().sum() > 0:
+            df[col] = df[col].fillna(df[col].median())
+
+    # Limpeza de dados categóricos
+    categorical_columns = df.select_dtypes(include=['object']).columns
+    for col in categorical_columns:
+        if df[col].isnull().sum() > 0:
+            df[col] = df[col].fillna('Unknown')
+
+    # Engenharia de variáveis aprimorada (taxas por 90 só quando a exportação não as traz)
+    if 'Goals_per_90' not in df.columns and 'Goals' in df.columns and 'Minutes' in df.columns:
+        df['Goals_per_90'] = np.where(df['Minutes'] > 0, (df['Goals'] / df['Minutes']) * 90, 0)
+
+    if 'Assists_per_90' not in df.columns and 'Assists' in df.columns and 'Minutes' in df.columns:
+        df['Assists_per_90'] = np.where(df['Minutes'] > 0, (df['Assists'] / df['Minutes']) * 90, 0)
+
+    if 'Goals' in df.columns and 'Assists' in df.columns:
+        df['Total_Contributions'] = df['Goals'] + df['Assists']
+
+    if 'Expected_Goals' in df.columns and 'Goals' in df.columns:
+        df['Goal_Efficiency'] = np.where(df['Expected_Goals'] > 0, df['Goals'] / df['Expected_Goals'], 1)
+        df['Goal_Difference'] = df['Goals'] - df['Expected_Goals']
+
+    # Variável de performance composta
+    if all(col in df.columns for col in ['Goals', 'Assists', 'Minutes']):
+        # Normalizar minutos para evitar valores extremos
+        minutes_normalized = np.clip(df['Minutes'] / 90, 0.1, 50)  # Min 0.1, Max 50 jogos
+        df['Performance_Index'] = (df['Goals'] * 3 + df['Assists'] * 2) * np.log1p(minutes_normalized)
+
+    # Classificação de jogadores por gols
+    if 'Goals' in df.columns:
+        df['Goal_Category'] = pd.cut(
+            df['Goals'],
+            bins=[-0.1, 0, 2, 5, 10, float('inf')],
+            labels=['Zero', 'Low', 'Medium', 'High', 'Elite'],
+            include_lowest=True
+        )
+
+    # Filtrar apenas jogadores com dados mínimos de qualidade
+    if 'Minutes' in df.columns:
+        df = df[df['Minutes'] >= min_minutes].copy()
+
+    # Resetar índice após filtragem e reduzir memória
+    return downcast_numeric(df.reset_index(drop=True))
+
+
+def frame_fingerprint(df):
+    """
+    Impressão digital barata de um DataFrame ou view.
+
+    Combina a impressão do dataset de origem (df.attrs) com os ids de linha e
+    as colunas, sem ler os valores; sem origem conhecida, faz hash do conteúdo.
+    """
+    digest = hashlib.sha1()
+    base = df.attrs.get('fingerprint')
+    if base is None:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    else:
+        digest.update(base.encode('utf-8'))
+        digest.update(np.ascontiguousarray(df.index.to_numpy()).tobytes())
+    digest.update('|'.join(map(str, df.columns)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _parquet_available():
+    """Verifica se há engine Parquet instalada (pyarrow ou fastparquet)"""
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def _cache_file(cache_dir, key):
+    """Caminho do arquivo de cache para uma chave (Parquet, ou pickle como fallback)"""
+    extension = 'parquet' if _parquet_available() else 'pkl'
+    return os.path.join(cache_dir, f"prepared_{key}.{extension}")
+
+
+def _read_cache(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _write_cache(df, path):
+    """Escrita atômica: vários processos podem disputar o mesmo arquivo"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        if path.endswith('.parquet'):
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _remove_stale(directory, keep, prefix):
+    """Remove entradas antigas do cache (outras versões do CSV/configuração)"""
+    for stale in glob.glob(os.path.join(directory, f"{prefix}*")):
+        if stale not in keep and not stale.endswith('.tmp'):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def dataset_key(csv_path, settings_key=None):
+    """Chave do cache: conteúdo do CSV + configurações + versão do pipeline"""
+    settings_key = settings_key or settings_fingerprint()
+    payload = f"{file_fingerprint(csv_path)}:{settings_key}:{PIPELINE_VERSION}"
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_prepared_data(csv_path=config.DATA_PATH, cache_dir=config.CACHE_DIR):
+    """
+    Retorna (df, from_cache) com o dataset já preparado.
+
+    Se existir um arquivo colunar com a mesma chave, ele é lido diretamente e o
+    CSV não é reprocessado. Caso contrário o CSV é preparado e gravado no cache.
+    """
+    key = dataset_key(csv_path)
+    path = _cache_file(cache_dir, key)
+
+    df = None
+    from_cache = False
+    if os.path.exists(path):
+        try:
+            df = _read_cache(path)
+            from_cache = True
+        except Exception:
+            # Cache corrompido/incompatível: reconstruir a partir do CSV
+            df = None
+
+    if df is None:
+        df = prepare_dataframe(read_fbref_csv(csv_path))
+        try:
+            _write_cache(df, path)
+            _remove_stale(cache_dir, {path}, 'prepared_')
+        except OSError:
+            # Sem permissão de escrita: seguir sem cache persistente
+            pass
+
+    df.attrs['fingerprint'] = key
+    return df, from_cache
+
+
+# ============================================================================
+# Ingestão de múltiplas temporadas/competições
+# ============================================================================
+
+_SEASON_PATTERN = re.compile(r'(\d{4})\s*[-_/]\s*(\d{2,4})')
+
+
+def parse_source_tags(path):
+    """
+    Deduz (competição, temporada) a partir do caminho de uma exportação FBref.
+
+    Aceita tanto ``<competição>/<temporada>.csv`` quanto
+    ``<competição>_<temporada>.csv``; o que não puder ser deduzido recebe os
+    valores padrão de config.py.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+    season = config.DEFAULT_SEASON
+    competition = None
+    for candidate in (stem, parent):
+        match = _SEASON_PATTERN.search(candidate)
+        if match:
+            start, end = match.groups()
+            if len(end) == 2:
+                end = start[:2] + end
+            season = f"{start}-{end}"
+            if candidate is stem:
+                competition = (stem[:match.start()] + stem[match.end():]).strip(' -_')
+            break
+
+    if not competition:
+        competition = parent if _SEASON_PATTERN.search(stem) else stem
+    if not competition or competition == os.path.splitext(os.path.basename(config.DATA_PATH))[0]:
+        competition = config.DEFAULT_COMPETITION
+
+    competition = re.sub(r'[-_]+', ' ', competition).strip()
+    return competition, season
+
+
+def discover_sources(pattern=config.DATA_SOURCES):
+    """Lista as exportações que casam com um diretório ou glob (fallback: DATA_PATH)"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '**', '*.csv')
+    sources = sorted(glob.glob(pattern, recursive=True))
+    if not sources and os.path.exists(config.DATA_PATH):
+        sources = [config.DATA_PATH]
+    return sources
+
+
+def _partition_path(store_dir, competition, season, key):
+    """Layout estilo Hive: Competition=<...>/Season=<...>/<chave>.parquet"""
+    safe = lambda value: re.sub(r'[\\/:]+', '-', str(value))
+    extension = 'parquet' if _parquet_available() else 'pkl'
+    return os.path.join(
+        store_dir,
+        f"Competition={safe(competition)}",
+        f"Season={safe(season)}",
+        f"{key}.{extension}"
+    )
+
+
+def _ingest_source(path, store_dir, settings_key):
+    """Lê, normaliza e grava uma exportação como partição (executa em processo filho)"""
+    key = dataset_key(path, settings_key)
+    competition, season = parse_source_tags(path)
+    partition = _partition_path(store_dir, competition, season, key)
+
+    if not os.path.exists(partition):
+        df = prepare_dataframe(read_fbref_csv(path))
+        df['Competition'] = competition
+        df['Season'] = season
+        _write_cache(df, partition)
+        rows = len(df)
+    else:
+        rows = None
+
+    return {
+        'source': path,
+        'key': key,
+        'competition': competition,
+        'season': season,
+        'partition': partition,
+        'rows': rows
+    }
+
+
+def _read_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, 'manifest.json'), encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(store_dir, manifest):
+    os.makedirs(store_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(store_dir, 'manifest.json'))
+
+
+def ingest_sources(pattern=config.DATA_SOURCES, store_dir=config.DATA_STORE_DIR, n_jobs=config.N_JOBS):
+    """
+    Ingestão incremental das exportações FBref em um store particionado.
+
+    Cada arquivo vira uma partição (competição, temporada) identificada pelo
+    hash do conteúdo; arquivos inalterados não são relidos. Os arquivos novos
+    ou modificados são processados em paralelo. Retorna o manifesto do store.
+    """
+    sources = discover_sources(pattern)
+    settings_key = settings_fingerprint()
+    previous = _read_manifest(store_dir)
+
+    entries = []
+    pending = []
+    for path in sources:
+        old = previous.get(path)
+        if old and old['key'] == dataset_key(path, settings_key) and os.path.exists(old['partition']):
+            entries.append(old)
+        else:
+            pending.append(path)
+
+    if len(pending) > 1 and (n_jobs or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            entries.extend(executor.map(_ingest_source, pending, repeat(store_dir), repeat(settings_key)))
+    else:
+        entries.extend(_ingest_source(path, store_dir, settings_key) for path in pending)
+
+    # Partições sem contagem de linhas foram reaproveitadas de outra ingestão
+    for entry in entries:
+        if entry['rows'] is None:
+            entry['rows'] = len(_read_cache(entry['partition']))
+
+    manifest = {entry['source']: entry for entry in entries}
+    _write_manifest(store_dir, manifest)
+
+    # Remover partições órfãs (arquivos apagados ou alterados)
+    live = {entry['partition'] for entry in entries}
+    for old in previous.values():
+        if old['partition'] not in live and os.path.exists(old['partition']):
+            try:
+                os.remove(old['partition'])
+            except OSError:
+                pass
+
+    return manifest
+
+
+def store_catalog(manifest):
+    """Resumo das partições disponíveis: competição, temporada e número de linhas"""
+    catalog = pd.DataFrame(
+        [(e['competition'], e['season'], e['rows']) for e in manifest.values()],
+        columns=['Competition', 'Season', 'Rows']
+    )
+    return catalog.groupby(['Competition', 'Season'], as_index=False)['Rows'].sum()
+
+
+def load_partitions(manifest, competitions=None, seasons=None, columns=None):
+    """
+    Lê apenas as partições pedidas e devolve um único DataFrame.
+
+    A impressão digital do resultado combina as chaves das partições lidas, de
+    modo que caches posteriores distinguem cada combinação de filtros.
+    """
+    selected = [
+        entry for entry in sorted(manifest.values(), key=lambda e: (e['competition'], e['season'], e['source']))
+        if (not competitions or entry['competition'] in competitions)
+        and (not seasons or entry['season'] in seasons)
+    ]
+    if not selected:
+        return None
+
+    frames = []
+    for entry in selected:
+        if entry['partition'].endswith('.parquet'):
+            frames.append(pd.read_parquet(entry['partition'], columns=columns))
+        else:
+            frame = pd.read_pickle(entry['partition'])
+            frames.append(frame[columns] if columns else frame)
+
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    for col in ('Competition', 'Season'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    # Categorias de gols precisam continuar ordenadas após o concat
+    if 'Goal_Category' in df.columns and not isinstance(df['Goal_Category'].dtype, pd.CategoricalDtype):
+        df['Goal_Category'] = pd.Categorical(
+            df['Goal_Category'], categories=['Zero', 'Low', 'Medium', 'High', 'Elite'], ordered=True
+        )
+
+    keys = ':'.join(entry['key'] for entry in selected)
+    df.attrs['fingerprint'] = hashlib.sha1(keys.encode('utf-8')).hexdigest()[:16]
+    return df
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingestão de exportações FBref no store particionado")
+    parser.add_argument('pattern', nargs='?', default=config.DATA_SOURCES,
+                        help="Diretório ou glob das exportações (padrão: DATA_SOURCES)")
+    parser.add_argument('--store', default=config.DATA_STORE_DIR, help="Diretório do store")
+    parser.add_argument('--jobs', type=int, default=config.N_JOBS, help="Processos paralelos")
+    args = parser.parse_args()
+
+    result = ingest_sources(args.pattern, args.store, args.jobs)
+    print(store_catalog(result).to_string(index=False))
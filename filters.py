@@ -0,0 +1,156 @@
+"""
+🎯 Motor de filtros do Premier League Analytics
+
+Índices pré-calculados sobre o dataset carregado: índice categórico (linhas por
+valor) para colunas como Pos/Squad e arrays ordenados para consultas de faixa
+em Minutes/Goals. Os filtros combinam conjuntos de ids de linha em vez de
+copiar o DataFrame a cada rerun do Streamlit.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Colunas indexadas por padrão
+CATEGORICAL_COLUMNS = ('Pos', 'Squad', 'Goal_Category', 'Competition', 'Season')
+RANGE_COLUMNS = ('Minutes', 'Goals', 'Age')
+
+
+class FilterIndex:
+    """Índices categóricos e de faixa para filtrar sem varrer o DataFrame"""
+
+    def __init__(self, df, categorical=CATEGORICAL_COLUMNS, ranges=RANGE_COLUMNS, cache_size=64):
+        # Ids de linha = rótulos do índice (views preservam os rótulos do frame original)
+        self.row_ids = df.index.to_numpy()
+        if not pd.Index(self.row_ids).is_monotonic_increasing:
+            raise ValueError("FilterIndex requer um DataFrame com índice ordenado")
+
+        self.fingerprint = df.attrs.get('fingerprint')
+        self._categorical = {}
+        self._ranges = {}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+        for col in categorical:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=True)
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            bounds = np.concatenate([[0], np.cumsum(counts)])
+            # Códigos -1 (valores ausentes) ficam no início da ordenação
+            offset = int((codes < 0).sum())
+            self._categorical[col] = {
+                value: order[offset + bounds[i]:offset + bounds[i + 1]]
+                for i, value in enumerate(uniques.tolist())
+            }
+
+        for col in ranges:
+            if col not in df.columns:
+                continue
+            values = df[col].to_numpy()
+            order = np.argsort(values, kind='stable')
+            self._ranges[col] = (values[order], order, values)
+
+    @property
+    def columns(self):
+        return list(self._categorical) + list(self._ranges)
+
+    def categories(self, col):
+        """Valores distintos (ordenados) de uma coluna categórica indexada"""
+        return list(self._categorical.get(col, {}))
+
+    def _remember(self, key, positions):
+        self._cache[key] = positions
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return positions
+
+    def _category_positions(self, col, values):
+        key = ('cat', col, tuple(sorted(map(str, values))))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        index = self._categorical[col]
+        parts = [index[v] for v in values if v in index]
+        positions = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        return self._remember(key, positions)
+
+    def _range_positions(self, col, low=None, high=None):
+        key = ('range', col, low, high)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        sorted_values, order, _ = self._ranges[col]
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        stop = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side='right')
+        return self._remember(key, np.sort(order[start:stop]))
+
+    def _positions(self, predicates):
+        """Combina os predicados intersectando os conjuntos de posições"""
+        key = ('query', tuple(sorted((col, repr(value)) for col, value in predicates.items())))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        sets = []
+        for col, value in predicates.items():
+            if value is None:
+                continue
+            if col in self._categorical:
+                values = [value] if isinstance(value, str) else list(value)
+                sets.append(self._category_positions(col, values))
+            elif col in self._ranges:
+                low, high = value
+                sets.append(self._range_positions(col, low, high))
+            else:
+                raise KeyError(f"Coluna não indexada: {col}")
+
+        if not sets:
+            positions = np.arange(len(self.row_ids))
+        else:
+            # Começar pelo menor conjunto reduz o custo das interseções
+            sets.sort(key=len)
+            positions = sets[0]
+            member = np.zeros(len(self.row_ids), dtype=bool)
+            for other in sets[1:]:
+                member[:] = False
+                member[other] = True
+                positions = positions[member[positions]]
+
+        return self._remember(key, positions)
+
+    def query(self, **predicates):
+        """
+        Ids de linha que satisfazem todos os predicados.
+
+        Colunas categóricas recebem um valor ou uma lista de valores; colunas
+        de faixa recebem uma tupla (mínimo, máximo), com None para "sem limite".
+        """
+        return self.row_ids[self._positions(predicates)]
+
+    def max_value(self, col, **predicates):
+        """Máximo de uma coluna de faixa dentro do subconjunto filtrado"""
+        sorted_values, _, values = self._ranges[col]
+        if not any(v is not None for v in predicates.values()):
+            return sorted_values[-1] if len(sorted_values) else 0
+        positions = self._positions(predicates)
+        return values[positions].max() if len(positions) else 0
+
+
+def take_rows(df, row_ids):
+    """Seleciona as linhas pelos ids (rótulos) com uma única cópia"""
+    if len(row_ids) == len(df):
+        return df
+    positions = np.searchsorted(df.index.to_numpy(), row_ids)
+    return df.iloc[positions]
+
+
+def filter_view(index, df, **predicates):
+    """Aplica predicados indexados sobre uma view já filtrada (ex.: dentro de uma seção)"""
+    ids = np.intersect1d(df.index.to_numpy(), index.query(**predicates), assume_unique=True)
+    return take_rows(df, ids)
@@ -0,0 +1,53 @@
+"""
+📶 Percentis por posição do Premier League Analytics
+
+Tabela de percentis (0–100) de cada jogador em cada métrica, calculada dentro
+da posição principal uma única vez por dataset. Comparações entre vários
+jogadores viram uma indexação da matriz pré-calculada, sem reescanear o
+DataFrame por métrica. Sem dependência do Streamlit.
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+from similarity import primary_position
+
+
+class PercentileTable:
+    """Percentis de cada linha × métrica dentro da posição principal"""
+
+    def __init__(self, df, metrics=config.COMPARISON_METRICS):
+        self.metrics = [m for m in metrics if m in df.columns]
+        self.row_ids = df.index.to_numpy()
+        self.positions = primary_position(df['Pos']) if 'Pos' in df.columns else np.full(len(df), 'N/A', dtype=object)
+
+        values = df[self.metrics].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+        self.values = values.to_numpy()
+
+        # Um único groupby().rank para todas as métricas (empates recebem o posto médio)
+        ranks = values.groupby(self.positions).rank(method='average', pct=True)
+        self.percentiles = (ranks * 100).to_numpy()
+        self.group_sizes = pd.Series(self.positions).value_counts()
+        self._position_of_id = dict(zip(self.row_ids.tolist(), range(len(self.row_ids))))
+
+    def _rows(self, row_ids):
+        return np.array([self._position_of_id[r] for r in row_ids], dtype=np.intp)
+
+    def lookup(self, row_ids, metrics=None):
+        """Percentis (linhas = ids, colunas = métricas) em uma única indexação"""
+        rows = self._rows(row_ids)
+        cols = [self.metrics.index(m) for m in (metrics or self.metrics)]
+        return pd.DataFrame(self.percentiles[np.ix_(rows, cols)], index=list(row_ids),
+                            columns=[self.metrics[c] for c in cols])
+
+    def raw(self, row_ids, metrics=None):
+        """Valores originais das mesmas células"""
+        rows = self._rows(row_ids)
+        cols = [self.metrics.index(m) for m in (metrics or self.metrics)]
+        return pd.DataFrame(self.values[np.ix_(rows, cols)], index=list(row_ids),
+                            columns=[self.metrics[c] for c in cols])
+
+    def position_of(self, row_ids):
+        """Posição principal usada como grupo de referência de cada id"""
+        return pd.Series(self.positions[self._rows(row_ids)], index=list(row_ids))
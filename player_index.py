@@ -0,0 +1,173 @@
+"""
+🔎 Índice de busca de jogadores do Premier League Analytics
+
+Mapa hash de (nome normalizado, ano de nascimento) → ids de linha e índices de
+prefixo (por palavra do nome) e de trigramas para busca tolerante a erros de
+digitação. Nomes são normalizados sem acentos e em minúsculas ("Martin
+Ødegaard" e "martin odegaard" são o mesmo jogador). Homônimos e transferências
+no meio da temporada viram linhas distintas, identificadas pelo id.
+"""
+
+import re
+import unicodedata
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# Letras que a decomposição Unicode não separa do acento
+_SPECIAL_LETTERS = str.maketrans({'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'ł': 'l', 'đ': 'd', 'ı': 'i', 'þ': 'th'})
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def fold_name(name):
+    """Nome sem acentos, em minúsculas e com separadores colapsados em um espaço"""
+    text = unicodedata.normalize('NFKD', str(name).lower().translate(_SPECIAL_LETTERS))
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def trigrams(folded):
+    """Trigramas do nome com bordas (" ab", ..., "yz ") para pontuar inícios e fins de palavra"""
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _csr(codes, n_groups):
+    """Ordenação estável por código + limites de cada grupo (posições agrupadas)"""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_groups))])
+    return order, bounds
+
+
+class PlayerIndex:
+    """Busca exata, por prefixo e aproximada (trigramas) de jogadores"""
+
+    def __init__(self, df, name_col='Player', born_col='Born', detail_cols=('Squad', 'Season')):
+        self.row_ids = df.index.to_numpy()
+        names = df[name_col].astype(str).to_numpy()
+        born = pd.to_numeric(df[born_col], errors='coerce') if born_col in df.columns else pd.Series(np.nan, index=df.index)
+        self.born = born.fillna(-1).astype(np.int64).to_numpy()
+        self.names = names
+
+        # Descrição curta para desambiguar homônimos na interface
+        labels = pd.Series(names, dtype=object)
+        labels = labels.where(self.born < 0, labels + ' · ' + self.born.astype(str))
+        for col in detail_cols:
+            if col in df.columns:
+                labels = labels + ' · ' + df[col].astype(str).to_numpy()
+        self.labels = labels.to_numpy(dtype=object)
+        self._position = dict(zip(self.row_ids.tolist(), range(len(self.row_ids))))
+
+        # Normalização feita uma vez por grafia distinta
+        raw_codes, raw_names = pd.factorize(pd.Series(names, dtype=object))
+        folded = np.array([fold_name(n) for n in raw_names], dtype=object)[raw_codes]
+
+        # Nomes distintos normalizados → posições das linhas (CSR)
+        name_codes, self._unique_names = pd.factorize(pd.Series(folded, dtype=object))
+        self._unique_names = np.asarray(self._unique_names, dtype=object)
+        self._name_order, self._name_bounds = _csr(name_codes, len(self._unique_names))
+        self._name_code = dict(zip(self._unique_names.tolist(), range(len(self._unique_names))))
+
+        # Hash (nome, nascimento) → posições (CSR sobre a chave combinada)
+        self._born_stride = int(self.born.max(initial=0)) + 2
+        key_codes, keys = pd.factorize(name_codes.astype(np.int64) * self._born_stride + self.born + 1)
+        self._exact_order, self._exact_bounds = _csr(key_codes, len(keys))
+        self._exact = dict(zip(np.asarray(keys).tolist(), range(len(keys))))
+
+        # Prefixos: cada palavra do nome (e o nome completo) em um array ordenado
+        token_sets = [{name, *name.split()} for name in self._unique_names]
+        tokens = np.fromiter(chain.from_iterable(token_sets), dtype=object)
+        owners = np.repeat(np.arange(len(token_sets)), [len(t) for t in token_sets])
+        order = np.argsort(tokens.astype(str), kind='stable')
+        self._tokens = tokens.astype(str)[order]
+        self._token_owner = owners[order]
+
+        # Trigramas em formato CSR: trigrama → nomes que o contêm
+        gram_sets = [trigrams(name) for name in self._unique_names]
+        self._trigram_counts = np.array([len(g) for g in gram_sets], dtype=np.int64)
+        gram_codes, gram_values = pd.factorize(pd.Series(list(chain.from_iterable(gram_sets)), dtype=object))
+        order, bounds = _csr(gram_codes, len(gram_values))
+        postings = np.repeat(np.arange(len(gram_sets)), self._trigram_counts)[order]
+        self._trigram_postings = {
+            gram: postings[bounds[i]:bounds[i + 1]] for i, gram in enumerate(gram_values)
+        }
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def label(self, row_id):
+        """Descrição do jogador (nome · nascimento · time · temporada)"""
+        return self.labels[self._position[row_id]]
+
+    def lookup(self, name, born=None):
+        """Ids das linhas com esse nome (e ano de nascimento, se informado)"""
+        code = self._name_code.get(fold_name(name))
+        if code is None:
+            return self.row_ids[:0]
+        if born is None:
+            return self.row_ids[self._name_rows(code)]
+        key = self._exact.get(code * self._born_stride + int(born) + 1)
+        if key is None:
+            return self.row_ids[:0]
+        return self.row_ids[self._exact_order[self._exact_bounds[key]:self._exact_bounds[key + 1]]]
+
+    def _name_rows(self, code):
+        return self._name_order[self._name_bounds[code]:self._name_bounds[code + 1]]
+
+    def _prefix_matches(self, folded):
+        start = np.searchsorted(self._tokens, folded, side='left')
+        stop = np.searchsorted(self._tokens, folded + '￿', side='left')
+        return np.unique(self._token_owner[start:stop])
+
+    def _fuzzy_matches(self, folded):
+        """Coeficiente de Dice entre os trigramas da consulta e de cada nome"""
+        query = trigrams(folded)
+        postings = [self._trigram_postings[g] for g in query if g in self._trigram_postings]
+        if not postings:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates, shared = np.unique(np.concatenate(postings), return_counts=True)
+        score = 2 * shared / (len(query) + self._trigram_counts[candidates])
+        return candidates, score
+
+    def search(self, query, limit=10, min_score=0.35, within=None):
+        """
+        Jogadores mais parecidos com a consulta.
+
+        Prefixos de qualquer palavra do nome têm prioridade (score 1); o
+        restante é ordenado pela similaridade de trigramas, o que tolera
+        letras trocadas ou faltando. ``within`` restringe o resultado a um
+        conjunto de ids (ex.: a view filtrada). Retorna um DataFrame com uma
+        linha por id (homônimos aparecem separados).
+        """
+        columns = ['row_id', 'player', 'born', 'label', 'score']
+        folded = fold_name(query)
+        if not folded:
+            return pd.DataFrame(columns=columns)
+
+        candidates, score = self._fuzzy_matches(folded)
+        scores = np.zeros(len(self._unique_names))
+        scores[candidates] = score
+        scores[self._prefix_matches(folded)] += 1.0
+        codes = np.flatnonzero(scores >= min_score)
+
+        # Expande nomes → linhas e aplica a restrição antes do top-k
+        sizes = self._name_bounds[codes + 1] - self._name_bounds[codes]
+        positions = np.concatenate([self._name_rows(c) for c in codes]) if len(codes) else np.empty(0, dtype=np.intp)
+        row_scores = np.repeat(scores[codes], sizes)
+        if within is not None:
+            keep = np.isin(self.row_ids[positions], within)
+            positions, row_scores = positions[keep], row_scores[keep]
+        if len(positions) > limit:
+            top = np.argpartition(-row_scores, limit - 1)[:limit]
+            positions, row_scores = positions[top], row_scores[top]
+        order = np.lexsort((positions, -row_scores))
+        positions, row_scores = positions[order], row_scores[order]
+
+        return pd.DataFrame({
+            'row_id': self.row_ids[positions],
+            'player': self.names[positions],
+            'born': self.born[positions],
+            'label': self.labels[positions],
+            'score': np.minimum(row_scores, 1.0)
+        }, columns=columns)
@@ -0,0 +1,261 @@
+"""
+📉 Gráficos de dispersão para dados grandes do Premier League Analytics
+
+Acima de ``config.PLOT_WEBGL_MIN_ROWS`` pontos os scatters passam a usar WebGL
+(Scattergl) e, acima de ``config.PLOT_MAX_POINTS``, os pontos são amostrados
+no servidor preservando a densidade: o plano é dividido em uma grade, cada
+célula ocupada mantém ao menos um ponto (caudas e outliers continuam
+visíveis) e as células densas contribuem proporcionalmente ao seu tamanho.
+Linhas de tendência são ajustadas sobre todos os pontos, não sobre a amostra.
+
+Box plots e histogramas são resumidos no servidor (quartis, cercas, amostra
+de outliers e contagens por bin) e desenhados como ``go.Box``/``go.Bar`` com
+estatísticas prontas: o payload passa de O(linhas) para O(grupos/bins).
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import config
+
+
+def _cells(values, grid):
+    low, high = values.min(), values.max()
+    span = high - low if high > low else 1.0
+    return np.clip(((values - low) / span * grid).astype(np.int64), 0, grid - 1)
+
+
+def density_sample(x, y, max_points=config.PLOT_MAX_POINTS, grid=config.PLOT_DOWNSAMPLE_GRID,
+                   random_state=config.RANDOM_STATE):
+    """
+    Posições (ordenadas) de até ~``max_points`` pontos finitos de (x, y).
+
+    Cota por célula = 1 + (n_célula − 1) × taxa, com arredondamento
+    estocástico; dentro da célula os pontos mantidos são sorteados.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(finite) <= max_points:
+        return finite
+
+    rng = np.random.default_rng(random_state)
+    cell = _cells(x[finite], grid) * grid + _cells(y[finite], grid)
+    counts = np.bincount(cell, minlength=grid * grid)
+    occupied = int((counts > 0).sum())
+
+    rate = max(max_points - occupied, 0) / max(len(finite) - occupied, 1)
+    extra = (counts - 1).clip(min=0) * rate
+    quota = np.where(counts > 0, 1 + np.floor(extra + rng.random(len(counts))), 0)
+
+    # Ordena por célula (prioridade aleatória dentro dela) e mantém o início de cada célula
+    order = np.lexsort((rng.random(len(finite)), cell))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    sorted_cells = cell[order]
+    rank_in_cell = np.arange(len(order)) - starts[sorted_cells]
+    keep = order[rank_in_cell < quota[sorted_cells]]
+    return np.sort(finite[keep])
+
+
+def sampled_title(title, shown, total):
+    """Título com a nota de amostragem (pontos exibidos de total)"""
+    note = f"{shown:,} de {total:,} pontos (amostragem por densidade)".replace(',', '.')
+    return f"{title}<br><sup>{note}</sup>" if title else note
+
+
+def scatter_figure(data, x, y, title=None, trendline=False, max_points=config.PLOT_MAX_POINTS,
+                   webgl_min_rows=config.PLOT_WEBGL_MIN_ROWS, **px_kwargs):
+    """
+    ``px.scatter`` com modo automático para frames grandes.
+
+    WebGL a partir de ``webgl_min_rows`` linhas, amostragem por densidade
+    acima de ``max_points`` e, com ``trendline=True``, reta de mínimos
+    quadrados ajustada em todas as linhas (sem depender do statsmodels do px).
+    """
+    data = data.dropna(subset=[x, y])
+    total = len(data)
+    shown = data
+    if total > max_points:
+        shown = data.iloc[density_sample(data[x].to_numpy(), data[y].to_numpy(), max_points)]
+
+    fig = px.scatter(
+        shown,
+        x=x,
+        y=y,
+        title=sampled_title(title, len(shown), total) if shown is not data else title,
+        render_mode='webgl' if total >= webgl_min_rows else 'auto',
+        **px_kwargs
+    )
+
+    if trendline and total > 1:
+        xs = data[x].to_numpy(dtype=np.float64)
+        slope, intercept = np.polyfit(xs, data[y].to_numpy(dtype=np.float64), 1)
+        line_x = np.array([xs.min(), xs.max()])
+        fig.add_trace(go.Scatter(
+            x=line_x,
+            y=intercept + slope * line_x,
+            mode='lines',
+            name='Tendência (OLS)',
+            line=dict(color='red', width=2)
+        ))
+    return fig
+
+
+def scatter_trace(x, y, max_points=config.PLOT_MAX_POINTS, webgl_min_rows=config.PLOT_WEBGL_MIN_ROWS, **trace_kwargs):
+    """
+    ``go.Scatter`` (ou ``go.Scattergl``) de marcadores, amostrado por densidade
+    quando passa de ``max_points``. Retorna (trace, pontos exibidos, total).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = density_sample(x, y, max_points)
+    trace_type = go.Scattergl if len(x) >= webgl_min_rows else go.Scatter
+    trace = trace_type(x=x[keep], y=y[keep], mode='markers', **trace_kwargs)
+    return trace, len(keep), len(x)
+
+
+# ============================================================================
+# Resumos de box plot e histograma
+# ============================================================================
+
+def _segment_quantile(sorted_values, starts, sizes, prob):
+    """Quantil (interpolação linear, como numpy/Plotly) de cada segmento ordenado"""
+    position = (sizes - 1) * prob
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, sizes - 1)
+    frac = position - low
+    return sorted_values[starts + low] * (1 - frac) + sorted_values[starts + high] * frac
+
+
+def box_summaries(values, groups=None, max_outliers=config.PLOT_BOX_MAX_OUTLIERS,
+                  random_state=config.RANDOM_STATE):
+    """
+    Estatísticas de box plot por grupo em uma passada agrupada.
+
+    Uma única ordenação por (grupo, valor) deixa cada grupo em um segmento
+    contíguo; quartis saem por aritmética de índices e as cercas de Tukey
+    (1,5 × IQR) por busca binária dentro do segmento. Retorna um DataFrame
+    indexado pelo grupo com n, mean, q1, median, q3, lowerfence, upperfence,
+    min, max e ``outliers`` (amostra de até ``max_outliers`` valores, sempre
+    com os extremos).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if groups is None:
+        groups = np.zeros(len(values), dtype=np.int64)
+        labels = np.array(['Todos'], dtype=object)
+    else:
+        groups, labels = pd.factorize(pd.Series(groups, dtype=object).astype(str), sort=True)
+        labels = np.asarray(labels, dtype=object)
+
+    finite = np.isfinite(values) & (groups >= 0)
+    values, groups = values[finite], groups[finite]
+    order = np.lexsort((values, groups))
+    sorted_values, sorted_groups = values[order], groups[order]
+
+    sizes = np.bincount(sorted_groups, minlength=len(labels))
+    present = np.flatnonzero(sizes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])[present]
+    sizes = sizes[present]
+    sums = np.bincount(sorted_groups, weights=sorted_values, minlength=len(labels))[present]
+
+    q1 = _segment_quantile(sorted_values, starts, sizes, 0.25)
+    median = _segment_quantile(sorted_values, starts, sizes, 0.5)
+    q3 = _segment_quantile(sorted_values, starts, sizes, 0.75)
+    iqr = q3 - q1
+
+    rng = np.random.default_rng(random_state)
+    lower, upper, outliers = [], [], []
+    for start, size, lo, hi in zip(starts, sizes, q1 - 1.5 * iqr, q3 + 1.5 * iqr):
+        segment = sorted_values[start:start + size]
+        first = np.searchsorted(segment, lo, side='left')
+        last = np.searchsorted(segment, hi, side='right')
+        lower.append(segment[first])
+        upper.append(segment[last - 1])
+        out = np.concatenate([segment[:first], segment[last:]])
+        if len(out) > max_outliers:
+            keep = rng.choice(np.arange(1, len(out) - 1), max_outliers - 2, replace=False)
+            out = out[np.sort(np.concatenate([[0, len(out) - 1], keep]))]
+        outliers.append(out)
+
+    return pd.DataFrame({
+        'n': sizes,
+        'mean': sums / sizes,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': lower,
+        'upperfence': upper,
+        'min': sorted_values[starts],
+        'max': sorted_values[starts + sizes - 1],
+        'outliers': outliers
+    }, index=pd.Index(labels[present], name='group'))
+
+
+def histogram_bins(values, nbins=20):
+    """Bordas dos bins: inteiras e centradas para dados discretos, iguais para contínuos"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.array([0.0, 1.0])
+    low, high = values.min(), values.max()
+    if np.all(values == np.round(values)):
+        width = max(1, int(np.ceil((high - low + 1) / nbins)))
+        return low - 0.5 + width * np.arange(int(np.ceil((high - low + 1) / width)) + 1)
+    return np.histogram_bin_edges(values, bins=nbins)
+
+
+def histogram_summary(values, nbins=20, edges=None, density=False):
+    """Contagens (ou densidade) por bin; retorna (bordas, alturas)"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    edges = histogram_bins(values, nbins) if edges is None else np.asarray(edges)
+    counts, edges = np.histogram(values, bins=edges, density=density)
+    return edges, counts
+
+
+def box_figure(summary, title=None, x_title=None, y_title=None):
+    """Um ``go.Box`` pré-calculado por grupo + outliers amostrados como marcadores"""
+    fig = go.Figure()
+    palette = px.colors.qualitative.Plotly
+    for i, (label, row) in enumerate(summary.iterrows()):
+        color = palette[i % len(palette)]
+        fig.add_trace(go.Box(
+            x=[label],
+            q1=[row['q1']],
+            median=[row['median']],
+            q3=[row['q3']],
+            lowerfence=[row['lowerfence']],
+            upperfence=[row['upperfence']],
+            mean=[row['mean']],
+            name=str(label),
+            marker_color=color
+        ))
+        if len(row['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[label] * len(row['outliers']),
+                y=row['outliers'],
+                mode='markers',
+                marker=dict(color=color, size=5, opacity=0.6),
+                name=f"{label} (outliers)",
+                showlegend=False
+            ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, showlegend=False)
+    return fig
+
+
+def histogram_figure(edges, heights, title=None, x_title=None, y_title='Frequência', color='#667eea', name=None):
+    """Histograma pré-calculado como ``go.Bar`` (uma barra por bin)"""
+    edges = np.asarray(edges, dtype=np.float64)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=heights,
+        width=np.diff(edges),
+        marker_color=color,
+        name=name,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate='[%{customdata[0]:.2f}, %{customdata[1]:.2f}): %{y}<extra></extra>'
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, bargap=0.02)
+    return fig
@@ -0,0 +1,227 @@
+"""
+🔬 Testes post-hoc do Premier League Analytics
+
+Comparações de todos os pares de grupos depois de uma ANOVA/Kruskal-Wallis,
+calculadas de uma vez a partir do resumo por grupo de
+``stats_engine.group_summaries``: Tukey HSD, Games-Howell e Dunn (com ajuste
+de Holm ou Benjamini-Hochberg), matriz de significância e letras de
+agrupamento (compact letter display). Sem dependência do Streamlit.
+"""
+
+from functools import lru_cache
+from string import ascii_letters
+
+import numpy as np
+import pandas as pd
+from scipy import integrate, special, stats
+
+import config
+from stats_engine import fdr_bh
+
+
+# ============================================================================
+# Distribuição da amplitude studentizada (vetorizada)
+# ============================================================================
+
+@lru_cache(maxsize=32)
+def _range_cdf_table(k, x_max=20.0, n_x=2001, n_z=641):
+    """CDF da amplitude de k normais padrão tabelada em uma grade de x"""
+    x = np.linspace(0, x_max, n_x)
+    z = np.linspace(-8.5, 8.5, n_z)
+    diff = np.clip(stats.norm.cdf(z)[None, :] - stats.norm.cdf(z[None, :] - x[:, None]), 0, 1)
+    W = k * integrate.trapezoid(stats.norm.pdf(z) * diff ** (k - 1), z, axis=1)
+    return x, np.clip(W, 0, 1)
+
+
+def studentized_range_sf(q, k, df, n_s=401):
+    """
+    P(Q > q) da amplitude studentizada para muitos valores de uma vez.
+
+    ``scipy.stats.studentized_range`` integra numericamente a cada chamada
+    (~15 ms por valor). Aqui a CDF da amplitude normal é tabelada uma vez por
+    k e a integral sobre S = √(χ²_df/df) vira uma quadratura em log S por par,
+    com erro absoluto da ordem de 1e-5.
+    """
+    q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+    df = np.broadcast_to(np.asarray(df, dtype=np.float64), q.shape)
+    x, W = _range_cdf_table(int(k))
+    out = np.empty_like(q)
+
+    large = ~np.isfinite(df) | (df > 1e5)
+    out[large] = 1 - np.interp(q[large], x, W, right=1.0)
+
+    finite = ~large
+    if finite.any():
+        nu = df[finite][:, None]
+        half_width = 12 / np.sqrt(2 * nu) + 0.5 / nu
+        s = np.exp(np.linspace(-1, 1, n_s)[None, :] * half_width)
+        log_pdf = (
+            np.log(2) + (nu / 2) * np.log(nu / 2) - special.gammaln(nu / 2)
+            + (nu - 1) * np.log(s) - nu * s ** 2 / 2
+        )
+        weights = np.exp(log_pdf) * s
+        weights /= weights.sum(axis=1, keepdims=True)
+        out[finite] = 1 - (np.interp(q[finite][:, None] * s, x, W, right=1.0) * weights).sum(axis=1)
+
+    return np.clip(out, 0, 1)
+
+
+# ============================================================================
+# Ajuste de p-valores
+# ============================================================================
+
+def p_adjust(pvalues, method='holm'):
+    """p-valores ajustados: ``'holm'``, ``'fdr_bh'`` ou ``'bonferroni'``"""
+    p = np.asarray(pvalues, dtype=np.float64)
+    m = len(p)
+    if method == 'fdr_bh':
+        return fdr_bh(p)
+    if method == 'bonferroni':
+        return np.minimum(p * m, 1.0)
+    if method == 'holm':
+        order = np.argsort(p)
+        stepped = np.maximum.accumulate(p[order] * (m - np.arange(m)))
+        adjusted = np.empty(m)
+        adjusted[order] = np.minimum(stepped, 1.0)
+        return adjusted
+    raise ValueError(f"Ajuste desconhecido: {method}")
+
+
+# ============================================================================
+# Comparações de todos os pares
+# ============================================================================
+
+def _pair_frame(summary, first, second, diff, se, statistic, p_value, alpha):
+    labels = summary['labels']
+    return pd.DataFrame({
+        'group1': labels[first],
+        'group2': labels[second],
+        'diff': diff,
+        'se': se,
+        'statistic': statistic,
+        'p_value': p_value,
+        'reject': p_value < alpha
+    })
+
+
+def tukey_hsd(summary, alpha=config.ALPHA):
+    """Tukey HSD (Tukey-Kramer para grupos desbalanceados) com o QM do erro da ANOVA"""
+    n, means, variances = summary['n'], summary['means'], summary['variances']
+    k, N = len(n), n.sum()
+    first, second = np.triu_indices(k, k=1)
+
+    mse = ((n - 1) * variances).sum() / (N - k)
+    diff = means[first] - means[second]
+    se = np.sqrt(mse / 2 * (1 / n[first] + 1 / n[second]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q = np.abs(diff) / se
+    p_value = studentized_range_sf(q, k, N - k)
+    return _pair_frame(summary, first, second, diff, se, q, p_value, alpha)
+
+
+def games_howell(summary, alpha=config.ALPHA):
+    """Games-Howell: variâncias e graus de liberdade de Welch por par"""
+    n, means, variances = summary['n'], summary['means'], summary['variances']
+    k = len(n)
+    first, second = np.triu_indices(k, k=1)
+
+    a, b = variances[first] / n[first], variances[second] / n[second]
+    diff = means[first] - means[second]
+    se = np.sqrt(a + b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df = (a + b) ** 2 / (a ** 2 / (n[first] - 1) + b ** 2 / (n[second] - 1))
+        t = np.abs(diff) / se
+    p_value = studentized_range_sf(t * np.sqrt(2), k, np.nan_to_num(df, nan=1.0))
+    p_value = np.where(np.isfinite(t), p_value, np.nan)
+    return _pair_frame(summary, first, second, diff, se, t, p_value, alpha)
+
+
+def dunn(summary, adjust='holm', alpha=config.ALPHA):
+    """Dunn sobre os postos médios (pós Kruskal-Wallis), com correção de empates"""
+    n = summary['n']
+    k, N = len(n), n.sum()
+    first, second = np.triu_indices(k, k=1)
+
+    mean_ranks = summary['rank_sums'] / n
+    t = summary['tie_counts']
+    variance = N * (N + 1) / 12 - (t ** 3 - t).sum() / (12 * (N - 1))
+    diff = mean_ranks[first] - mean_ranks[second]
+    se = np.sqrt(variance * (1 / n[first] + 1 / n[second]))
+    z = diff / se
+    p_value = p_adjust(2 * stats.norm.sf(np.abs(z)), adjust)
+    return _pair_frame(summary, first, second, diff, se, z, p_value, alpha)
+
+
+POSTHOC_METHODS = {
+    'tukey': tukey_hsd,
+    'games_howell': games_howell,
+    'dunn': dunn
+}
+
+
+def posthoc(summary, method='tukey', adjust='holm', alpha=config.ALPHA):
+    """
+    Comparações de todos os pares + matriz de p-valores + letras de agrupamento.
+
+    Retorna um dicionário com ``pairs`` (uma linha por par), ``matrix``
+    (p-valores k×k) e ``letters`` (grupos que compartilham uma letra não
+    diferem entre si), com os grupos ordenados pela média decrescente.
+    """
+    if method == 'dunn':
+        pairs = dunn(summary, adjust=adjust, alpha=alpha)
+    else:
+        pairs = POSTHOC_METHODS[method](summary, alpha=alpha)
+    labels = summary['labels']
+    first, second = np.triu_indices(len(labels), k=1)
+    return {
+        'pairs': pairs,
+        'matrix': significance_matrix(labels, first, second, pairs['p_value'].to_numpy()),
+        'letters': compact_letter_display(labels, summary['means'], first, second, pairs['reject'].to_numpy())
+    }
+
+
+def significance_matrix(labels, first, second, pvalues):
+    """Matriz simétrica k×k de p-valores (diagonal = 1)"""
+    matrix = np.ones((len(labels), len(labels)))
+    matrix[first, second] = pvalues
+    matrix[second, first] = pvalues
+    return pd.DataFrame(matrix, index=labels, columns=labels)
+
+
+def compact_letter_display(labels, means, first, second, reject):
+    """
+    Letras de agrupamento pelo algoritmo insert-and-absorb (Piepho, 2004).
+
+    Cada coluna da matriz booleana é um conjunto de grupos que não diferem
+    entre si; cada par significativo divide as colunas que contêm os dois
+    grupos, e colunas contidas em outras são absorvidas.
+    """
+    k = len(labels)
+    columns = np.ones((1, k), dtype=bool)
+
+    for i, j in zip(first[reject], second[reject]):
+        both = columns[:, i] & columns[:, j]
+        if not both.any():
+            continue
+        split = columns[both].copy()
+        columns[np.flatnonzero(both)[:, None], i] = False
+        split[:, j] = False
+        columns = np.vstack([columns, split])
+
+        # Absorção: remove colunas contidas em outra (e duplicatas)
+        contained = (columns.astype(np.int32) @ (~columns).T.astype(np.int32)) == 0
+        np.fill_diagonal(contained, False)
+        duplicate = np.triu(contained & contained.T)
+        drop = (contained & ~contained.T).any(axis=1) | duplicate.any(axis=0)
+        columns = columns[~drop]
+
+    # Letras na ordem das médias (maior média recebe "a")
+    order = np.argsort(-np.asarray(means), kind='stable')
+    rank_of = np.empty(k, dtype=np.intp)
+    rank_of[order] = np.arange(k)
+    first_member = np.where(columns, rank_of[None, :], k).min(axis=1)
+    columns = columns[np.argsort(first_member, kind='stable')]
+
+    symbols = [ascii_letters[i] if i < len(ascii_letters) else f"[{i}]" for i in range(len(columns))]
+    letters = [''.join(symbols[c] for c in np.flatnonzero(columns[:, g])) for g in range(k)]
+    return pd.Series(letters, index=labels, name='letters').iloc[order]
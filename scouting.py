@@ -0,0 +1,224 @@
+"""
+🔭 Motor de consultas de scouting do Premier League Analytics
+
+Consultas declarativas do tipo "top 20 por posição em xG/90 entre jogadores
+sub-23 com ≥ 900 minutos, sem o big six". Cada consulta é um dicionário; as
+condições viram máscaras vetorizadas sobre arrays pré-extraídos e o ranking
+usa argpartition dentro de cada grupo (sem ordenar o frame inteiro). Os
+resultados ficam em um LRU indexado pelo hash da consulta. Sem dependência do
+Streamlit.
+
+Exemplo::
+
+    engine.run({
+        'rank_by': 'Expected_Goals_per_90',
+        'top_n': 20,
+        'group_by': 'Primary_Pos',
+        'where': [('Age', '<', 23), ('Minutes', '>=', 900), ('Squad', 'not in', config.BIG_SIX)]
+    })
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+import config
+from caching import LRUCache
+from similarity import primary_position
+
+NUMERIC_OPERATORS = ('>=', '>', '<=', '<', '==', '!=', 'between')
+CATEGORICAL_OPERATORS = ('in', 'not in', '==', '!=')
+DISPLAY_COLUMNS = ('Player', 'Squad', 'Pos', 'Age', 'Minutes')
+
+# Colunas derivadas disponíveis nas consultas
+DERIVED_COLUMNS = {
+    'Primary_Pos': lambda df: primary_position(df['Pos'])
+}
+
+
+def normalize_query(query):
+    """Forma canônica da consulta (condições ordenadas, listas como tuplas ordenadas)"""
+    where = []
+    for column, op, value in query.get('where', ()):
+        if op in ('in', 'not in'):
+            value = tuple(sorted(map(str, [value] if isinstance(value, str) else value)))
+        elif op == 'between':
+            value = tuple(float(v) for v in value)
+        elif not isinstance(value, str):
+            value = float(value)
+        where.append((column, op, value))
+    return {
+        'rank_by': query['rank_by'],
+        'top_n': int(query.get('top_n', config.DEFAULT_TOP_N)),
+        'group_by': query.get('group_by'),
+        'ascending': bool(query.get('ascending', False)),
+        'where': sorted(where, key=repr),
+        'columns': list(query.get('columns', ()))
+    }
+
+
+def query_hash(query, view_key=None):
+    """Hash estável da consulta normalizada (+ recorte de linhas)"""
+    payload = json.dumps({'query': normalize_query(query), 'view': view_key}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ScoutingEngine:
+    """Executa consultas de scouting sobre arrays extraídos uma vez do dataset"""
+
+    def __init__(self, df, cache_entries=config.SCOUTING_CACHE_ENTRIES):
+        self.df = df
+        self.row_ids = df.index.to_numpy()
+        self._numeric = {}
+        self._categorical = {}
+        self._cache = LRUCache(max_bytes=float('inf'), max_entries=cache_entries, sizeof=lambda value: 0)
+
+        # Arrays extraídos sob demanda (uma vez por coluna usada em alguma consulta)
+        self._sources = {col: df[col] for col in df.columns}
+        if 'Pos' in df.columns:
+            for name, derive in DERIVED_COLUMNS.items():
+                self._sources[name] = derive
+        self._kinds = {
+            col: 'numeric' if not callable(src) and (
+                pd.api.types.is_bool_dtype(src) or pd.api.types.is_numeric_dtype(src)
+            ) else 'categorical'
+            for col, src in self._sources.items()
+        }
+
+    def _series(self, column):
+        source = self._sources[column]
+        return pd.Series(source(self.df), index=self.df.index) if callable(source) else source
+
+    def _numeric_array(self, column):
+        if column not in self._numeric:
+            self._numeric[column] = self._series(column).to_numpy(dtype=np.float64, na_value=np.nan)
+        return self._numeric[column]
+
+    def _categorical_codes(self, column):
+        if column not in self._categorical:
+            codes, uniques = pd.factorize(self._series(column).astype(str), sort=True)
+            self._categorical[column] = (codes, {v: i for i, v in enumerate(uniques)}, np.asarray(uniques, dtype=object))
+        return self._categorical[column]
+
+    @property
+    def numeric_columns(self):
+        return [col for col, kind in self._kinds.items() if kind == 'numeric']
+
+    @property
+    def categorical_columns(self):
+        return [col for col, kind in self._kinds.items() if kind == 'categorical']
+
+    def categories(self, column):
+        return list(self._categorical_codes(column)[2])
+
+    def _condition_mask(self, column, op, value):
+        kind = self._kinds.get(column)
+        if kind == 'numeric':
+            x = self._numeric_array(column)
+            if op == 'between':
+                low, high = value
+                return (x >= low) & (x <= high)
+            comparisons = {
+                '>=': np.greater_equal, '>': np.greater, '<=': np.less_equal,
+                '<': np.less, '==': np.equal, '!=': np.not_equal
+            }
+            if op not in comparisons:
+                raise ValueError(f"Operador '{op}' inválido para a coluna numérica {column}")
+            return comparisons[op](x, value)
+
+        if kind == 'categorical':
+            if op not in CATEGORICAL_OPERATORS:
+                raise ValueError(f"Operador '{op}' inválido para a coluna categórica {column}")
+            codes, lookup, uniques = self._categorical_codes(column)
+            values = (value,) if isinstance(value, str) else value
+            # Tabela de pertinência por código: uma indexação em vez de isin sobre strings
+            member = np.zeros(len(uniques) + 1, dtype=bool)
+            member[[lookup[v] for v in values if v in lookup]] = True
+            hit = member[codes]
+            return ~hit if op in ('not in', '!=') else hit
+
+        raise KeyError(f"Coluna desconhecida na consulta: {column}")
+
+    def _within_mask(self, within):
+        """Máscara das linhas da view (ids ordenados → busca binária)"""
+        mask = np.zeros(len(self.row_ids), dtype=bool)
+        mask[np.searchsorted(self.row_ids, within)] = True
+        return mask
+
+    def _grouped_top(self, candidates, values, groups, top_n):
+        """Top-n por grupo: agrupamento por contagem + argpartition em cada segmento"""
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+        order = np.argsort(groups.astype(np.int16 if n_groups < 2 ** 15 else np.int64), kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(groups, minlength=n_groups))])
+
+        selected, ranks = [], []
+        for g in range(n_groups):
+            segment = order[bounds[g]:bounds[g + 1]]
+            if len(segment) > top_n:
+                segment = segment[np.argpartition(-values[segment], top_n - 1)[:top_n]]
+            segment = segment[np.argsort(-values[segment], kind='stable')]
+            selected.append(segment)
+            ranks.append(np.arange(1, len(segment) + 1))
+        if not selected:
+            return candidates[:0], np.empty(0, dtype=np.int64)
+        return candidates[np.concatenate(selected)], np.concatenate(ranks)
+
+    def run(self, query, within=None, view_key=None):
+        """
+        Executa a consulta (com cache pelo hash) e retorna um DataFrame.
+
+        ``within`` restringe às linhas de uma view (ids); ``view_key`` é a
+        impressão digital dessa view, usada na chave do cache (quando ausente,
+        os próprios ids entram no hash).
+        """
+        if within is not None and len(within) == len(self.row_ids):
+            within = None
+        if within is not None and view_key is None:
+            view_key = hashlib.sha1(np.ascontiguousarray(within).tobytes()).hexdigest()[:16]
+        key = query_hash(query, view_key)
+        return self._cache.get_or_compute(key, lambda: self._execute(normalize_query(query), within))
+
+    def _execute(self, query, within):
+        rank_by, top_n, group_by = query['rank_by'], query['top_n'], query['group_by']
+        if self._kinds.get(rank_by) != 'numeric':
+            raise KeyError(f"Métrica de ranking não numérica ou ausente: {rank_by}")
+        metric = self._numeric_array(rank_by)
+
+        mask = ~np.isnan(metric)
+        for column, op, value in query['where']:
+            mask &= self._condition_mask(column, op, value)
+        if within is not None:
+            mask &= self._within_mask(within)
+
+        candidates = np.flatnonzero(mask)
+        matched = len(candidates)
+        values = metric[candidates]
+        if query['ascending']:
+            values = -values
+
+        if group_by:
+            codes, _, uniques = self._categorical_codes(group_by)
+            positions, ranks = self._grouped_top(candidates, values, codes[candidates], top_n)
+        else:
+            if len(candidates) > top_n:
+                top = np.argpartition(-values, top_n - 1)[:top_n]
+                candidates, values = candidates[top], values[top]
+            order = np.argsort(-values, kind='stable')
+            positions, ranks = candidates[order], np.arange(1, len(order) + 1)
+
+        columns = list(dict.fromkeys(
+            [c for c in DISPLAY_COLUMNS if c in self.df.columns]
+            + [c for c in query['columns'] if c in self.df.columns]
+            + [rank_by]
+        ))
+        result = self.df.iloc[positions][columns].reset_index(names='row_id')
+        if group_by and group_by not in result.columns:
+            result.insert(1, group_by, uniques[codes[positions]])
+        result.insert(1, 'Rank', ranks)
+        result.attrs['matched'] = matched
+        return result
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,127 @@
+"""
+🧭 Busca de jogadores similares do Premier League Analytics
+
+Índice de vizinhos mais próximos sobre perfis por 90 minutos padronizados
+(gols, assistências, xG, xAG, progressões...). As consultas são produtos
+matriz-vetor em blocos sobre os vetores normalizados (cosseno) ou com as
+normas pré-calculadas (euclidiana), com filtros opcionais de posição e
+minutos aplicados como máscaras antes do top-k. Sem dependência do Streamlit.
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+from clustering import standardize
+
+SIMILARITY_METRICS = ('cosine', 'euclidean')
+
+
+def primary_position(pos):
+    """Primeira posição listada ("MF,FW" → "MF")"""
+    codes, uniques = pd.factorize(pd.Series(pos, dtype=object).astype(str))
+    first = np.array([u.split(',')[0].strip() for u in uniques], dtype=object)
+    return first[codes]
+
+
+def per90_profile(df, features=config.SIMILARITY_FEATURES, totals=config.SIMILARITY_PER90_TOTALS):
+    """Matriz de perfil: colunas por 90 como estão e totais divididos pelos 90s jogados"""
+    features = [f for f in features if f in df.columns]
+    profile = df[features].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+    if 'Ninety_Minutes' in df.columns:
+        nineties = pd.to_numeric(df['Ninety_Minutes'], errors='coerce').to_numpy()
+        nineties = np.where(nineties > 0, nineties, np.nan)
+        for col in totals:
+            if col in profile.columns:
+                profile[col] = profile[col].to_numpy() / nineties
+    return profile.fillna(profile.median()).fillna(0.0)
+
+
+class SimilarityIndex:
+    """Vizinhos mais próximos por cosseno ou distância euclidiana nos perfis padronizados"""
+
+    def __init__(self, df, features=config.SIMILARITY_FEATURES, block_rows=config.SIMILARITY_BLOCK_ROWS):
+        profile = per90_profile(df, features)
+        self.features = list(profile.columns)
+        self.row_ids = df.index.to_numpy()
+        self.block_rows = block_rows
+
+        Z, self.mean, self.std = standardize(profile.to_numpy())
+        self.Z = Z
+        self.sq_norms = np.einsum('ij,ij->i', Z, Z)
+        norms = np.sqrt(self.sq_norms)
+        self.U = Z / np.where(norms > 0, norms, 1.0)[:, None]
+
+        self.positions = primary_position(df['Pos']) if 'Pos' in df.columns else np.full(len(df), 'N/A', dtype=object)
+        self.minutes = pd.to_numeric(df['Minutes'], errors='coerce').fillna(0).to_numpy() if 'Minutes' in df.columns else np.zeros(len(df))
+        self._position_masks = {pos: self.positions == pos for pos in pd.unique(self.positions)}
+        self._position_of_id = dict(zip(self.row_ids.tolist(), range(len(self.row_ids))))
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def profile(self, row_id):
+        """Vetor padronizado (z) de um jogador, indexado pelas variáveis"""
+        return pd.Series(self.Z[self._position_of_id[row_id]], index=self.features)
+
+    def _candidates(self, position=None, min_minutes=None, within=None):
+        mask = np.ones(len(self.row_ids), dtype=bool)
+        if position is not None:
+            positions = [position] if isinstance(position, str) else list(position)
+            mask &= np.logical_or.reduce([self._position_masks.get(p, False) for p in positions] + [np.zeros_like(mask)])
+        if min_minutes:
+            mask &= self.minutes >= min_minutes
+        if within is not None:
+            mask &= np.isin(self.row_ids, within)
+        return mask
+
+    def _scores(self, queries, metric):
+        """Similaridade (maior = mais parecido) de cada consulta contra todas as linhas, em blocos"""
+        n = len(self.row_ids)
+        scores = np.empty((len(queries), n))
+        for start in range(0, n, self.block_rows):
+            stop = min(start + self.block_rows, n)
+            if metric == 'cosine':
+                scores[:, start:stop] = self.U[queries] @ self.U[start:stop].T
+            else:
+                # ‖a − b‖² = ‖a‖² + ‖b‖² − 2a·b (distância negada para ordenar igual ao cosseno)
+                sq = self.sq_norms[queries][:, None] + self.sq_norms[start:stop][None, :] - 2 * self.Z[queries] @ self.Z[start:stop].T
+                scores[:, start:stop] = -np.sqrt(np.maximum(sq, 0))
+        return scores
+
+    def most_similar(self, row_ids, k=config.SIMILARITY_TOP_K, metric='cosine', same_position=False,
+                     position=None, min_minutes=None, within=None):
+        """
+        Os ``k`` jogadores mais parecidos com cada jogador de ``row_ids``.
+
+        ``same_position`` restringe à posição principal do próprio jogador;
+        ``position``, ``min_minutes`` e ``within`` (ids da view) restringem os
+        candidatos. Retorna um DataFrame (query_id, rank, row_id, score, com
+        score = cosseno ou −distância euclidiana).
+        """
+        if metric not in SIMILARITY_METRICS:
+            raise ValueError(f"Métrica desconhecida: {metric}")
+        single = np.isscalar(row_ids)
+        queries = np.array([self._position_of_id[r] for r in np.atleast_1d(row_ids)], dtype=np.intp)
+        base = self._candidates(position, min_minutes, within)
+
+        scores = self._scores(queries, metric)
+        frames = []
+        for q, row_scores in zip(queries, scores):
+            mask = base & self._position_masks[self.positions[q]] if same_position else base.copy()
+            mask[q] = False
+            candidates = np.flatnonzero(mask)
+            values = row_scores[candidates]
+            if len(candidates) > k:
+                top = np.argpartition(-values, k - 1)[:k]
+                candidates, values = candidates[top], values[top]
+            order = np.argsort(-values, kind='stable')
+            frames.append(pd.DataFrame({
+                'query_id': self.row_ids[q],
+                'rank': np.arange(1, len(order) + 1),
+                'row_id': self.row_ids[candidates[order]],
+                'score': values[order]
+            }))
+
+        result = pd.concat(frames, ignore_index=True)
+        return result.drop(columns='query_id') if single else result
@@ -0,0 +1,1319 @@
+"""
+🧮 Motor estatístico do Premier League Analytics
+
+Rotinas vetorizadas em NumPy/SciPy usadas pelas seções do dashboard. Não
+dependem do Streamlit, então também podem rodar em processos filhos e em modo
+batch.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, combinations, islice
+from math import comb
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, stats
+
+import config
+
+
+# ============================================================================
+# Regressão linear (OLS) em forma fechada
+# ============================================================================
+
+def _design_matrix(X):
+    """Matriz de desenho [1, X] em float64"""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    return np.column_stack([np.ones(len(X)), X])
+
+
+def regression_metrics(y_true, y_pred):
+    """R², RMSE e MAE a partir de valores reais e preditos"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    residuals = y_true - y_pred
+    sse = float(residuals @ residuals)
+    sst = float(((y_true - y_true.mean()) ** 2).sum())
+    return {
+        'r2': 1 - sse / sst if sst > 0 else 0.0,
+        'rmse': float(np.sqrt(sse / len(y_true))) if len(y_true) else np.nan,
+        'mae': float(np.abs(residuals).mean()) if len(y_true) else np.nan
+    }
+
+
+def fit_ols(X, y, feature_names=None, alpha=config.ALPHA):
+    """
+    Ajusta OLS com intercepto a partir de uma única fatoração QR de [1, X].
+
+    Retorna um dicionário com coeficientes, erros padrão, estatísticas t,
+    p-valores, intervalos de confiança, teste F global, R²/R² ajustado,
+    valores ajustados e (XᵀX)⁻¹ — este último usado por ``ols_predict`` para
+    os intervalos de predição. Matrizes com posto incompleto caem para a
+    pseudo-inversa.
+    """
+    if feature_names is None:
+        feature_names = list(X.columns) if hasattr(X, 'columns') else [f"x{i}" for i in range(np.shape(X)[1])]
+    Z = _design_matrix(X)
+    y = np.asarray(y, dtype=np.float64)
+    n, k = Z.shape
+
+    Q, R = np.linalg.qr(Z, mode='reduced')
+    diag = np.abs(np.diag(R))
+    full_rank = diag.min() > diag.max() * max(n, k) * np.finfo(np.float64).eps
+
+    if full_rank:
+        params = linalg.solve_triangular(R, Q.T @ y)
+        R_inv = linalg.solve_triangular(R, np.eye(k))
+        xtx_inv = R_inv @ R_inv.T
+        rank = k
+    else:
+        xtx_inv = np.linalg.pinv(Z.T @ Z)
+        params = xtx_inv @ (Z.T @ y)
+        rank = np.linalg.matrix_rank(Z)
+
+    fitted = Z @ params
+    residuals = y - fitted
+    df_resid = n - rank
+    df_model = rank - 1
+    sse = float(residuals @ residuals)
+    centered = y - y.mean()
+    sst = float(centered @ centered)
+
+    sigma2 = sse / df_resid if df_resid > 0 else np.nan
+    bse = np.sqrt(np.clip(np.diag(xtx_inv) * sigma2, 0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tvalues = params / bse
+    pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid)
+    t_crit = stats.t.ppf(1 - alpha / 2, df_resid)
+
+    rsquared = 1 - sse / sst if sst > 0 else 0.0
+    rsquared_adj = 1 - (1 - rsquared) * (n - 1) / df_resid if df_resid > 0 else np.nan
+    if df_model > 0 and df_resid > 0 and sse > 0:
+        fvalue = ((sst - sse) / df_model) / (sse / df_resid)
+        f_pvalue = float(stats.f.sf(fvalue, df_model, df_resid))
+    else:
+        fvalue, f_pvalue = np.nan, np.nan
+
+    names = ['const'] + list(feature_names)
+    summary = pd.DataFrame({
+        'coef': params,
+        'std_err': bse,
+        't': tvalues,
+        'p_value': pvalues,
+        'ci_lower': params - t_crit * bse,
+        'ci_upper': params + t_crit * bse
+    }, index=names)
+
+    return {
+        'names': names,
+        'params': params,
+        'bse': bse,
+        'tvalues': tvalues,
+        'pvalues': pvalues,
+        'summary': summary,
+        'xtx_inv': xtx_inv,
+        'sigma2': sigma2,
+        'alpha': alpha,
+        'nobs': n,
+        'df_model': df_model,
+        'df_resid': df_resid,
+        'rsquared': rsquared,
+        'rsquared_adj': rsquared_adj,
+        'fvalue': fvalue,
+        'f_pvalue': f_pvalue,
+        'fitted': fitted,
+        'residuals': residuals,
+        'rmse': float(np.sqrt(sse / n)),
+        'mae': float(np.abs(residuals).mean())
+    }
+
+
+def ols_predict(fit, X_new, alpha=None):
+    """
+    Predições com intervalo de confiança da média e intervalo de predição.
+
+    Usa o (XᵀX)⁻¹ guardado pelo ajuste, então custa apenas produtos de matriz.
+    """
+    alpha = fit['alpha'] if alpha is None else alpha
+    Z = _design_matrix(X_new)
+    mean = Z @ fit['params']
+    # Variância da média: diag(Z (XᵀX)⁻¹ Zᵀ) · σ²
+    leverage = np.einsum('ij,jk,ik->i', Z, fit['xtx_inv'], Z)
+    se_mean = np.sqrt(leverage * fit['sigma2'])
+    se_obs = np.sqrt((1 + leverage) * fit['sigma2'])
+    t_crit = stats.t.ppf(1 - alpha / 2, fit['df_resid'])
+
+    return pd.DataFrame({
+        'mean': mean,
+        'mean_se': se_mean,
+        'mean_ci_lower': mean - t_crit * se_mean,
+        'mean_ci_upper': mean + t_crit * se_mean,
+        'obs_ci_lower': mean - t_crit * se_obs,
+        'obs_ci_upper': mean + t_crit * se_obs
+    })
+
+
+def fit_ols_train_test(X_train, y_train, X_test, y_test, alpha=config.ALPHA):
+    """Ajuste no treino + métricas de treino e teste, tudo a partir da mesma fatoração"""
+    fit = fit_ols(X_train, y_train, alpha=alpha)
+    y_pred_test = _design_matrix(X_test) @ fit['params']
+    test_metrics = regression_metrics(y_test, y_pred_test)
+
+    fit.update({
+        'y_pred_train': fit['fitted'],
+        'y_pred_test': y_pred_test,
+        'r2_train': fit['rsquared'],
+        'r2_test': test_metrics['r2'],
+        'rmse_test': test_metrics['rmse'],
+        'mae_test': test_metrics['mae']
+    })
+    return fit
+
+
+# ============================================================================
+# Seleção automática de variáveis (best subset / stepwise)
+# ============================================================================
+
+# Critérios: nome -> (coluna do resultado, maior é melhor?)
+SUBSET_CRITERIA = {
+    'adj_r2': ('adj_r2', True),
+    'aic': ('aic', False),
+    'bic': ('bic', False),
+    'cv_rmse': ('cv_rmse', False)
+}
+
+
+def _subset_solve(G, subsets, y_col):
+    """Resolve as equações normais de vários subconjuntos a partir da Gram"""
+    XtX = G[subsets[:, :, None], subsets[:, None, :]]
+    Xty = G[subsets, y_col]
+    try:
+        beta = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        beta = np.einsum('mij,mj->mi', np.linalg.pinv(XtX), Xty)
+    return beta, Xty
+
+
+def _subset_scores(G, fold_grams, n, subsets, criterion):
+    """
+    Métricas de um lote de subconjuntos sem tocar nos dados originais.
+
+    ``subsets`` tem forma (m, k) com índices de coluna da Gram (a coluna 0 é o
+    intercepto). O RSS sai de yᵀy − βᵀXᵀy; na validação cruzada a Gram de
+    treino de cada fold é G − G_fold, então nenhum ajuste é refeito do zero.
+    """
+    y_col = G.shape[0] - 1
+    beta, Xty = _subset_solve(G, subsets, y_col)
+    rss = G[y_col, y_col] - np.einsum('mi,mi->m', beta, Xty)
+    rss = np.maximum(rss, np.finfo(np.float64).tiny)
+
+    k = subsets.shape[1]
+    tss = G[y_col, y_col] - G[0, y_col] ** 2 / n
+    r2 = 1 - rss / tss
+    result = {
+        'r2': r2,
+        'adj_r2': 1 - (1 - r2) * (n - 1) / max(n - k, 1),
+        'aic': n * np.log(rss / n) + 2 * k,
+        'bic': n * np.log(rss / n) + np.log(n) * k
+    }
+
+    if criterion == 'cv_rmse':
+        sse = np.zeros(len(subsets))
+        for G_test in fold_grams:
+            beta_train, _ = _subset_solve(G - G_test, subsets, y_col)
+            XtX_test = G_test[subsets[:, :, None], subsets[:, None, :]]
+            Xty_test = G_test[subsets, y_col]
+            sse += (
+                G_test[y_col, y_col]
+                - 2 * np.einsum('mi,mi->m', beta_train, Xty_test)
+                + np.einsum('mi,mij,mj->m', beta_train, XtX_test, beta_train)
+            )
+        result['cv_rmse'] = np.sqrt(np.maximum(sse, 0) / n)
+
+    return result
+
+
+def _criterion_score(metrics, criterion):
+    """Pontuação em que menor é melhor"""
+    column, higher_is_better = SUBSET_CRITERIA[criterion]
+    return -metrics[column] if higher_is_better else metrics[column]
+
+
+def unrank_combination(index, p, k):
+    """Combinação de tamanho k de 1..p na posição ``index`` da ordem lexicográfica"""
+    combo, x = [], 1
+    for slot in range(k):
+        # comb(p − x, k − slot − 1) combinações começam com x nesta posição
+        while index >= (count := comb(p - x, k - slot - 1)):
+            index -= count
+            x += 1
+        combo.append(x)
+        x += 1
+    return combo
+
+
+def combinations_from(start, p, k, count):
+    """
+    ``count`` combinações de 1..p a partir da posição ``start``, na mesma ordem
+    de ``itertools.combinations``, sem percorrer as anteriores.
+
+    Depois da combinação inicial c vêm, para i = k−1, …, 0, as que mantêm o
+    prefixo c[:i] e têm o i-ésimo elemento maior que c[i]; cada bloco é um
+    ``combinations`` em C com o prefixo concatenado.
+    """
+    combo = tuple(unrank_combination(start, p, k))
+    blocks = [
+        map(combo[:i].__add__, combinations(range(combo[i] + 1, p + 1), k - i))
+        for i in range(k - 1, -1, -1)
+    ]
+    return islice(chain([combo], *blocks), count)
+
+
+def _exhaustive_chunk(G, fold_grams, n, p, k, start, stop, criterion, keep):
+    """Avalia as combinações [start, stop) de tamanho k (executa em processo filho)"""
+    combos = np.fromiter(
+        chain.from_iterable(combinations_from(start, p, k, stop - start)),
+        dtype=np.intp
+    ).reshape(-1, k)
+    subsets = np.column_stack([np.zeros(len(combos), dtype=np.intp), combos])
+    metrics = _subset_scores(G, fold_grams, n, subsets, criterion)
+
+    score = _criterion_score(metrics, criterion)
+    if len(score) > keep:
+        best = np.argpartition(score, keep)[:keep]
+    else:
+        best = np.arange(len(score))
+    return combos[best], {name: values[best] for name, values in metrics.items()}
+
+
+def feature_subset_search(X, y, method='forward', criterion='adj_r2', max_features=config.SECTION_CONFIG['modeling']['max_features'],
+                          top_n=config.DEFAULT_TOP_N, n_folds=5, random_state=config.RANDOM_STATE, n_jobs=config.N_JOBS):
+    """
+    Seleção automática de variáveis para a regressão linear.
+
+    Métodos: ``'exhaustive'`` (best subset até ``max_features`` variáveis),
+    ``'forward'`` e ``'backward'`` (stepwise). Os critérios são R² ajustado,
+    AIC, BIC ou RMSE de validação cruzada. A Gram [1, X, y]ᵀ[1, X, y] é
+    calculada uma única vez; cada candidato custa só um sistema k×k. No modo
+    exaustivo os lotes de combinações são distribuídos entre processos.
+
+    Retorna um DataFrame ordenado (melhor primeiro) com as variáveis e as métricas.
+    """
+    if criterion not in SUBSET_CRITERIA:
+        raise ValueError(f"Critério desconhecido: {criterion}")
+
+    names = list(X.columns)
+    values = np.asarray(X, dtype=np.float64)
+    # Padronizar melhora o condicionamento da Gram sem alterar RSS/R²
+    std = values.std(axis=0)
+    values = (values - values.mean(axis=0)) / np.where(std > 0, std, 1)
+    Z = np.column_stack([np.ones(len(values)), values, np.asarray(y, dtype=np.float64)])
+    n, p = len(Z), len(names)
+    max_features = min(max_features, p)
+
+    G = Z.T @ Z
+    fold_grams = []
+    if criterion == 'cv_rmse':
+        folds = np.array_split(np.random.default_rng(random_state).permutation(n), n_folds)
+        fold_grams = [Z[idx].T @ Z[idx] for idx in folds]
+
+    def evaluate(subsets):
+        subsets = np.column_stack([np.zeros(len(subsets), dtype=np.intp), np.asarray(subsets, dtype=np.intp)])
+        return _subset_scores(G, fold_grams, n, subsets, criterion)
+
+    rows = []
+    if method == 'exhaustive':
+        total = sum(comb(p, k) for k in range(1, max_features + 1))
+        if total > config.SUBSET_MAX_CANDIDATES:
+            raise ValueError(
+                f"{total:,} combinações excedem o limite de {config.SUBSET_MAX_CANDIDATES:,}; "
+                "reduza o número de variáveis ou use o modo stepwise"
+            )
+
+        chunk = config.SUBSET_CHUNK_SIZE
+        tasks = [
+            (k, start, min(start + chunk, comb(p, k)))
+            for k in range(1, max_features + 1)
+            for start in range(0, comb(p, k), chunk)
+        ]
+        args = [(G, fold_grams, n, p, k, start, stop, criterion, top_n) for k, start, stop in tasks]
+
+        if total >= config.SUBSET_PARALLEL_THRESHOLD and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                partials = list(executor.map(_exhaustive_chunk, *zip(*args)))
+        else:
+            partials = [_exhaustive_chunk(*a) for a in args]
+
+        for combos, metrics in partials:
+            for i, combo in enumerate(combos):
+                rows.append({
+                    'features': tuple(names[j - 1] for j in combo),
+                    **{name: float(values_[i]) for name, values_ in metrics.items()}
+                })
+
+    elif method in ('forward', 'backward'):
+        current = [] if method == 'forward' else list(range(1, p + 1))
+        if current:
+            best_metrics = {name: float(v[0]) for name, v in evaluate([current]).items()}
+        else:
+            # Modelo só com intercepto
+            only_intercept = _subset_scores(G, fold_grams, n, np.zeros((1, 1), dtype=np.intp), criterion)
+            best_metrics = {name: float(v[0]) for name, v in only_intercept.items()}
+        best_score = float(_criterion_score(best_metrics, criterion))
+        if current and len(current) <= max_features:
+            rows.append({'features': tuple(names[j - 1] for j in current), **best_metrics})
+
+        while True:
+            if method == 'forward':
+                if len(current) >= max_features:
+                    break
+                candidates = [current + [j] for j in range(1, p + 1) if j not in current]
+            else:
+                if len(current) <= 1:
+                    break
+                candidates = [[c for c in current if c != j] for j in current]
+            if not candidates:
+                break
+
+            metrics = evaluate(candidates)
+            scores = _criterion_score(metrics, criterion)
+            best = int(np.argmin(scores))
+            # Backward continua enquanto o modelo tiver mais variáveis que o máximo permitido
+            must_shrink = method == 'backward' and len(current) > max_features
+            if scores[best] >= best_score - 1e-12 and not must_shrink:
+                break
+
+            current = sorted(candidates[best])
+            best_score = float(scores[best])
+            best_metrics = {name: float(v[best]) for name, v in metrics.items()}
+            if len(current) <= max_features:
+                rows.append({'features': tuple(names[j - 1] for j in current), **best_metrics})
+    else:
+        raise ValueError(f"Método desconhecido: {method}")
+
+    ranking = pd.DataFrame(rows)
+    if ranking.empty:
+        return ranking
+    column, higher_is_better = SUBSET_CRITERIA[criterion]
+    ranking.insert(1, 'n_features', ranking['features'].map(len))
+    ranking = ranking.sort_values(column, ascending=not higher_is_better).head(top_n)
+    return ranking.reset_index(drop=True)
+
+
+# ============================================================================
+# Validação cruzada (k-fold, repetida e por grupo)
+# ============================================================================
+
+def cv_fold_assignments(n, n_splits=5, n_repeats=1, groups=None, random_state=config.RANDOM_STATE):
+    """
+    Fold de teste de cada linha, com forma (n_repeats, n).
+
+    Sem ``groups`` é um k-fold embaralhado. Com ``groups`` (ex.: Squad ou
+    Season) todas as linhas de um grupo caem no mesmo fold; os grupos são
+    distribuídos do maior para o menor no fold mais vazio, como no GroupKFold,
+    com desempate aleatório a cada repetição.
+    """
+    rng = np.random.default_rng(random_state)
+    assignments = np.empty((n_repeats, n), dtype=np.int16)
+
+    if groups is None:
+        if n_splits > n:
+            raise ValueError(f"{n_splits} folds exigem pelo menos {n_splits} linhas")
+        base = np.arange(n) % n_splits
+        for r in range(n_repeats):
+            assignments[r] = rng.permutation(base)
+        return assignments
+
+    codes, uniques = pd.factorize(pd.Series(groups), use_na_sentinel=False)
+    if n_splits > len(uniques):
+        raise ValueError(f"{n_splits} folds exigem pelo menos {n_splits} grupos (há {len(uniques)})")
+    sizes = np.bincount(codes, minlength=len(uniques))
+    for r in range(n_repeats):
+        # Ordena por tamanho decrescente; empates em ordem aleatória
+        order = np.lexsort((rng.random(len(sizes)), -sizes))
+        load = np.zeros(n_splits, dtype=np.int64)
+        group_fold = np.empty(len(sizes), dtype=np.int16)
+        for g in order:
+            fold = int(np.argmin(load))
+            group_fold[g] = fold
+            load[fold] += sizes[g]
+        assignments[r] = group_fold[codes]
+    return assignments
+
+
+def _cv_repeat(X, y, folds, repeat):
+    """Ajusta e avalia todos os folds de uma repetição (executa em processo filho)"""
+    rows = []
+    for fold in np.unique(folds):
+        test = folds == fold
+        fit = fit_ols_train_test(X[~test], y[~test], X[test], y[test])
+        rows.append({
+            'repeat': repeat,
+            'fold': int(fold),
+            'n_train': int((~test).sum()),
+            'n_test': int(test.sum()),
+            'r2_train': fit['r2_train'],
+            'r2_test': fit['r2_test'],
+            'rmse_test': fit['rmse_test'],
+            'mae_test': fit['mae_test']
+        })
+    return rows
+
+
+def cross_validate_ols(X, y, assignments, n_jobs=config.N_JOBS):
+    """
+    Métricas por fold da regressão OLS para as atribuições de ``cv_fold_assignments``.
+
+    As repetições rodam em paralelo quando o volume (linhas × repetições)
+    passa de ``config.CV_PARALLEL_MIN_ROWS``. Retorna (folds, resumo): o
+    DataFrame fold a fold e a média/desvio padrão de cada métrica.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    assignments = np.atleast_2d(assignments)
+    n_repeats = len(assignments)
+
+    if n_repeats > 1 and len(X) * n_repeats >= config.CV_PARALLEL_MIN_ROWS:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            parts = list(executor.map(
+                _cv_repeat, [X] * n_repeats, [y] * n_repeats, list(assignments), range(n_repeats)
+            ))
+    else:
+        parts = [_cv_repeat(X, y, folds, r) for r, folds in enumerate(assignments)]
+
+    folds = pd.DataFrame([row for part in parts for row in part])
+    metrics = ['r2_train', 'r2_test', 'rmse_test', 'mae_test']
+    summary = folds[metrics].agg(['mean', 'std']).T
+    return folds, summary
+
+
+# ============================================================================
+# Correlações com significância (todos os pares de uma vez)
+# ============================================================================
+
+def fdr_bh(pvalues):
+    """p-valores ajustados por Benjamini-Hochberg (FDR), preservando a forma e os NaN"""
+    p = np.asarray(pvalues, dtype=np.float64)
+    flat = p.ravel()
+    valid = ~np.isnan(flat)
+    adjusted = np.full_like(flat, np.nan)
+    m = int(valid.sum())
+    if m:
+        order = np.argsort(flat[valid])
+        ranked = flat[valid][order] * m / np.arange(1, m + 1)
+        ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+        values = np.empty(m)
+        values[order] = np.minimum(ranked, 1.0)
+        adjusted[valid] = values
+    return adjusted.reshape(p.shape)
+
+
+def rank_columns(values):
+    """
+    Postos médios (empates recebem a média) de cada coluna, NaN preservado.
+
+    Uma única ordenação da matriz inteira; as médias dos empates saem de um
+    bincount sobre os identificadores de bloco de empate de todas as colunas.
+    """
+    columns = np.ascontiguousarray(np.asarray(values, dtype=np.float64).T)   # uma coluna por linha
+    p, n = columns.shape
+    order = np.argsort(columns, axis=1)
+    ordered = np.take_along_axis(columns, order, axis=1)
+
+    new_block = np.ones((p, n), dtype=bool)
+    new_block[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    block = np.cumsum(new_block.ravel()) - 1
+    positions = np.tile(np.arange(1, n + 1, dtype=np.float64), p)
+    mean_rank = np.bincount(block, weights=positions) / np.bincount(block)
+
+    ranks = np.empty((p, n))
+    np.put_along_axis(ranks, order, mean_rank[block].reshape(p, n), axis=1)
+    ranks[np.isnan(columns)] = np.nan
+    return ranks.T
+
+
+def _pairwise_pearson(values):
+    """
+    Pearson para todos os pares com exclusão pairwise de NaN, via produtos de
+    matriz: contagens, somas e somas de quadrados restritas às linhas em que
+    as duas colunas estão presentes.
+    """
+    present = ~np.isnan(values)
+    if present.all():
+        centered = values - values.mean(axis=0)
+        cov = centered.T @ centered
+        scale = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = np.clip(cov / np.outer(scale, scale), -1.0, 1.0)
+        np.fill_diagonal(r, 1.0)
+        return r, np.full(r.shape, float(len(values)))
+
+    filled = np.where(present, values, 0.0)
+    mask = present.astype(np.float64)
+
+    n = mask.T @ mask
+    sum_x = filled.T @ mask          # Σx_i nas linhas em que j também existe
+    sum_xx = (filled ** 2).T @ mask
+    sum_xy = filled.T @ filled
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        r = cov / np.sqrt(var_x * var_x.T)
+    r = np.clip(r, -1.0, 1.0)
+    np.fill_diagonal(r, 1.0)
+    return r, n
+
+
+def _masked_ranks(order, block, mask):
+    """
+    Postos médios de uma coluna restritos às linhas de ``mask``, a partir da
+    ordenação e dos blocos de empate da coluna inteira (sem reordenar).
+    """
+    kept = mask[order].astype(np.float64)
+    in_block = np.bincount(block, weights=kept)
+    before = np.cumsum(in_block) - in_block
+    ranks = np.empty(len(order))
+    ranks[order] = before[block] + (in_block[block] + 1) / 2
+    return ranks[mask]
+
+
+def _pairwise_spearman(values):
+    """
+    Spearman para todos os pares com exclusão pairwise de NaN.
+
+    Sem NaN é o Pearson sobre os postos de cada coluna. Com NaN, os postos de
+    cada par envolvendo uma coluna incompleta são refeitos nas linhas
+    completas do par; cada coluna é ordenada uma única vez e os postos
+    restritos saem de contagens sobre essa ordenação (O(n) por par).
+    """
+    present = ~np.isnan(values)
+    if present.all():
+        return _pairwise_pearson(rank_columns(values))
+
+    # Uma ordenação por coluna, reaproveitada nos postos de todos os pares
+    sorted_blocks = []
+    ranks = np.full(values.shape, np.nan)
+    for c, col in enumerate(values.T):
+        order = np.argsort(col, kind='stable')
+        ordered = col[order]
+        new_block = np.ones(len(col), dtype=bool)
+        new_block[1:] = ordered[1:] != ordered[:-1]
+        sorted_blocks.append((order, np.cumsum(new_block) - 1))
+        ranks[present[:, c], c] = _masked_ranks(*sorted_blocks[c], present[:, c])
+    r, n = _pairwise_pearson(ranks)
+
+    incomplete = ~present.all(axis=0)
+    first, second = np.triu_indices(values.shape[1], k=1)
+    for i, j in zip(first, second):
+        if not (incomplete[i] or incomplete[j]):
+            continue
+        mask = present[:, i] & present[:, j]
+        if mask.sum() < 2:
+            r[i, j] = r[j, i] = np.nan
+            continue
+        pair = np.column_stack([_masked_ranks(*sorted_blocks[i], mask), _masked_ranks(*sorted_blocks[j], mask)])
+        r[i, j] = r[j, i] = _pairwise_pearson(pair)[0][0, 1]
+    return r, n
+
+
+def _correlation_pvalues(r, n):
+    """p-valor bilateral de t = r·√((n−2)/(1−r²)), como em pearsonr/spearmanr"""
+    df = n - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r * np.sqrt(df / np.clip(1 - r ** 2, 0, None))
+        p = 2 * stats.t.sf(np.abs(t), df)
+    p = np.where(np.abs(r) >= 1, 0.0, p)
+    p = np.where(df > 0, p, np.nan)
+    np.fill_diagonal(p, np.nan)
+    return p
+
+
+def correlation_significance(data, columns=None):
+    """
+    Pearson e Spearman, p-valores e p-valores ajustados por FDR para todos os pares.
+
+    Spearman é o Pearson sobre a matriz de postos (médias nos empates),
+    calculada uma vez por coluna; com NaN, os postos são refeitos nas linhas
+    completas de cada par (``_pairwise_spearman``). O FDR (Benjamini-Hochberg) é aplicado sobre
+    os pares distintos de cada método. Retorna as matrizes (``pearson``,
+    ``spearman``, ``n`` e respectivos ``*_p``/``*_q``) e ``pairs``: uma linha
+    por par, ordenada pela |r| de Pearson.
+    """
+    columns = list(data.columns) if columns is None else list(columns)
+    frame = data[columns].astype(np.float64)
+    upper = np.triu_indices(len(columns), k=1)
+
+    result = {}
+    values = frame.to_numpy()
+    for method, pairwise in (('pearson', _pairwise_pearson), ('spearman', _pairwise_spearman)):
+        r, n = pairwise(values)
+        p = _correlation_pvalues(r, n)
+        q = np.full_like(p, np.nan)
+        q[upper] = fdr_bh(p[upper])
+        q.T[upper] = q[upper]
+
+        result[method] = pd.DataFrame(r, index=columns, columns=columns)
+        result[f'{method}_p'] = pd.DataFrame(p, index=columns, columns=columns)
+        result[f'{method}_q'] = pd.DataFrame(q, index=columns, columns=columns)
+        result['n'] = pd.DataFrame(n.astype(np.int64), index=columns, columns=columns)
+
+    names = np.asarray(columns, dtype=object)
+    pairs = pd.DataFrame({
+        'var1': names[upper[0]],
+        'var2': names[upper[1]],
+        'n': result['n'].to_numpy()[upper]
+    })
+    for method in ('pearson', 'spearman'):
+        pairs[f'{method}_r'] = result[method].to_numpy()[upper]
+        pairs[f'{method}_p'] = result[f'{method}_p'].to_numpy()[upper]
+        pairs[f'{method}_q'] = result[f'{method}_q'].to_numpy()[upper]
+    order = np.argsort(-np.abs(pairs['pearson_r'].to_numpy()), kind='stable')
+    result['pairs'] = pairs.iloc[order].reset_index(drop=True)
+    return result
+
+
+# ============================================================================
+# Bootstrap vetorizado (intervalos percentil e BCa)
+# ============================================================================
+
+def _weighted_statistic(kind, data, W):
+    """
+    Estatística calculada para cada linha de pesos de ``W`` (reamostras × n).
+
+    Uma reamostra bootstrap equivale a pesar cada observação pelo número de
+    vezes em que foi sorteada, então o lote inteiro sai de produtos de matriz.
+    """
+    if kind == 'correlation':
+        x, y = data
+        total = W.sum(axis=1)
+        mean_x, mean_y = W @ x / total, W @ y / total
+        cov = W @ (x * y) / total - mean_x * mean_y
+        var_x = W @ (x * x) / total - mean_x ** 2
+        var_y = W @ (y * y) / total - mean_y ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return cov / np.sqrt(var_x * var_y)
+
+    if kind == 'mean_difference':
+        values, in_first = data
+        W_a, W_b = W[:, in_first], W[:, ~in_first]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return W_a @ values[in_first] / W_a.sum(axis=1) - W_b @ values[~in_first] / W_b.sum(axis=1)
+
+    if kind == 'r_squared':
+        outer, k = data
+        G = (W @ outer).reshape(-1, k, k)        # Gram ponderada de [1, X, y]
+        XtX, Xty, yty = G[:, :-1, :-1], G[:, :-1, -1], G[:, -1, -1]
+        try:
+            beta = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            beta = np.einsum('bij,bj->bi', np.linalg.pinv(XtX), Xty)
+        rss = yty - np.einsum('bi,bi->b', beta, Xty)
+        tss = yty - G[:, 0, -1] ** 2 / G[:, 0, 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 1 - rss / tss
+
+    raise ValueError(f"Estatística desconhecida: {kind}")
+
+
+def _draw_weights(rng, n, n_resamples, strata_positions):
+    """Sorteia a matriz de índices de uma vez e a converte em contagens por observação"""
+    if strata_positions is None:
+        idx = rng.integers(0, n, size=(n_resamples, n))
+    else:
+        # Reamostragem dentro de cada estrato (ex.: cada grupo de uma diferença de médias)
+        idx = np.concatenate([
+            positions[rng.integers(0, len(positions), size=(n_resamples, len(positions)))]
+            for positions in strata_positions
+        ], axis=1)
+    flat = idx + (np.arange(n_resamples) * n)[:, None]
+    return np.bincount(flat.ravel(), minlength=n_resamples * n).reshape(n_resamples, n).astype(np.float64)
+
+
+def _bootstrap_batch(kind, data, n, strata_positions, n_resamples, seed):
+    """Gera ``n_resamples`` estatísticas bootstrap em lotes limitados em memória (executa em processo filho)"""
+    rng = np.random.default_rng(seed)
+    batch = max(1, config.BOOTSTRAP_BATCH_ELEMENTS // n)
+    parts = []
+    for start in range(0, n_resamples, batch):
+        W = _draw_weights(rng, n, min(batch, n_resamples - start), strata_positions)
+        parts.append(_weighted_statistic(kind, data, W))
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def _jackknife(kind, data, n, random_state):
+    """Jackknife por blocos (no máximo ``config.BOOTSTRAP_JACKKNIFE_BLOCKS`` exclusões)"""
+    n_blocks = min(n, config.BOOTSTRAP_JACKKNIFE_BLOCKS)
+    blocks = np.array_split(np.random.default_rng(random_state).permutation(n), n_blocks)
+    W = np.ones((n_blocks, n))
+    for i, block in enumerate(blocks):
+        W[i, block] = 0.0
+    return _weighted_statistic(kind, data, W)
+
+
+def bootstrap_ci(kind, data, n, strata=None, n_resamples=config.BOOTSTRAP_RESAMPLES,
+                 confidence=config.CONFIDENCE_LEVEL, random_state=config.RANDOM_STATE, n_jobs=config.N_JOBS):
+    """
+    Distribuição bootstrap e intervalos percentil/BCa de uma estatística.
+
+    Prefira os atalhos ``bootstrap_correlation``, ``bootstrap_mean_difference``
+    e ``bootstrap_r_squared``. Quando reamostras × n passa de
+    ``config.BOOTSTRAP_PARALLEL_MIN_ELEMENTS`` as reamostras são divididas
+    entre processos, cada um com sua própria semente derivada.
+    """
+    estimate = float(_weighted_statistic(kind, data, np.ones((1, n)))[0])
+    strata_positions = None
+    if strata is not None:
+        strata = np.asarray(strata)
+        strata_positions = [np.flatnonzero(strata == s) for s in np.unique(strata)]
+
+    workers = n_jobs or os.cpu_count() or 1
+    if workers > 1 and n_resamples * n >= config.BOOTSTRAP_PARALLEL_MIN_ELEMENTS:
+        seeds = np.random.SeedSequence(random_state).spawn(workers)
+        sizes = [len(part) for part in np.array_split(np.arange(n_resamples), workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(
+                _bootstrap_batch, [kind] * workers, [data] * workers, [n] * workers,
+                [strata_positions] * workers, sizes, seeds
+            ))
+        distribution = np.concatenate(parts)
+    else:
+        distribution = _bootstrap_batch(kind, data, n, strata_positions, n_resamples, random_state)
+    distribution = distribution[np.isfinite(distribution)]
+
+    alpha = 1 - confidence
+    percentile = tuple(np.quantile(distribution, [alpha / 2, 1 - alpha / 2]))
+
+    # BCa: correção de viés (z0) pela fração abaixo da estimativa e aceleração (a) pelo jackknife
+    below = (distribution < estimate).mean() + 0.5 * (distribution == estimate).mean()
+    z0 = stats.norm.ppf(below)
+    jack = _jackknife(kind, data, n, random_state)
+    jack = jack[np.isfinite(jack)]
+    d = jack.mean() - jack
+    denominator = 6 * (d ** 2).sum() ** 1.5
+    acceleration = (d ** 3).sum() / denominator if denominator > 0 else 0.0
+
+    if np.isfinite(z0):
+        z = stats.norm.ppf([alpha / 2, 1 - alpha / 2])
+        adjusted = stats.norm.cdf(z0 + (z0 + z) / (1 - acceleration * (z0 + z)))
+        bca = tuple(np.quantile(distribution, np.clip(adjusted, 0, 1)))
+    else:
+        bca = percentile
+
+    return {
+        'estimate': estimate,
+        'se': float(distribution.std(ddof=1)),
+        'percentile': percentile,
+        'bca': bca,
+        'bias': float(distribution.mean() - estimate),
+        'distribution': distribution,
+        'n_resamples': len(distribution),
+        'confidence': confidence
+    }
+
+
+def bootstrap_correlation(x, y, **kwargs):
+    """IC bootstrap do coeficiente de Pearson (pares com NaN são descartados)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    # Centralizar não muda r e evita cancelamento numérico nos momentos ponderados
+    x, y = x[valid] - x[valid].mean(), y[valid] - y[valid].mean()
+    return bootstrap_ci('correlation', (x, y), len(x), **kwargs)
+
+
+def bootstrap_mean_difference(a, b, **kwargs):
+    """IC bootstrap de média(a) − média(b), reamostrando cada grupo separadamente"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    a, b = a[~np.isnan(a)], b[~np.isnan(b)]
+    values = np.concatenate([a, b])
+    in_first = np.arange(len(values)) < len(a)
+    return bootstrap_ci('mean_difference', (values, in_first), len(values), strata=in_first, **kwargs)
+
+
+def bootstrap_r_squared(X, y, **kwargs):
+    """IC bootstrap do R² de uma regressão OLS com intercepto"""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    X, y = X[valid], y[valid]
+    Z = np.column_stack([np.ones(len(y)), X - X.mean(axis=0), y - y.mean()])
+    k = Z.shape[1]
+    outer = (Z[:, :, None] * Z[:, None, :]).reshape(len(Z), k * k)
+    return bootstrap_ci('r_squared', (outer, k), len(Z), **kwargs)
+
+
+# ============================================================================
+# Testes de permutação (ANOVA e comparação de dois grupos)
+# ============================================================================
+
+def _permutation_statistic(kind, V, indicator, sizes, total):
+    """
+    Estatística para cada linha de ``V`` (permutações × n).
+
+    As somas por grupo saem de um único produto V @ indicadora. Para a ANOVA
+    basta Σ S_g²/n_g: com a soma total fixa, F é função crescente dela.
+    """
+    sums = V @ indicator
+    if kind == 'anova':
+        return (sums ** 2 / sizes).sum(axis=1)
+    if kind == 'mean_difference':
+        return np.abs(sums[:, 0] / sizes[0] - (total - sums[:, 0]) / sizes[1])
+    raise ValueError(f"Estatística desconhecida: {kind}")
+
+
+def _permutation_hits(kind, values, indicator, sizes, observed, n_permutations, seed):
+    """Quantas permutações aleatórias igualam ou superam o observado (executa em processo filho)"""
+    rng = np.random.default_rng(seed)
+    total = values.sum()
+    tolerance = 1e-12 * max(abs(observed), 1.0)
+    batch = max(1, config.PERMUTATION_BATCH_ELEMENTS // len(values))
+    hits = 0
+    for start in range(0, n_permutations, batch):
+        size = min(batch, n_permutations - start)
+        V = rng.permuted(np.broadcast_to(values, (size, len(values))), axis=1)
+        hits += int((_permutation_statistic(kind, V, indicator, sizes, total) >= observed - tolerance).sum())
+    return hits
+
+
+def _exact_permutation_hits(values, sizes, observed):
+    """
+    Quantas divisões em dois grupos igualam ou superam o observado (teste exato).
+
+    Enumera só as escolhas do grupo menor, em lotes de até
+    ``config.PERMUTATION_BATCH_ELEMENTS`` índices: a soma dele define a do
+    outro, então a memória é lote × min(n₁, n₂) e não divisões × n.
+    """
+    n, total = len(values), values.sum()
+    n_first = int(sizes[0])
+    m = min(n_first, n - n_first)
+    tolerance = 1e-12 * max(abs(observed), 1.0)
+    batch = max(1, config.PERMUTATION_BATCH_ELEMENTS // max(m, 1))
+    splits = combinations(range(n), m)
+    hits, n_splits = 0, 0
+    while True:
+        chosen = np.fromiter(chain.from_iterable(islice(splits, batch)), dtype=np.intp).reshape(-1, m)
+        if not len(chosen):
+            break
+        sums = values[chosen].sum(axis=1)
+        sums_first = sums if m == n_first else total - sums
+        stat = np.abs(sums_first / sizes[0] - (total - sums_first) / sizes[1])
+        hits += int((stat >= observed - tolerance).sum())
+        n_splits += len(chosen)
+    return hits, n_splits
+
+
+def permutation_test(values, groups, max_permutations=config.PERMUTATION_MAX, alpha=config.ALPHA,
+                     random_state=config.RANDOM_STATE, n_jobs=config.N_JOBS):
+    """
+    p-valor por permutação dos rótulos de grupo.
+
+    Dois grupos: diferença absoluta de médias (use postos em ``values`` para a
+    versão Mann-Whitney). Três ou mais: F da ANOVA de um fator. Com dois
+    grupos pequenos todas as divisões são enumeradas (teste exato); caso
+    contrário as permutações rodam em rodadas de Monte Carlo, em paralelo
+    acima de ``config.PERMUTATION_PARALLEL_MIN_ELEMENTS``, e param assim que o
+    intervalo de 99% do p-valor exclui ``alpha`` ou fica mais estreito que
+    ``config.PERMUTATION_PRECISION``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes, uniques = pd.factorize(pd.Series(groups), sort=True)
+    valid = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[valid], codes[valid]
+    values = values - values.mean()    # não altera as estatísticas e melhora a precisão
+    n, k = len(values), len(uniques)
+    if k < 2:
+        raise ValueError("O teste de permutação exige pelo menos dois grupos")
+
+    kind = 'mean_difference' if k == 2 else 'anova'
+    indicator = np.zeros((n, k))
+    indicator[np.arange(n), codes] = 1.0
+    sizes = indicator.sum(axis=0)
+    total = values.sum()
+    observed = float(_permutation_statistic(kind, values[None, :], indicator, sizes, total)[0])
+
+    # Estatística reportada: diferença de médias (com sinal) ou F
+    group_means = np.bincount(codes, weights=values, minlength=k) / sizes
+    if kind == 'mean_difference':
+        reported = float(group_means[0] - group_means[1])
+    else:
+        ss_between = observed - total ** 2 / n
+        ss_within = float(values @ values) - observed
+        reported = (ss_between / (k - 1)) / (ss_within / (n - k)) if ss_within > 0 else np.inf
+
+    result = {'statistic': reported, 'groups': list(uniques), 'kind': kind}
+
+    # Teste exato: todas as divisões possíveis em dois grupos
+    if kind == 'mean_difference' and comb(n, int(sizes[0])) <= max_permutations:
+        hits, n_splits = _exact_permutation_hits(values, sizes, observed)
+        result.update({'p_value': hits / n_splits, 'n_permutations': n_splits, 'exact': True,
+                       'stopped_early': False, 'se': 0.0})
+        return result
+
+    workers = n_jobs or os.cpu_count() or 1
+    round_size = config.PERMUTATION_ROUND
+    parallel = workers > 1 and n * round_size >= config.PERMUTATION_PARALLEL_MIN_ELEMENTS
+    seeds = iter(np.random.SeedSequence(random_state).spawn(max_permutations // round_size * workers + workers))
+    z = stats.norm.ppf(0.995)
+
+    hits, done, stopped_early = 0, 0, False
+    executor = ProcessPoolExecutor(max_workers=workers) if parallel else None
+    try:
+        while done < max_permutations:
+            if executor is not None:
+                sizes_round = [len(p) for p in np.array_split(np.arange(min(round_size * workers, max_permutations - done)), workers)]
+                futures = [
+                    executor.submit(_permutation_hits, kind, values, indicator, sizes, observed, size, next(seeds))
+                    for size in sizes_round if size
+                ]
+                hits += sum(f.result() for f in futures)
+                done += sum(sizes_round)
+            else:
+                size = min(round_size, max_permutations - done)
+                hits += _permutation_hits(kind, values, indicator, sizes, observed, size, next(seeds))
+                done += size
+
+            # p-valor com correção +1 (nunca zero) e parada antecipada
+            p_value = (hits + 1) / (done + 1)
+            se = np.sqrt(p_value * (1 - p_value) / done)
+            if done < max_permutations and (abs(p_value - alpha) > z * se or z * se < config.PERMUTATION_PRECISION):
+                stopped_early = True
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    result.update({'p_value': p_value, 'n_permutations': done, 'exact': False,
+                   'stopped_early': stopped_early, 'se': float(se)})
+    return result
+
+
+# ============================================================================
+# Estatísticas por grupo em uma passada (ANOVA, Welch, Levene, Kruskal-Wallis)
+# ============================================================================
+
+def group_summaries(values, groups, min_size=2):
+    """
+    Resumo por grupo a partir de uma única fatoração e alguns ``np.bincount``:
+    tamanhos, somas, somas de quadrados, médias, variâncias, medianas e somas
+    de postos (postos médios sobre o conjunto todo). Grupos com menos de
+    ``min_size`` observações são descartados antes dos cálculos.
+
+    Serve de base para ``group_tests`` e para os testes post-hoc.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes, uniques = pd.factorize(pd.Series(groups), sort=True)
+    valid = (codes >= 0) & ~np.isnan(values)
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+
+    keep = counts >= min_size
+    remap = np.full(len(uniques), -1)
+    remap[keep] = np.arange(keep.sum())
+    codes = remap[codes[valid]]
+    values = values[valid]
+    inside = codes >= 0
+    codes, values = codes[inside], values[inside]
+    labels = np.asarray(uniques)[keep]
+    k = len(labels)
+
+    n = np.bincount(codes, minlength=k).astype(np.float64)
+    sums = np.bincount(codes, weights=values, minlength=k)
+    sq_sums = np.bincount(codes, weights=values ** 2, minlength=k)
+    means = sums / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variances = (sq_sums - sums * means) / (n - 1)
+
+    # Medianas: uma ordenação por (grupo, valor) e leitura das posições centrais
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    starts = np.concatenate([[0], np.cumsum(n)[:-1]]).astype(np.intp)
+    lengths = n.astype(np.intp)
+    medians = (sorted_values[starts + (lengths - 1) // 2] + sorted_values[starts + lengths // 2]) / 2
+
+    ranks = stats.rankdata(values)
+    _, tie_counts = np.unique(values, return_counts=True)
+
+    return {
+        'labels': labels,
+        'codes': codes,
+        'values': values,
+        'n': n,
+        'sums': sums,
+        'sq_sums': sq_sums,
+        'means': means,
+        'variances': np.maximum(variances, 0),
+        'medians': medians,
+        'rank_sums': np.bincount(codes, weights=ranks, minlength=k),
+        'tie_counts': tie_counts
+    }
+
+
+def _one_way_anova(n, sums, sq_sums):
+    """F da ANOVA de um fator a partir de tamanhos, somas e somas de quadrados"""
+    N, k = n.sum(), len(n)
+    between_raw = (sums ** 2 / n).sum()
+    ss_between = between_raw - sums.sum() ** 2 / N
+    ss_within = sq_sums.sum() - between_raw
+    df1, df2 = k - 1, N - k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        F = (ss_between / df1) / (ss_within / df2)
+    return F, df1, df2, stats.f.sf(F, df1, df2)
+
+
+def group_tests(summary):
+    """
+    ANOVA, Welch, Levene, Brown-Forsythe e Kruskal-Wallis derivados do mesmo resumo.
+
+    Retorna um DataFrame com uma linha por teste (estatística, graus de
+    liberdade e p-valor).
+    """
+    n, sums, sq_sums = summary['n'], summary['sums'], summary['sq_sums']
+    means, variances, codes, values = summary['means'], summary['variances'], summary['codes'], summary['values']
+    k, N = len(n), n.sum()
+    if k < 2:
+        raise ValueError("São necessários pelo menos dois grupos")
+    rows = []
+
+    F, df1, df2, p = _one_way_anova(n, sums, sq_sums)
+    rows.append({'test': 'ANOVA (one-way)', 'statistic': F, 'df1': df1, 'df2': df2, 'p_value': p})
+
+    # Welch: pesos n/s², não supõe variâncias iguais
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = n / variances
+        weighted_mean = (w * means).sum() / w.sum()
+        A = (w * (means - weighted_mean) ** 2).sum() / (k - 1)
+        tmp = ((1 - w / w.sum()) ** 2 / (n - 1)).sum()
+        F_welch = A / (1 + 2 * (k - 2) / (k ** 2 - 1) * tmp)
+        df2_welch = (k ** 2 - 1) / (3 * tmp)
+    p_welch = stats.f.sf(F_welch, k - 1, df2_welch) if np.all(variances > 0) else np.nan
+    rows.append({'test': 'ANOVA de Welch', 'statistic': F_welch if np.all(variances > 0) else np.nan,
+                 'df1': k - 1, 'df2': df2_welch, 'p_value': p_welch})
+
+    # Levene (centro = média) e Brown-Forsythe (centro = mediana): ANOVA sobre |x − centro|
+    for name, centers in (('Levene', means), ('Brown-Forsythe', summary['medians'])):
+        z = np.abs(values - centers[codes])
+        F_z, d1, d2, p_z = _one_way_anova(
+            n, np.bincount(codes, weights=z, minlength=k), np.bincount(codes, weights=z ** 2, minlength=k)
+        )
+        rows.append({'test': name, 'statistic': F_z, 'df1': d1, 'df2': d2, 'p_value': p_z})
+
+    # Kruskal-Wallis com correção de empates
+    H = 12 / (N * (N + 1)) * (summary['rank_sums'] ** 2 / n).sum() - 3 * (N + 1)
+    t = summary['tie_counts']
+    correction = 1 - (t ** 3 - t).sum() / (N ** 3 - N)
+    H = H / correction if correction > 0 else np.nan
+    rows.append({'test': 'Kruskal-Wallis', 'statistic': H, 'df1': k - 1, 'df2': np.nan,
+                 'p_value': stats.chi2.sf(H, k - 1)})
+
+    return pd.DataFrame(rows)
+
+
+def group_summary_table(summary):
+    """Tabela por grupo (n, média, desvio padrão, mediana) para exibição"""
+    return pd.DataFrame({
+        'n': summary['n'].astype(int),
+        'mean': summary['means'],
+        'std': np.sqrt(summary['variances']),
+        'median': summary['medians']
+    }, index=pd.Index(summary['labels'], name='group'))
+
+
+# ============================================================================
+# Diagnóstico de normalidade em lote
+# ============================================================================
+
+def streaming_moments(values, chunk_rows=config.NORMALITY_CHUNK_ROWS):
+    """
+    Contagem, média e momentos centrais M2..M4 de cada coluna, ignorando NaN.
+
+    Os blocos de ``chunk_rows`` linhas são combinados com as fórmulas de
+    atualização de Pébay, então a memória extra não depende do tamanho total.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    p = values.shape[1]
+    n, mean, M2, M3, M4 = (np.zeros(p) for _ in range(5))
+
+    for start in range(0, len(values), chunk_rows):
+        block = values[start:start + chunk_rows]
+        mask = ~np.isnan(block)
+        nb = mask.sum(axis=0).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mb = np.where(nb > 0, np.where(mask, block, 0).sum(axis=0) / nb, 0.0)
+        d = np.where(mask, block - mb, 0.0)
+        d2 = d * d
+        M2b, M3b, M4b = d2.sum(axis=0), (d2 * d).sum(axis=0), (d2 * d2).sum(axis=0)
+
+        na = n
+        total = na + nb
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = mb - mean
+            M4 = np.where(total > 0, M4 + M4b
+                          + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / total ** 3
+                          + 6 * delta ** 2 * (na ** 2 * M2b + nb ** 2 * M2) / total ** 2
+                          + 4 * delta * (na * M3b - nb * M3) / total, 0.0)
+            M3 = np.where(total > 0, M3 + M3b
+                          + delta ** 3 * na * nb * (na - nb) / total ** 2
+                          + 3 * delta * (na * M2b - nb * M2) / total, 0.0)
+            M2 = np.where(total > 0, M2 + M2b + delta ** 2 * na * nb / total, 0.0)
+            mean = np.where(total > 0, mean + delta * nb / total, 0.0)
+        n = total
+
+    return {'n': n, 'mean': mean, 'M2': M2, 'M3': M3, 'M4': M4}
+
+
+def _dagostino(n, skew, kurt):
+    """K² de D'Agostino-Pearson (mesmas fórmulas de skewtest/kurtosistest do SciPy)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = skew * np.sqrt((n + 1) * (n + 3) / (6 * (n - 2)))
+        beta2 = 3 * (n ** 2 + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2) * (n + 5) * (n + 7) * (n + 9))
+        W2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(W2))
+        alpha = np.sqrt(2 / (W2 - 1))
+        y = np.where(y == 0, 1, y)
+        Z1 = delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+        b2 = kurt + 3
+        E = 3 * (n - 1) / (n + 1)
+        var_b2 = 24 * n * (n - 2) * (n - 3) / ((n + 1) ** 2 * (n + 3) * (n + 5))
+        x = (b2 - E) / np.sqrt(var_b2)
+        sqrt_beta1 = 6 * (n ** 2 - 5 * n + 2) / ((n + 7) * (n + 9)) * np.sqrt(6 * (n + 3) * (n + 5) / (n * (n - 2) * (n - 3)))
+        A = 6 + 8 / sqrt_beta1 * (2 / sqrt_beta1 + np.sqrt(1 + 4 / sqrt_beta1 ** 2))
+        denom = 1 + x * np.sqrt(2 / (A - 4))
+        term2 = np.sign(denom) * np.where(denom == 0, np.nan, ((1 - 2 / A) / np.abs(denom)) ** (1 / 3))
+        Z2 = (1 - 2 / (9 * A) - term2) / np.sqrt(2 / (9 * A))
+
+    K2 = np.where(n >= 8, Z1 ** 2 + Z2 ** 2, np.nan)
+    return K2, stats.chi2.sf(K2, 2)
+
+
+def _anderson_darling(values, mean, std):
+    """A² (média e variância estimadas) de cada coluna com uma única ordenação da matriz"""
+    columns = np.sort(np.asarray(values, dtype=np.float64).T, axis=1)   # NaN vão para o fim
+    counts = (~np.isnan(columns)).sum(axis=1)
+    p, width = columns.shape
+    i = np.arange(1, width + 1)[None, :]
+    valid = i <= counts[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (columns - mean[:, None]) / std[:, None]
+        log_cdf = stats.norm.logcdf(z)
+        log_sf = stats.norm.logsf(z)
+        # Posição espelhada n + 1 − i dentro dos valores válidos de cada coluna
+        mirror = np.clip(counts[:, None] - i, 0, width - 1)
+        terms = (2 * i - 1) * (log_cdf + np.take_along_axis(log_sf, mirror, axis=1))
+        A2 = -counts - np.where(valid, terms, 0).sum(axis=1) / counts
+
+        # Ajuste de D'Agostino & Stephens (1986) e p-valor aproximado
+        A = A2 * (1 + 0.75 / counts + 2.25 / counts ** 2)
+        p_value = np.select(
+            [A >= 0.6, A >= 0.34, A >= 0.2],
+            [np.exp(1.2937 - 5.709 * A + 0.0186 * A ** 2),
+             np.exp(0.9177 - 4.279 * A - 1.38 * A ** 2),
+             1 - np.exp(-8.318 + 42.796 * A - 59.938 * A ** 2)],
+            1 - np.exp(-13.436 + 101.14 * A - 223.73 * A ** 2)
+        )
+    return A2, np.clip(p_value, 0, 1)
+
+
+def stratified_sample(n, size, strata=None, random_state=config.RANDOM_STATE):
+    """Posições de uma amostra de até ``size`` linhas, proporcional aos estratos"""
+    rng = np.random.default_rng(random_state)
+    if n <= size:
+        return np.arange(n)
+    if strata is None:
+        return np.sort(rng.choice(n, size=size, replace=False))
+
+    codes, _ = pd.factorize(pd.Series(strata), use_na_sentinel=False)
+    counts = np.bincount(codes)
+    quota = np.floor(counts * size / n).astype(int)
+    # Distribui as vagas restantes pelos maiores restos
+    remainder = counts * size / n - quota
+    quota[np.argsort(-remainder)[:size - quota.sum()]] += 1
+    # Uma permutação global; cada estrato fica com os primeiros da sua quota
+    order = rng.permutation(n)
+    ranked = np.empty(n, dtype=np.int64)
+    by_stratum = order[np.argsort(codes[order], kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    ranked[by_stratum] = np.arange(n) - np.repeat(starts, counts)
+    return np.flatnonzero(ranked < quota[codes])
+
+
+def normality_battery(data, columns=None, strata=None, shapiro_max=config.SHAPIRO_MAX_SAMPLE,
+                      random_state=config.RANDOM_STATE):
+    """
+    Anderson-Darling, Jarque-Bera, D'Agostino e Shapiro-Wilk para várias colunas.
+
+    Assimetria e curtose vêm de ``streaming_moments`` (uma passada por blocos),
+    JB e K² são vetorizados sobre as colunas e o A² usa uma única ordenação da
+    matriz. O Shapiro-Wilk, válido até ~5000 observações, roda sobre uma
+    subamostra estratificada (ex.: por posição) de até ``shapiro_max`` linhas.
+    Retorna um DataFrame com uma linha por coluna.
+    """
+    columns = list(data.columns) if columns is None else list(columns)
+    values = data[columns].to_numpy(dtype=np.float64)
+    moments = streaming_moments(values)
+    n, M2, M3, M4 = moments['n'], moments['M2'], moments['M3'], moments['M4']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skew = np.sqrt(n) * M3 / M2 ** 1.5
+        kurt = n * M4 / M2 ** 2 - 3
+        std = np.sqrt(M2 / (n - 1))
+        jb = n / 6 * (skew ** 2 + kurt ** 2 / 4)
+    k2, k2_p = _dagostino(n, skew, kurt)
+    ad, ad_p = _anderson_darling(values, moments['mean'], std)
+
+    sample = stratified_sample(len(values), shapiro_max, strata, random_state)
+    shapiro_w, shapiro_p, shapiro_n = [], [], []
+    for j in range(len(columns)):
+        column = values[sample, j]
+        column = column[~np.isnan(column)]
+        if len(column) >= 3 and np.ptp(column) > 0:
+            result = stats.shapiro(column)
+            shapiro_w.append(result.statistic)
+            shapiro_p.append(result.pvalue)
+        else:
+            shapiro_w.append(np.nan)
+            shapiro_p.append(np.nan)
+        shapiro_n.append(len(column))
+
+    return pd.DataFrame({
+        'n': n.astype(np.int64),
+        'mean': moments['mean'],
+        'std': std,
+        'skew': skew,
+        'kurtosis': kurt,
+        'shapiro_w': shapiro_w,
+        'shapiro_p': shapiro_p,
+        'shapiro_n': shapiro_n,
+        'dagostino_k2': k2,
+        'dagostino_p': k2_p,
+        'jarque_bera': jb,
+        'jarque_bera_p': stats.chi2.sf(jb, 2),
+        'anderson_darling': ad,
+        'anderson_darling_p': ad_p
+    }, index=pd.Index(columns, name='variable'))
+
+
+def qq_quantiles(values, n_points=config.QQ_POINTS):
+    """
+    Pontos do gráfico Q-Q reduzidos a ``n_points`` quantis fixos.
+
+    Retorna os quantis teóricos da normal ajustada (média/desvio da amostra)
+    e os quantis amostrais correspondentes, independente do tamanho dos dados.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    probs = (np.arange(1, n_points + 1) - 0.5) / n_points
+    return pd.DataFrame({
+        'prob': probs,
+        'theoretical': stats.norm.ppf(probs, values.mean(), values.std(ddof=1)),
+        'sample': np.quantile(values, probs)
+    })
@@ -0,0 +1,197 @@
+"""
+🏟️ Cubo de agregados por time do Premier League Analytics
+
+Agregados time × posição (contagens, somas e médias das métricas), artilheiro e
+garçom de cada time e distribuição de minutos, calculados uma vez por
+impressão digital do dataset. Quando as linhas mudam (ex.: um slider do
+sidebar), o cubo anterior é atualizado somando/subtraindo só as linhas que
+entraram ou saíram; trocar de time vira uma consulta a dicionário.
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+from caching import LRUCache
+
+# Métricas somadas no cubo (as ausentes no dataset são ignoradas)
+CUBE_METRICS = ('Goals', 'Assists', 'Minutes', 'Age', 'Expected_Goals', 'Expected_Assists',
+                'Yellow_Cards', 'Red_Cards')
+ROW_COLUMNS = ('Squad', 'Pos', 'Player')
+
+
+class SquadCube:
+    """Agregados time × posição com atualização incremental"""
+
+    def __init__(self, df, metrics=CUBE_METRICS, fingerprint=None):
+        self.metrics = [m for m in metrics if m in df.columns]
+        self.fingerprint = fingerprint
+        # Dataset de origem: ids de linha só são comparáveis dentro do mesmo dataset
+        self.base_fingerprint = df.attrs.get('fingerprint')
+        rows = self._rows_of(df)
+        self.squads = np.array(sorted(rows['Squad'].unique()), dtype=object)
+        self.positions = np.array(sorted(rows['Pos'].unique()), dtype=object)
+        self._squad_code = {s: i for i, s in enumerate(self.squads)}
+        self._pos_code = {p: i for i, p in enumerate(self.positions)}
+        self.minutes_bins = np.asarray(config.TEAM_MINUTES_BINS, dtype=np.float64)
+
+        S, P, B = len(self.squads), len(self.positions), len(self.minutes_bins) - 1
+        self.counts = np.zeros((S, P), dtype=np.int64)
+        self.sums = np.zeros((len(self.metrics), S, P))
+        self.minutes_hist = np.zeros((S, B), dtype=np.int64)
+        self._rows = rows
+        self._apply(rows, +1)
+
+        self._records = {}
+        self._refresh(range(S))
+
+    def _rows_of(self, df):
+        rows = pd.DataFrame(index=df.index)
+        for col in ROW_COLUMNS:
+            rows[col] = df[col].astype(str).to_numpy() if col in df.columns else 'N/A'
+        for metric in self.metrics:
+            rows[metric] = pd.to_numeric(df[metric], errors='coerce').to_numpy(dtype=np.float64)
+        return rows
+
+    def _apply(self, rows, sign):
+        """Soma (sign=+1) ou subtrai (sign=−1) as linhas das células do cubo"""
+        if rows.empty:
+            return
+        S, P = self.counts.shape
+        s = rows['Squad'].map(self._squad_code).to_numpy()
+        p = rows['Pos'].map(self._pos_code).to_numpy()
+        cell = s * P + p
+
+        self.counts += sign * np.bincount(cell, minlength=S * P).reshape(S, P)
+        for m, metric in enumerate(self.metrics):
+            values = np.nan_to_num(rows[metric].to_numpy())
+            self.sums[m] += sign * np.bincount(cell, weights=values, minlength=S * P).reshape(S, P)
+
+        if 'Minutes' in self.metrics:
+            B = self.minutes_hist.shape[1]
+            minutes = np.nan_to_num(rows['Minutes'].to_numpy())
+            bins = np.clip(np.searchsorted(self.minutes_bins, minutes, side='right') - 1, 0, B - 1)
+            self.minutes_hist += sign * np.bincount(s * B + bins, minlength=S * B).reshape(S, B)
+
+    def _best_players(self, squads, metric):
+        """Linha com o maior valor de ``metric`` em cada um dos times indicados"""
+        if metric not in self.metrics:
+            return {}
+        rows = self._rows[self._rows['Squad'].isin(self.squads[list(squads)])]
+        rows = rows[rows[metric].notna()]
+        if rows.empty:
+            return {}
+        best = rows.groupby('Squad', sort=False)[metric].idxmax()
+        return {squad: (rows.at[idx, 'Player'], rows.at[idx, metric]) for squad, idx in best.items()}
+
+    def _refresh(self, squads):
+        """Recalcula os registros dos times afetados e o ranking da liga"""
+        squads = list(squads)
+        top_scorers = self._best_players(squads, 'Goals')
+        top_assistants = self._best_players(squads, 'Assists')
+        totals = self.sums.sum(axis=2)           # métricas × times
+        players = self.counts.sum(axis=1)
+
+        for i in squads:
+            squad = self.squads[i]
+            n = int(players[i])
+            record = {
+                'squad': squad,
+                'players': n,
+                'totals': {metric: float(totals[m, i]) for m, metric in enumerate(self.metrics)},
+                'means': {metric: float(totals[m, i] / n) if n else np.nan for m, metric in enumerate(self.metrics)},
+                'positions': pd.Series(self.counts[i], index=self.positions)[lambda c: c > 0],
+                'minutes_hist': self.minutes_hist[i].copy(),
+                'top_scorer': top_scorers.get(squad),
+                'top_assistant': top_assistants.get(squad)
+            }
+            self._records[squad] = record
+
+        # Ranking por gols (times sem jogadores no filtro ficam de fora)
+        table = pd.DataFrame({
+            'Gols Totais': totals[self.metrics.index('Goals')] if 'Goals' in self.metrics else 0.0,
+            'Assistências Totais': totals[self.metrics.index('Assists')] if 'Assists' in self.metrics else 0.0,
+            'Jogadores': players
+        }, index=pd.Index(self.squads, name='Squad'))
+        table = table[table['Jogadores'] > 0].sort_values('Gols Totais', ascending=False, kind='stable')
+        self.league_table = table
+        self._rank = {squad: i + 1 for i, squad in enumerate(table.index)}
+
+    @property
+    def teams(self):
+        """Times com pelo menos um jogador no recorte atual"""
+        return list(self.league_table.index.sort_values())
+
+    def team(self, squad):
+        """Registro pré-calculado do time (com posição no ranking de gols)"""
+        record = self._records[squad]
+        return {**record, 'rank': self._rank.get(squad)}
+
+    def position_table(self, metric, how='sum'):
+        """Tabela time × posição de uma métrica (soma ou média)"""
+        values = self.sums[self.metrics.index(metric)]
+        if how == 'mean':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.where(self.counts > 0, values / self.counts, np.nan)
+        table = pd.DataFrame(values, index=self.squads, columns=self.positions)
+        return table.loc[self.league_table.index]
+
+    def minutes_labels(self):
+        edges = self.minutes_bins
+        return [
+            f"{int(lo)}+" if np.isinf(hi) else f"{int(lo)}–{int(hi)}"
+            for lo, hi in zip(edges[:-1], edges[1:])
+        ]
+
+    def updated(self, df, fingerprint=None):
+        """
+        Novo cubo para ``df`` derivado deste: aplica só as linhas que entraram ou
+        saíram. Reconstrói do zero quando ``df`` vem de outro dataset (os ids de
+        linha são renumerados a cada carga), quando a diferença é grande ou
+        quando aparecem times/posições que o cubo ainda não conhece.
+        """
+        base = df.attrs.get('fingerprint')
+        if base is None or base != self.base_fingerprint:
+            return SquadCube(df, self.metrics, fingerprint)
+
+        old_ids, new_ids = self._rows.index, df.index
+        added, removed = new_ids.difference(old_ids), old_ids.difference(new_ids)
+        if len(added) + len(removed) > len(new_ids) // 2:
+            return SquadCube(df, self.metrics, fingerprint)
+
+        rows = self._rows_of(df)
+        added_rows = rows.loc[added]
+        if not (added_rows['Squad'].isin(self._squad_code).all() and added_rows['Pos'].isin(self._pos_code).all()):
+            return SquadCube(df, self.metrics, fingerprint)
+
+        cube = object.__new__(SquadCube)
+        cube.__dict__.update(self.__dict__)
+        cube.fingerprint = fingerprint
+        cube.counts, cube.sums, cube.minutes_hist = self.counts.copy(), self.sums.copy(), self.minutes_hist.copy()
+        cube._records = dict(self._records)
+        removed_rows = self._rows.loc[removed]
+        cube._apply(removed_rows, -1)
+        cube._apply(added_rows, +1)
+        cube._rows = rows
+
+        affected = pd.unique(pd.concat([removed_rows['Squad'], added_rows['Squad']]))
+        cube._refresh(self._squad_code[s] for s in affected)
+        return cube
+
+
+class CubeStore(LRUCache):
+    """
+    Cubos por impressão digital; um cubo novo parte do usado mais recentemente
+    quando ele vem do mesmo dataset de origem (senão é construído do zero).
+    """
+
+    def __init__(self, max_entries=config.TEAM_CUBE_MAX_ENTRIES):
+        super().__init__(max_bytes=float('inf'), max_entries=max_entries, sizeof=lambda cube: 0)
+
+    def get_or_build(self, fingerprint, df):
+        def build():
+            latest = self.latest()
+            if latest is None:
+                return SquadCube(df, fingerprint=fingerprint)
+            return latest[1].updated(df, fingerprint)
+        return self.get_or_compute(fingerprint, build)
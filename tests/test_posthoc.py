@@ -0,0 +1,80 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from posthoc import dunn, games_howell, p_adjust, posthoc, studentized_range_sf, tukey_hsd
+from stats_engine import group_summaries
+
+
+def make_summary(seed=11):
+    """Quatro grupos desbalanceados, com variâncias diferentes e empates"""
+    rng = np.random.default_rng(seed)
+    sizes, means, scales = [40, 25, 60, 18], [0.0, 0.4, 1.1, 0.2], [1.0, 2.5, 1.5, 0.7]
+    samples = [np.round(rng.normal(m, s, n), 1) for n, m, s in zip(sizes, means, scales)]
+    labels = np.repeat(['A', 'B', 'C', 'D'], sizes)
+    return group_summaries(np.concatenate(samples), labels), samples
+
+
+@pytest.mark.parametrize('k, df', [(3, 12), (4, 60), (6, 250), (10, np.inf)])
+def test_studentized_range_matches_scipy(k, df):
+    q = np.linspace(0.5, 7, 14)
+    np.testing.assert_allclose(studentized_range_sf(q, k, df), stats.studentized_range.sf(q, k, df), atol=5e-5)
+
+
+def test_tukey_matches_scipy():
+    summary, samples = make_summary()
+    pairs = tukey_hsd(summary)
+    ref = stats.tukey_hsd(*samples)
+    first, second = np.triu_indices(len(samples), k=1)
+    np.testing.assert_allclose(pairs['diff'], ref.statistic[first, second], rtol=1e-10)
+    np.testing.assert_allclose(pairs['p_value'], ref.pvalue[first, second], atol=1e-4)
+
+
+def test_games_howell_matches_welch_reference():
+    summary, samples = make_summary()
+    pairs = games_howell(summary)
+    for row, (i, j) in zip(pairs.itertuples(), combinations(range(len(samples)), 2)):
+        a, b = samples[i], samples[j]
+        va, vb = a.var(ddof=1) / len(a), b.var(ddof=1) / len(b)
+        df = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+        t = abs(a.mean() - b.mean()) / np.sqrt(va + vb)
+        assert row.statistic == pytest.approx(t, rel=1e-10)
+        assert row.p_value == pytest.approx(stats.studentized_range.sf(t * np.sqrt(2), len(samples), df), abs=1e-4)
+
+
+@pytest.mark.parametrize('adjust', ['holm', 'fdr_bh'])
+def test_dunn_matches_rank_reference(adjust):
+    summary, samples = make_summary()
+    pairs = dunn(summary, adjust=adjust)
+    values = np.concatenate(samples)
+    ranks = stats.rankdata(values)
+    groups = np.split(ranks, np.cumsum([len(s) for s in samples])[:-1])
+    N = len(values)
+    _, ties = np.unique(values, return_counts=True)
+    variance = N * (N + 1) / 12 - (ties ** 3 - ties).sum() / (12 * (N - 1))
+    z = np.array([
+        (groups[i].mean() - groups[j].mean()) / np.sqrt(variance * (1 / len(groups[i]) + 1 / len(groups[j])))
+        for i, j in combinations(range(len(groups)), 2)
+    ])
+    np.testing.assert_allclose(pairs['statistic'], z, rtol=1e-10)
+    expected = multipletests(2 * stats.norm.sf(np.abs(z)), method=adjust)[1]
+    np.testing.assert_allclose(pairs['p_value'], expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize('method', ['holm', 'fdr_bh', 'bonferroni'])
+def test_p_adjust_matches_statsmodels(method):
+    p = np.random.default_rng(1).uniform(size=30) ** 2
+    np.testing.assert_allclose(p_adjust(p, method), multipletests(p, method=method)[1], rtol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['tukey', 'games_howell', 'dunn'])
+def test_letters_agree_with_pairwise_decisions(method):
+    summary, _ = make_summary()
+    result = posthoc(summary, method=method)
+    letters = result['letters']
+    for row in result['pairs'].itertuples():
+        share = bool(set(letters[row.group1]) & set(letters[row.group2]))
+        assert share != row.reject
@@ -0,0 +1,324 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from scipy import stats
+from statsmodels.stats.diagnostic import normal_ad
+from statsmodels.stats.multitest import multipletests
+from statsmodels.stats.oneway import anova_oneway
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from stats_engine import (bootstrap_correlation, bootstrap_mean_difference, bootstrap_r_squared, combinations_from,
+                          correlation_significance, fdr_bh, feature_subset_search, fit_ols, fit_ols_train_test,
+                          group_summaries, group_tests, normality_battery, ols_predict, permutation_test,
+                          stratified_sample, streaming_moments)
+
+
+def make_frame(n=300, seed=1, missing=0.15):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=n)
+    df = pd.DataFrame({
+        'a': base + rng.normal(scale=0.5, size=n),
+        'b': np.round(base * 2 + rng.normal(size=n)),        # empates
+        'c': rng.normal(size=n),
+        'd': rng.poisson(2, size=n).astype(float)
+    })
+    for col, frac in zip(df.columns, (missing, 0.0, missing / 2, missing)):
+        df.loc[rng.random(n) < frac, col] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('missing', [0.0, 0.15])
+def test_correlations_match_scipy_with_missing_values(missing):
+    df = make_frame(missing=missing)
+    result = correlation_significance(df)
+    for x, y in [('a', 'b'), ('a', 'c'), ('a', 'd'), ('b', 'c'), ('c', 'd')]:
+        pair = df[[x, y]].dropna()
+        rho, p_rho = stats.spearmanr(df[x], df[y], nan_policy='omit')
+        r, p_r = stats.pearsonr(pair[x], pair[y])
+        assert result['n'].loc[x, y] == len(pair)
+        assert result['spearman'].loc[x, y] == pytest.approx(rho, abs=1e-12)
+        assert result['spearman_p'].loc[x, y] == pytest.approx(p_rho, rel=1e-8)
+        assert result['pearson'].loc[x, y] == pytest.approx(r, abs=1e-12)
+        assert result['pearson_p'].loc[x, y] == pytest.approx(p_r, rel=1e-8)
+
+
+
+def test_fdr_bh_matches_statsmodels_and_keeps_nan():
+    p = np.random.default_rng(0).uniform(size=40) ** 3
+    p[[3, 17]] = np.nan
+    valid = ~np.isnan(p)
+    adjusted = fdr_bh(p.reshape(8, 5)).ravel()
+    np.testing.assert_allclose(adjusted[valid], multipletests(p[valid], method='fdr_bh')[1], rtol=1e-12)
+    assert np.isnan(adjusted[~valid]).all()
+
+
+def test_correlation_fdr_is_applied_over_distinct_pairs():
+    df = make_frame()
+    result = correlation_significance(df)
+    pairs = result['pairs']
+    for method in ('pearson', 'spearman'):
+        expected = multipletests(pairs[f'{method}_p'], method='fdr_bh')[1]
+        np.testing.assert_allclose(pairs[f'{method}_q'], expected, rtol=1e-12)
+        q = result[f'{method}_q'].to_numpy()
+        np.testing.assert_array_equal(q, q.T)
+    assert len(pairs) == 6
+    assert (np.diff(pairs['pearson_r'].abs()) <= 0).all()
+
+
+@pytest.mark.parametrize('p, k', [(7, 1), (7, 3), (9, 4), (6, 6)])
+def test_combinations_from_matches_itertools(p, k):
+    expected = list(combinations(range(1, p + 1), k))
+    for start in range(len(expected)):
+        assert list(combinations_from(start, p, k, 5)) == expected[start:start + 5]
+
+
+def test_exhaustive_search_matches_brute_force():
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame(rng.normal(size=(200, 6)), columns=list('abcdef'))
+    y = 2 * X['a'] - X['c'] + rng.normal(size=200)
+    ranking = feature_subset_search(X, y, method='exhaustive', criterion='bic', max_features=6, top_n=3)
+    assert ranking['features'].iloc[0] == ('a', 'c')
+    best_bic = min(
+        feature_subset_search(X[list(combo)], y, method='exhaustive', criterion='bic',
+                              max_features=len(combo), top_n=1000)
+        .loc[lambda r: r['n_features'] == len(combo), 'bic'].iloc[0]
+        for k in range(1, 7) for combo in combinations('abcdef', k)
+    )
+    assert ranking['bic'].iloc[0] == pytest.approx(best_bic)
+
+
+
+def assert_interval_close(result, data, statistic, key, method, **kwargs):
+    """Mesmo intervalo do scipy a menos do erro de Monte Carlo (~0,15 erro padrão)"""
+    low, high = result[key]
+    ci = stats.bootstrap(data, statistic, n_resamples=20_000, method=method, random_state=1, **kwargs).confidence_interval
+    assert low == pytest.approx(ci.low, abs=0.15 * result['se'])
+    assert high == pytest.approx(ci.high, abs=0.15 * result['se'])
+
+
+@pytest.mark.parametrize('key, method', [('percentile', 'percentile'), ('bca', 'BCa')])
+def test_bootstrap_correlation_matches_scipy(key, method):
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=300)
+    y = 0.5 * x + rng.normal(size=300)
+    x[[4, 9]] = np.nan
+    valid = ~np.isnan(x)
+    result = bootstrap_correlation(x, y, n_resamples=20_000, n_jobs=1)
+    assert result['estimate'] == pytest.approx(stats.pearsonr(x[valid], y[valid])[0], rel=1e-10)
+    assert_interval_close(
+        result, (x[valid], y[valid]), lambda a, b, axis=-1: stats.pearsonr(a, b, axis=axis)[0],
+        key, method, paired=True
+    )
+
+
+@pytest.mark.parametrize('key, method', [('percentile', 'percentile'), ('bca', 'BCa')])
+def test_bootstrap_mean_difference_matches_scipy(key, method):
+    rng = np.random.default_rng(4)
+    a, b = rng.exponential(size=80), rng.exponential(1.5, size=120)
+    result = bootstrap_mean_difference(a, b, n_resamples=20_000, n_jobs=1)
+    assert result['estimate'] == pytest.approx(a.mean() - b.mean(), rel=1e-12)
+    assert_interval_close(result, (a, b), lambda u, v, axis=-1: u.mean(axis) - v.mean(axis), key, method)
+
+
+def test_bootstrap_r_squared_estimate_matches_statsmodels():
+    rng = np.random.default_rng(6)
+    groups = rng.choice(['GK', 'DF', 'MF', 'FW'], size=200)
+    y = pd.Series(groups).map({'GK': 0, 'DF': 1, 'MF': 2, 'FW': 4}).to_numpy() + rng.poisson(2, size=200)
+    X = pd.get_dummies(pd.Series(groups), drop_first=True, dtype=float)
+    result = bootstrap_r_squared(X, y, n_resamples=2_000, n_jobs=1)
+    assert result['estimate'] == pytest.approx(sm.OLS(y, sm.add_constant(X)).fit().rsquared, rel=1e-10)
+    assert result['percentile'][0] < result['estimate'] < result['percentile'][1]
+    assert result['n_resamples'] == 2_000
+
+
+@pytest.mark.parametrize('n1, n2', [(6, 7), (7, 6), (2, 11)])
+def test_exact_permutation_matches_scipy(n1, n2):
+    rng = np.random.default_rng(n1)
+    a, b = rng.normal(size=n1), rng.normal(0.8, size=n2)
+    result = permutation_test(np.r_[a, b], [0] * n1 + [1] * n2)
+    ref = stats.permutation_test(
+        (a, b), lambda x, y: abs(np.mean(x) - np.mean(y)),
+        permutation_type='independent', n_resamples=np.inf, alternative='greater'
+    )
+    assert result['exact']
+    assert result['n_permutations'] == len(list(combinations(range(n1 + n2), n1)))
+    assert result['p_value'] == pytest.approx(ref.pvalue, rel=1e-12)
+
+
+
+@pytest.mark.parametrize('shift', [0.15, 0.6])
+def test_monte_carlo_anova_permutation_matches_scipy(shift):
+    rng = np.random.default_rng(8)
+    samples = [rng.normal(m * shift, 1.0, size=n) for m, n in [(0, 30), (1, 25), (2, 35)]]
+    result = permutation_test(np.concatenate(samples), np.repeat(['a', 'b', 'c'], [30, 25, 35]), n_jobs=1)
+    ref = stats.permutation_test(
+        samples, lambda *groups, axis=-1: stats.f_oneway(*groups, axis=axis).statistic,
+        permutation_type='independent', n_resamples=20_000, alternative='greater', random_state=1
+    )
+    assert not result['exact'] and result['kind'] == 'anova'
+    assert result['statistic'] == pytest.approx(stats.f_oneway(*samples).statistic, rel=1e-10)
+    assert result['p_value'] == pytest.approx(ref.pvalue, abs=4 * result['se'] + 0.005)
+    # A parada antecipada só ocorre quando a decisão em α já está clara
+    if result['stopped_early']:
+        assert (result['p_value'] < 0.05) == (ref.pvalue < 0.05)
+
+
+@pytest.mark.parametrize('tiny_first', [True, False])
+def test_exact_permutation_with_one_tiny_group(tiny_first):
+    n = 50_000
+    values = np.random.default_rng(3).normal(size=n)
+    groups = np.full(n, 1 if tiny_first else 0)
+    groups[7] = 0 if tiny_first else 1
+    result = permutation_test(values, groups, max_permutations=n)
+    # Grupo de um elemento: cada divisão é uma escolha desse elemento
+    deviation = np.abs(values - values.mean())
+    assert result['exact'] and result['n_permutations'] == n
+    assert result['p_value'] == pytest.approx(np.mean(deviation >= deviation[7] * (1 - 1e-12)))
+
+
+def make_regression(n=250, seed=5):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 3)), columns=['xg', 'minutes', 'age'])
+    y = 1.5 + 2 * X['xg'] - 0.5 * X['age'] + rng.standard_t(4, size=n)
+    return X, y
+
+
+def test_fit_ols_matches_statsmodels():
+    X, y = make_regression()
+    fit = fit_ols(X, y)
+    ref = sm.OLS(y, sm.add_constant(X)).fit()
+    np.testing.assert_allclose(fit['params'], ref.params, rtol=1e-10)
+    np.testing.assert_allclose(fit['bse'], ref.bse, rtol=1e-10)
+    np.testing.assert_allclose(fit['tvalues'], ref.tvalues, rtol=1e-10)
+    np.testing.assert_allclose(fit['pvalues'], ref.pvalues, rtol=1e-8, atol=1e-300)
+    np.testing.assert_allclose(fit['summary'][['ci_lower', 'ci_upper']], ref.conf_int(0.05), rtol=1e-10)
+    assert fit['rsquared'] == pytest.approx(ref.rsquared, rel=1e-12)
+    assert fit['rsquared_adj'] == pytest.approx(ref.rsquared_adj, rel=1e-12)
+    assert fit['fvalue'] == pytest.approx(ref.fvalue, rel=1e-10)
+    assert fit['f_pvalue'] == pytest.approx(ref.f_pvalue, rel=1e-8)
+    assert list(fit['summary'].index) == ['const', 'xg', 'minutes', 'age']
+
+
+def test_ols_predict_matches_statsmodels_intervals():
+    X, y = make_regression()
+    X_new = X.iloc[:7] + 0.3
+    pred = ols_predict(fit_ols(X, y), X_new)
+    ref = sm.OLS(y, sm.add_constant(X)).fit().get_prediction(sm.add_constant(X_new, has_constant='add'))
+    frame = ref.summary_frame(alpha=0.05)
+    for col in ['mean', 'mean_se', 'mean_ci_lower', 'mean_ci_upper', 'obs_ci_lower', 'obs_ci_upper']:
+        np.testing.assert_allclose(pred[col], frame[col], rtol=1e-10)
+
+
+def test_fit_ols_train_test_matches_sklearn_metrics():
+    X, y = make_regression()
+    fit = fit_ols_train_test(X.iloc[:200], y.iloc[:200], X.iloc[200:], y.iloc[200:])
+    y_pred = fit['y_pred_test']
+    assert fit['r2_test'] == pytest.approx(r2_score(y.iloc[200:], y_pred), rel=1e-12)
+    assert fit['rmse_test'] == pytest.approx(np.sqrt(mean_squared_error(y.iloc[200:], y_pred)), rel=1e-12)
+    assert fit['mae_test'] == pytest.approx(mean_absolute_error(y.iloc[200:], y_pred), rel=1e-12)
+    assert fit['r2_train'] == pytest.approx(r2_score(y.iloc[:200], fit['y_pred_train']), rel=1e-12)
+
+
+def make_groups(seed=9):
+    """Gols inteiros (muitos empates) por posição, com NaN e um grupo pequeno demais"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'pos': np.repeat(['DF', 'FW', 'GK', 'MF', 'XX'], [60, 40, 25, 50, 2]),
+        'goals': np.concatenate([rng.poisson(lam, size) for lam, size in
+                                 [(1, 60), (6, 40), (0.2, 25), (3, 50), (1, 2)]]).astype(float)
+    })
+    frame.loc[[3, 70, 130], 'goals'] = np.nan
+    return frame
+
+
+def test_group_summaries_match_pandas():
+    frame = make_groups()
+    summary = group_summaries(frame['goals'], frame['pos'], min_size=3)
+    ref = frame.dropna().groupby('pos')['goals'].agg(['size', 'mean', 'var', 'median']).drop(index='XX')
+    assert list(summary['labels']) == list(ref.index)
+    np.testing.assert_allclose(summary['n'], ref['size'])
+    np.testing.assert_allclose(summary['means'], ref['mean'], rtol=1e-12)
+    np.testing.assert_allclose(summary['variances'], ref['var'], rtol=1e-10)
+    np.testing.assert_allclose(summary['medians'], ref['median'])
+
+
+def test_group_tests_match_scipy_and_statsmodels():
+    frame = make_groups()
+    summary = group_summaries(frame['goals'], frame['pos'], min_size=3)
+    battery = group_tests(summary).set_index('test')
+    samples = [g.dropna().to_numpy() for _, g in frame.groupby('pos')['goals'] if g.notna().sum() >= 3]
+
+    references = {
+        'ANOVA (one-way)': stats.f_oneway(*samples),
+        'Levene': stats.levene(*samples, center='mean'),
+        'Brown-Forsythe': stats.levene(*samples, center='median'),
+        'Kruskal-Wallis': stats.kruskal(*samples)
+    }
+    for test, ref in references.items():
+        assert battery.loc[test, 'statistic'] == pytest.approx(ref.statistic, rel=1e-9)
+        assert battery.loc[test, 'p_value'] == pytest.approx(ref.pvalue, rel=1e-7, abs=1e-300)
+
+    welch = anova_oneway(samples, use_var='unequal')
+    assert battery.loc['ANOVA de Welch', 'statistic'] == pytest.approx(welch.statistic, rel=1e-9)
+    assert battery.loc['ANOVA de Welch', 'df2'] == pytest.approx(welch.df[1], rel=1e-9)
+    assert battery.loc['ANOVA de Welch', 'p_value'] == pytest.approx(welch.pvalue, rel=1e-7, abs=1e-300)
+
+
+def make_shapes(n=600, seed=12):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'normal': rng.normal(size=n),
+        'skewed': rng.exponential(size=n),
+        'heavy': rng.standard_t(4, size=n),
+        'counts': rng.poisson(2, size=n).astype(float)
+    })
+    df.loc[rng.random(n) < 0.05, 'normal'] = np.nan
+    return df
+
+
+def test_streaming_moments_match_scipy_across_chunks():
+    df = make_shapes()
+    moments = streaming_moments(df.to_numpy(), chunk_rows=37)
+    for j, col in enumerate(df.columns):
+        x = df[col].dropna().to_numpy()
+        n, m2 = moments['n'][j], moments['M2'][j]
+        assert n == len(x)
+        assert moments['mean'][j] == pytest.approx(x.mean(), rel=1e-12)
+        assert np.sqrt(n) * moments['M3'][j] / m2 ** 1.5 == pytest.approx(stats.skew(x), rel=1e-9)
+        assert n * moments['M4'][j] / m2 ** 2 - 3 == pytest.approx(stats.kurtosis(x), rel=1e-9)
+
+
+def test_normality_battery_matches_scipy_and_statsmodels():
+    df = make_shapes()
+    battery = normality_battery(df)
+    for col in df.columns:
+        x = df[col].dropna().to_numpy()
+        row = battery.loc[col]
+        dagostino, jb, shapiro = stats.normaltest(x), stats.jarque_bera(x), stats.shapiro(x)
+        ad, ad_p = normal_ad(x)
+        assert row['n'] == row['shapiro_n'] == len(x)
+        assert row['dagostino_k2'] == pytest.approx(dagostino.statistic, rel=1e-9)
+        assert row['dagostino_p'] == pytest.approx(dagostino.pvalue, rel=1e-7, abs=1e-300)
+        assert row['jarque_bera'] == pytest.approx(jb.statistic, rel=1e-9)
+        assert row['jarque_bera_p'] == pytest.approx(jb.pvalue, rel=1e-7, abs=1e-300)
+        assert row['shapiro_w'] == pytest.approx(shapiro.statistic, rel=1e-12)
+        assert row['shapiro_p'] == pytest.approx(shapiro.pvalue, rel=1e-12)
+        assert row['anderson_darling'] == pytest.approx(ad, rel=1e-9)
+        assert row['anderson_darling_p'] == pytest.approx(ad_p, abs=1e-12)
+
+
+def test_shapiro_subsample_is_stratified():
+    strata = np.repeat(['GK', 'DF', 'MF', 'FW'], [100, 400, 300, 200])
+    sample = stratified_sample(len(strata), 250, strata, random_state=3)
+    assert len(sample) == 250 and len(np.unique(sample)) == 250
+    counts = pd.Series(strata[sample]).value_counts()
+    assert counts.to_dict() == {'DF': 100, 'MF': 75, 'FW': 50, 'GK': 25}
+
+    df = make_shapes(n=1000)
+    battery = normality_battery(df, ['skewed'], strata=strata, shapiro_max=250, random_state=3)
+    expected = stats.shapiro(df['skewed'].to_numpy()[sample])
+    assert battery.loc['skewed', 'shapiro_n'] == 250
+    assert battery.loc['skewed', 'shapiro_w'] == pytest.approx(expected.statistic, rel=1e-12)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from team_cube import CubeStore, SquadCube
+
+
+def make_players(n=60, seed=0, fingerprint='base'):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Player': [f"Jogador {i}" for i in range(n)],
+        'Squad': rng.choice(['Arsenal', 'Chelsea', 'Everton'], n),
+        'Pos': rng.choice(['DF', 'MF', 'FW'], n),
+        'Goals': rng.integers(0, 10, n).astype(float),
+        'Assists': rng.integers(0, 8, n).astype(float),
+        'Minutes': rng.integers(100, 3000, n).astype(float)
+    })
+    df.attrs['fingerprint'] = fingerprint
+    return df
+
+
+def test_incremental_update_matches_rebuild():
+    df = make_players()
+    store = CubeStore()
+    store.get_or_build('full', df)
+    view = df.iloc[5:]
+    cube = store.get_or_build('view', view)
+    expected = SquadCube(view)
+    np.testing.assert_allclose(cube.sums, expected.sums)
+    np.testing.assert_array_equal(cube.counts, expected.counts)
+
+
+def test_switching_dataset_rebuilds_from_scratch():
+    df = make_players()
+    store = CubeStore()
+    store.get_or_build('a', df)
+
+    # Outro dataset com os mesmos ids de linha (load_partitions renumera 0..N)
+    other = df.assign(Goals=0.0).iloc[5:]
+    other.attrs['fingerprint'] = 'other'
+    cube = store.get_or_build('b', other)
+
+    assert cube.base_fingerprint == 'other'
+    assert cube.league_table['Gols Totais'].sum() == 0
+    np.testing.assert_array_equal(cube.counts, SquadCube(other).counts)